@@ -1,7 +1,15 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
 import plotly.express as px
+from armazem_ocorrencias import carregar_historico, listar_exportacoes
+from cubo import construir_cubo, fatiar, meses_do_cubo, total, totais_por
+from turnos import ordem_turnos
+from graficos import grafico_barras
+from esquema import truncar
+from servico_dados import ErroServico, consultar
+from instrumentacao import bloco, finalizar_instrumentacao, iniciar_instrumentacao, linhas_saida
+from relatorio_atendimento import grafico_atendimentos_dia, kpis_atendimento, montar_tabelas_turno, tabelas_natureza_viatura
+from secoes import calcular_secao, indice_lembrado, lembrado, lembrar, visivel
 
 # Bloco 1: Configuração da página e carregamento dos dados
 # ---------------------------------------------
@@ -9,78 +17,69 @@ import plotly.express as px
 # Configuração da página para modo wide
 st.set_page_config(page_title="Dashboard de Atendimentos", layout="wide")
 
-# Função para carregar dados com cache
-@st.cache_data
-def carregar_dados(file_path):
-    excel_file = pd.ExcelFile(file_path)
-    sheet_name = "Planilha1" if "Planilha1" in excel_file.sheet_names else excel_file.sheet_names[0]
-    return pd.read_excel(excel_file, sheet_name=sheet_name)
-
-# Caminho do arquivo
-file_path = "Rel Outubro1.xlsx"
-df = carregar_dados(file_path)
-
-# Convertendo colunas de datas para formato datetime
-df['Data/Hora inicial'] = pd.to_datetime(df['Data/Hora inicial'])
-df['Data/Hora final'] = pd.to_datetime(df['Data/Hora final'])
-
-# Adicionando colunas auxiliares
-df['Dia'] = df['Data/Hora inicial'].dt.date
-df['Mês'] = df['Data/Hora inicial'].dt.month_name()
+# Instrumentação opcional por bloco (?debug=1 na URL)
+iniciar_instrumentacao("Oco.py")
+bloco("Bloco 1: Configuração da página e carregamento dos dados")
+
+# Função para carregar o cubo de contagens (Mês × Dia × Turno × Natureza × Guarnição) uma vez por versão dos dados
+# (a lista de exportações com o mtime de cada arquivo invalida o cache quando chega um relatório novo)
+# Com o serviço de dados no ar (python servico_dados.py), o histórico fica só no serviço e o app recebe o cubo pronto;
+# sem o serviço (ou se a consulta falhar), o app ingere as exportações novas no armazém e monta o cubo localmente
+# O cubo fica compartilhado entre as sessões sem cópia (cache_resource): somente leitura, os blocos abaixo só o fatiam
+@st.cache_resource
+def carregar_cubo(exportacoes):
+    try:
+        cubo = consultar('cubo')
+    except ErroServico:
+        cubo = construir_cubo(carregar_historico([arquivo for arquivo, _ in exportacoes]))
+    # Meses do mais recente para o mais antigo, para o selectbox
+    return cubo, meses_do_cubo(cubo)
+
+# Exportações mensais disponíveis ("Rel *.xlsx", "Relatorio *.xlsx")
+exportacoes = listar_exportacoes()
+cubo, meses = carregar_cubo(exportacoes)
+linhas_saida(len(cubo))
 
 
 # Bloco 2: Filtros e Configurações na Barra Lateral
 # ---------------------------------------------
+bloco("Bloco 2: Filtros e Configurações na Barra Lateral", linhas_entrada=len(cubo))
 
 # Barra lateral para seleção do mês
 st.sidebar.title("Filtros")
-mes = st.sidebar.selectbox("Selecione o mês:", options=df['Mês'].unique(), index=0)
+mes = st.sidebar.selectbox("Selecione o mês:", options=meses, index=0)
 
-# Filtra o DataFrame com base no mês selecionado
-df_mes = df[df['Mês'] == mes]
+# Filtra o cubo com base no mês selecionado
+cubo_mes = fatiar(cubo, {'Mês': mes})
 
-# Ordena Naturezas pela quantidade de ocorrências para o filtro, baseado no mês selecionado
-natureza_counts = df_mes['Natureza'].value_counts().reset_index()
-natureza_counts.columns = ['Natureza', 'Ocorrencias']
-natureza_sorted = ["TODOS"] + natureza_counts.sort_values(by='Ocorrencias', ascending=False)['Natureza'].tolist()
-
-# Ordena Guarnições pela quantidade de ocorrências para o filtro, baseado no mês selecionado
-guarnicao_counts = df_mes['Guarnição'].value_counts().reset_index()
-guarnicao_counts.columns = ['Guarnição', 'Ocorrencias']
-guarnicao_sorted = ["TODOS"] + guarnicao_counts.sort_values(by='Ocorrencias', ascending=False)['Guarnição'].tolist()
+# Ordena Naturezas e Guarnições pela quantidade de ocorrências para o filtro, baseado no mês selecionado
+natureza_sorted = ["TODOS"] + totais_por(cubo_mes, 'Natureza').index.tolist()
+guarnicao_sorted = ["TODOS"] + totais_por(cubo_mes, 'Guarnição').index.tolist()
 
 # Filtros de Natureza e Guarnição na barra lateral
 natureza = st.sidebar.selectbox("Selecione a Natureza:", options=natureza_sorted)
 guarnicao = st.sidebar.selectbox("Selecione a Guarnição:", options=guarnicao_sorted)
 
-# Aplicação dos filtros de Natureza e Guarnição
-if natureza != "TODOS":
-    df_mes = df_mes[df_mes['Natureza'] == natureza]
-if guarnicao != "TODOS":
-    df_mes = df_mes[df_mes['Guarnição'] == guarnicao]
+# Aplicação dos filtros de Natureza e Guarnição ("TODOS" não filtra)
+cubo_mes = fatiar(cubo_mes, {'Natureza': natureza, 'Guarnição': guarnicao})
+linhas_saida(len(cubo_mes))
 
 
 # Bloco 3: KPIs - Indicadores de Desempenho
 # ---------------------------------------------
+bloco("Bloco 3: KPIs - Indicadores de Desempenho", linhas_entrada=len(cubo_mes))
 
 # Título do Dashboard
 st.title("Relatório de Atendimento")
 
 # KPIs com média de atendimentos diários e dia com mais ocorrências
-
-total_atendimentos_mes = len(df_mes)
-dias_unicos = df_mes['Dia'].nunique()
-
-# Calcular média de atendimentos diário apenas se houver dias únicos
-media_atendimentos_diario = round(total_atendimentos_mes / dias_unicos, 2) if dias_unicos > 0 else 0
-
-# Dia com mais ocorrências e quantidade de atendimentos no dia
-if not df_mes.empty:
-    dia_maior_ocorrencias = df_mes.groupby('Dia').size().idxmax()
-    atendimentos_maior_dia = df_mes.groupby('Dia').size().max()
-else:
-    dia_maior_ocorrencias = "N/A"
-    atendimentos_maior_dia = "N/A"
+# (mesmo cálculo dos relatórios estáticos gerados por gerar_relatorios.py)
+kpis = kpis_atendimento(cubo_mes)
+total_atendimentos_mes = kpis['total_atendimentos_mes']
+atendimentos_dia = kpis['atendimentos_dia']
+media_atendimentos_diario = kpis['media_atendimentos_diario']
+dia_maior_ocorrencias = kpis['dia_maior_ocorrencias']
+atendimentos_maior_dia = kpis['atendimentos_maior_dia']
 
 # Exibindo KPIs
 col1, col2, col3 = st.columns(3)
@@ -92,319 +91,203 @@ col3.caption(f"Quantidade de Atendimentos: {atendimentos_maior_dia}")
 
 # Bloco 4: Tabelas de Atendimentos por Natureza e Viatura
 # ---------------------------------------------
+bloco("Bloco 4: Tabelas de Atendimentos por Natureza e Viatura", linhas_entrada=len(cubo_mes))
 
 st.markdown("### Atendimentos por Natureza e por Viatura")
 
+# Tabelas ordenadas do maior para o menor
+atendimentos_natureza, atendimentos_viatura = tabelas_natureza_viatura(cubo_mes)
+
 # Colunas para as tabelas
 col1, col2 = st.columns(2)
 
 with col1:
-    # Ordena a tabela de atendimentos por natureza do maior para o menor
-    atendimentos_natureza = df_mes.groupby('Natureza').size().reset_index(name='Total de Atendimentos')
-    atendimentos_natureza = atendimentos_natureza.sort_values(by='Total de Atendimentos', ascending=False).reset_index(drop=True)
     st.markdown("#### Atendimentos por Natureza")
     st.dataframe(atendimentos_natureza)
 
 with col2:
-    # Ordena a tabela de atendimentos por viatura do maior para o menor
-    atendimentos_viatura = df_mes.groupby('Guarnição').size().reset_index(name='Total de Atendimentos')
-    atendimentos_viatura = atendimentos_viatura.sort_values(by='Total de Atendimentos', ascending=False).reset_index(drop=True)
     st.markdown("#### Atendimentos por Viatura")
     st.dataframe(atendimentos_viatura)
 
 
-import plotly.graph_objects as go
-
 # Bloco 5: Gráfico de Atendimentos por Dia
 # ---------------------------------------------
-
-# Define tamanhos de fonte diretamente no código
-font_size_x_axis = 16  # Tamanho da fonte do eixo X
-font_size_text = 16    # Tamanho da fonte dos valores nas barras
+bloco("Bloco 5: Gráfico de Atendimentos por Dia", linhas_entrada=len(cubo_mes))
 
 # Gráfico de atendimentos por dia com cores alternadas e eixo x com todos os dias do mês
-atendimentos_por_dia = df_mes.groupby('Dia').size().reindex(pd.date_range(start=df_mes['Dia'].min(), end=df_mes['Dia'].max()), fill_value=0).reset_index(name='Total de Atendimentos')
-atendimentos_por_dia.columns = ['Dia', 'Total de Atendimentos']
-cores = ["lightgreen", "lightblue"] * (len(atendimentos_por_dia) // 2 + 1)
-
-# Criando o gráfico com barras alternadas e sem legenda
-fig = go.Figure()
-
-for i, row in atendimentos_por_dia.iterrows():
-    fig.add_trace(
-        go.Bar(
-            x=[row['Dia']],
-            y=[row['Total de Atendimentos']],
-            marker_color=cores[i],
-            text=row['Total de Atendimentos'],
-            textposition='outside',
-            textfont=dict(size=font_size_text)  # Define o tamanho da fonte dos valores nas barras
-        )
-    )
-
-# Configuração do layout do gráfico
-fig.update_layout(
-    title="Atendimentos por Dia",
-    xaxis_title="Dia do Mês",
-    yaxis_title="Quantidade de Atendimentos",
-    yaxis=dict(range=[0, 120]),  # Limite do eixo y para 120
-    xaxis=dict(tickformat="%d", tickvals=atendimentos_por_dia['Dia'], tickfont=dict(size=font_size_x_axis))  # Define o tamanho da fonte do eixo x
-)
+fig = grafico_atendimentos_dia(atendimentos_dia)
 
 # Exibindo gráfico no Streamlit
 st.plotly_chart(fig)
 
 
-import pandas as pd
-import plotly.graph_objects as go
-
 # Bloco 6: Filtro de Dia e Exibição Condicional de Gráfico ou Tabela
 # ---------------------------------------------
-
-# Converte 'Data/Hora inicial' para datetime, tratando valores inválidos como NaT
-df_mes['Data/Hora inicial'] = pd.to_datetime(df_mes['Data/Hora inicial'], errors='coerce')
-
-# Cria a coluna 'Dia' extraindo apenas a data e elimina valores nulos para evitar problemas com NaT
-df_mes['Dia'] = df_mes['Data/Hora inicial'].dt.date
-
-# Opção para habilitar ou desabilitar o filtro por dia
-filtro_por_dia = st.checkbox("Habilitar filtro por dia para análise de natureza e viatura")
-
-# Filtro de seleção do dia (aparece apenas se o filtro estiver habilitado)
-if filtro_por_dia:
-    # Extrai valores únicos de 'Dia' e os ordena, formatando diretamente sem uso de `.dt`
-    dias_unicos = sorted(df_mes['Dia'].dropna().unique())
-    dias_formatados = [dia.strftime('%d/%m/%Y') for dia in dias_unicos]
-
-    dia_selecionado = st.selectbox("Selecione o Dia para ver a distribuição das naturezas de atendimento:", options=dias_formatados)
-    # Converte o dia selecionado para o formato de data para filtrar o DataFrame
-    dia_selecionado = pd.to_datetime(dia_selecionado, format='%d/%m/%Y').date()
-    # Filtra os atendimentos para o dia selecionado
-    df_dia = df_mes[df_mes['Dia'] == dia_selecionado]
-else:
-    # Sem filtro por dia, usa todos os dados do mês
-    df_dia = df_mes
+bloco("Bloco 6: Filtro de Dia e Exibição Condicional de Gráfico ou Tabela", linhas_entrada=len(cubo_mes))
 
 # Define tamanhos de fonte diretamente no código
 font_size_x_axis = 18  # Tamanho da fonte do eixo X
 font_size_text = 20    # Tamanho da fonte dos valores nas barras
 
-# Define as cores alternadas para as barras (verde claro e azul claro)
-colors = ["lightgreen", "lightblue"] * 1  # Multiplicado para garantir cores suficientes
-
-# Condicional para exibir KPIs e o gráfico de barras de acordo com os filtros selecionados
-if natureza != "TODOS" and guarnicao == "TODOS":
-    # KPI 1: Quantidade de atendimentos para a natureza selecionada no dia/mês
-    total_atendimentos_natureza = df_dia[df_dia['Natureza'] == natureza].shape[0]
-    
-    # KPI 2: Viatura que mais atendeu para a natureza selecionada no dia/mês
-    viatura_counts = df_dia[df_dia['Natureza'] == natureza]['Guarnição'].value_counts()
-    viatura_mais_ativa = viatura_counts.idxmax()[:7]  # Limita a guarnição aos primeiros 7 caracteres
-    total_atendimentos_viatura = viatura_counts.max()
-    
-    # Exibindo os KPIs com estilo personalizado
-    col1, col2 = st.columns(2)
-    col1.metric(label=f"Atendimentos de '{natureza}'", value=total_atendimentos_natureza)
-    col2.metric(
-        label="Viatura com Mais Atendimentos",
-        value=f"{viatura_mais_ativa}",
-        delta=f"{total_atendimentos_viatura} atendimentos",
-        delta_color="normal"
-    )
-    
-    # Customiza o estilo da legenda do KPI
-    col2.markdown(f"<style> div[data-testid='metric-container'] > label {{ font-size: 14px; }} </style>", unsafe_allow_html=True)
-
-    # Prepara os dados para o gráfico de barras das guarnições
-    guarnicao_counts = df_dia[df_dia['Natureza'] == natureza]['Guarnição'].value_counts().reset_index()
-    guarnicao_counts.columns = ['Guarnição', 'Total de Atendimentos']
-    guarnicao_counts['Guarnição'] = guarnicao_counts['Guarnição'].str[:7]  # Limita a Guarnição a 7 caracteres
-
-    # Cria o gráfico de barras com cores alternadas e configurações de fonte
-    fig = go.Figure(data=[
-        go.Bar(
-            x=guarnicao_counts['Guarnição'],
-            y=guarnicao_counts['Total de Atendimentos'],
-            text=guarnicao_counts['Total de Atendimentos'],
-            textposition='outside',
-            marker_color=colors[:len(guarnicao_counts)],  # Aplica cores alternadas
-            textfont=dict(size=font_size_text)  # Define o tamanho da fonte dos valores nas barras
+# Função para montar os KPIs e o gráfico (ou a tabela) de acordo com os filtros selecionados
+# 'periodo' complementa os títulos (" no Dia DD/MM/AAAA" ou " no Mês")
+def montar_analise_dia(cubo_dia, natureza, guarnicao, periodo):
+    if natureza != "TODOS" and guarnicao == "TODOS":
+        # KPI 2: Viatura que mais atendeu para a natureza selecionada no dia/mês
+        viatura_counts = totais_por(cubo_dia, 'Guarnição')
+
+        # Prepara os dados para o gráfico de barras das guarnições
+        guarnicao_counts = viatura_counts.reset_index()
+        guarnicao_counts.columns = ['Guarnição', 'Total de Atendimentos']
+        guarnicao_counts['Guarnição'] = truncar(guarnicao_counts['Guarnição'], 7)  # Limita a Guarnição a 7 caracteres
+
+        # Cria o gráfico de barras com cores alternadas e configurações de fonte
+        fig = grafico_barras(guarnicao_counts['Guarnição'], guarnicao_counts['Total de Atendimentos'], tamanho_texto=font_size_text)
+
+        # Configuração do layout do gráfico
+        fig.update_layout(
+            title=f"Distribuição das Viaturas para a Natureza '{natureza}'" + periodo,
+            xaxis_title="Guarnição",
+            yaxis_title="Quantidade de Atendimentos",
+            yaxis=dict(range=[0, 15]),  # Limite do eixo y para 15
+            xaxis=dict(tickfont=dict(size=font_size_x_axis))  # Define o tamanho da fonte do eixo x
         )
-    ])
-
-    # Configuração do layout do gráfico
-    fig.update_layout(
-        title=f"Distribuição das Viaturas para a Natureza '{natureza}'" + (f" no Dia {dia_selecionado.strftime('%d/%m/%Y')}" if filtro_por_dia else " no Mês"),
-        xaxis_title="Guarnição",
-        yaxis_title="Quantidade de Atendimentos",
-        yaxis=dict(range=[0, 15]),  # Limite do eixo y para 15
-        xaxis=dict(tickfont=dict(size=font_size_x_axis))  # Define o tamanho da fonte do eixo x
-    )
-
-    # Exibe o gráfico no Streamlit
-    st.plotly_chart(fig)
-
-elif natureza != "TODOS" or guarnicao != "TODOS":
-    # Quando um dos filtros está selecionado, exibe as naturezas
-    natureza_counts = df_dia['Natureza'].value_counts().reset_index()
+        return {
+            'tipo': 'viaturas',
+            'total_atendimentos_natureza': total(cubo_dia),  # KPI 1: Quantidade de atendimentos para a natureza selecionada
+            'viatura_mais_ativa': viatura_counts.index[0][:7],  # Limita a guarnição aos primeiros 7 caracteres
+            'total_atendimentos_viatura': viatura_counts.iloc[0],
+            'fig': fig,
+        }
+
+    natureza_counts = totais_por(cubo_dia, 'Natureza').reset_index()
     natureza_counts.columns = ['Natureza', 'Total de Atendimentos']
 
-    # Cria um gráfico de barras para mostrar a distribuição das naturezas
-    fig = go.Figure(data=[
-        go.Bar(
-            x=natureza_counts['Natureza'].str[:6],  # Limita a Natureza a 6 caracteres
-            y=natureza_counts['Total de Atendimentos'],
-            text=natureza_counts['Total de Atendimentos'],
-            textposition='outside',
-            marker_color=colors[:len(natureza_counts)],  # Aplica cores alternadas
-            textfont=dict(size=font_size_text)  # Define o tamanho da fonte dos valores nas barras
+    if natureza != "TODOS" or guarnicao != "TODOS":
+        # Quando um dos filtros está selecionado, exibe as naturezas
+        # Cria um gráfico de barras para mostrar a distribuição das naturezas (Natureza limitada a 6 caracteres)
+        fig = grafico_barras(truncar(natureza_counts['Natureza'], 6), natureza_counts['Total de Atendimentos'], tamanho_texto=font_size_text)
+
+        # Configuração do layout do gráfico
+        fig.update_layout(
+            title=f"Distribuição das Naturezas" + periodo,
+            xaxis_title="Natureza",
+            yaxis_title="Quantidade de Atendimentos",
+            yaxis=dict(range=[0,100]),  # Limite do eixo y para 15
+            xaxis=dict(tickfont=dict(size=font_size_x_axis))  # Define o tamanho da fonte do eixo x
         )
-    ])
-
-    # Configuração do layout do gráfico
-    fig.update_layout(
-        title=f"Distribuição das Naturezas" + (f" no Dia {dia_selecionado.strftime('%d/%m/%Y')}" if filtro_por_dia else " no Mês"),
-        xaxis_title="Natureza",
-        yaxis_title="Quantidade de Atendimentos",
-        yaxis=dict(range=[0,100]),  # Limite do eixo y para 15
-        xaxis=dict(tickfont=dict(size=font_size_x_axis))  # Define o tamanho da fonte do eixo x
-    )
-
-    # Exibe o gráfico no Streamlit
-    st.plotly_chart(fig)
-
-else:
-    # Exibe a tabela com a soma de cada natureza para o dia ou mês
-    natureza_counts = df_dia['Natureza'].value_counts().reset_index()
-    natureza_counts.columns = ['Natureza', 'Total de Atendimentos']
-    st.markdown(f"### Total de Atendimentos por Natureza" + (f" no Dia {dia_selecionado.strftime('%d/%m/%Y')}" if filtro_por_dia else " no Mês"))
-    st.dataframe(natureza_counts)
+        return {'tipo': 'naturezas', 'fig': fig}
+
+    # Sem filtros: tabela com a soma de cada natureza para o dia ou mês
+    return {'tipo': 'tabela', 'natureza_counts': natureza_counts}
+
+# Seção recolhível que acompanha o estado (on_change="rerun"): recolhida, não é calculada
+secao_dia = st.expander("Análise por Dia, Natureza e Viatura", expanded=True, key="secao_dia", on_change="rerun")
+with secao_dia:
+    if visivel(secao_dia):
+        # Opção para habilitar ou desabilitar o filtro por dia (as escolhas são lembradas com a seção recolhida)
+        filtro_por_dia = lembrar("filtro_por_dia", st.checkbox("Habilitar filtro por dia para análise de natureza e viatura", value=lembrado("filtro_por_dia", False)))
+
+        # Filtro de seleção do dia (aparece apenas se o filtro estiver habilitado)
+        if filtro_por_dia:
+            # Dias presentes no cubo do mês, ordenados, formatados diretamente sem uso de `.dt`
+            dias_unicos = sorted(atendimentos_dia.index)
+            dias_formatados = [dia.strftime('%d/%m/%Y') for dia in dias_unicos]
+
+            dia_selecionado = lembrar("dia", st.selectbox("Selecione o Dia para ver a distribuição das naturezas de atendimento:", options=dias_formatados, index=indice_lembrado("dia", dias_formatados)))
+            # Converte o dia selecionado para o formato de data para filtrar o cubo
+            dia_selecionado = pd.to_datetime(dia_selecionado, format='%d/%m/%Y').date()
+            # Filtra os atendimentos para o dia selecionado
+            cubo_dia = fatiar(cubo_mes, {'Dia': dia_selecionado})
+        else:
+            # Sem filtro por dia, usa todos os dados do mês
+            dia_selecionado = None
+            cubo_dia = cubo_mes
+        linhas_saida(len(cubo_dia))
+
+        # KPIs e gráfico recalculados apenas quando os dados, o mês, os filtros ou o dia mudam
+        periodo = f" no Dia {dia_selecionado.strftime('%d/%m/%Y')}" if filtro_por_dia else " no Mês"
+        analise = calcular_secao("analise_dia", [exportacoes, mes, natureza, guarnicao, dia_selecionado],
+                                 lambda: montar_analise_dia(cubo_dia, natureza, guarnicao, periodo))
+
+        if analise['tipo'] == 'viaturas':
+            # Exibindo os KPIs com estilo personalizado
+            col1, col2 = st.columns(2)
+            col1.metric(label=f"Atendimentos de '{natureza}'", value=analise['total_atendimentos_natureza'])
+            col2.metric(
+                label="Viatura com Mais Atendimentos",
+                value=f"{analise['viatura_mais_ativa']}",
+                delta=f"{analise['total_atendimentos_viatura']} atendimentos",
+                delta_color="normal"
+            )
+
+            # Customiza o estilo da legenda do KPI
+            col2.markdown(f"<style> div[data-testid='metric-container'] > label {{ font-size: 14px; }} </style>", unsafe_allow_html=True)
+
+            # Exibe o gráfico no Streamlit
+            st.plotly_chart(analise['fig'])
+
+        elif analise['tipo'] == 'naturezas':
+            # Exibe o gráfico no Streamlit
+            st.plotly_chart(analise['fig'])
+
+        else:
+            # Exibe a tabela com a soma de cada natureza para o dia ou mês
+            st.markdown(f"### Total de Atendimentos por Natureza" + periodo)
+            st.dataframe(analise['natureza_counts'])
 
 # Bloco final: Tabelas de Quantidade de Atendimentos por Turno e Viatura no Mês Selecionado
 # ---------------------------------------------
-
-# Adiciona uma coluna 'Hora' extraída do horário de início para classificação por turno
-df_mes['Hora'] = df_mes['Data/Hora inicial'].dt.time
-
-# Função para categorizar o turno com base na hora
-def definir_turno(horario):
-    if pd.Timestamp("05:30:00").time() <= horario < pd.Timestamp("13:50:00").time():
-        return "Manhã"
-    elif pd.Timestamp("13:50:00").time() <= horario < pd.Timestamp("21:50:00").time():
-        return "Tarde"
-    else:
-        return "Madrugada"
-
-# Aplica a função para criar a coluna 'Turno' no DataFrame filtrado pelo mês
-df_mes['Turno'] = df_mes['Hora'].apply(definir_turno)
-
-# Conta a quantidade total de atendimentos por turno
-total_atendimentos_por_turno = df_mes['Turno'].value_counts().reset_index()
-total_atendimentos_por_turno.columns = ['Turno', 'Total de Atendimentos']
-
-# Conta a quantidade de atendimentos por viatura dentro de cada turno
-atendimentos_por_turno_e_viatura = df_mes.groupby(['Turno', 'Guarnição']).size().reset_index(name='Atendimentos por Viatura')
-
-# Limita a Guarnição aos primeiros 7 caracteres
-atendimentos_por_turno_e_viatura['Guarnição'] = atendimentos_por_turno_e_viatura['Guarnição'].str[:7]
-
-# Ordena os dados para exibição organizada por turno e por quantidade de atendimentos (maior para menor)
-turno_order = ["Manhã", "Tarde", "Madrugada"]
-total_atendimentos_por_turno['Turno'] = pd.Categorical(total_atendimentos_por_turno['Turno'], categories=turno_order, ordered=True)
-atendimentos_por_turno_e_viatura['Turno'] = pd.Categorical(atendimentos_por_turno_e_viatura['Turno'], categories=turno_order, ordered=True)
-
-total_atendimentos_por_turno = total_atendimentos_por_turno.sort_values(by='Turno')
-atendimentos_por_turno_e_viatura = atendimentos_por_turno_e_viatura.sort_values(by=['Turno', 'Atendimentos por Viatura'], ascending=[True, False])
-
-# Divide os dados em tabelas separadas para cada turno e remove a coluna 'Turno'
-tabela_manha = atendimentos_por_turno_e_viatura[atendimentos_por_turno_e_viatura['Turno'] == 'Manhã'].drop(columns=['Turno'])
-tabela_tarde = atendimentos_por_turno_e_viatura[atendimentos_por_turno_e_viatura['Turno'] == 'Tarde'].drop(columns=['Turno'])
-tabela_madrugada = atendimentos_por_turno_e_viatura[atendimentos_por_turno_e_viatura['Turno'] == 'Madrugada'].drop(columns=['Turno'])
-
-# Obtém o total de atendimentos para cada turno, verificando se existe algum dado
-tabela_manha_total = total_atendimentos_por_turno[total_atendimentos_por_turno['Turno'] == 'Manhã']['Total de Atendimentos'].values
-tabela_tarde_total = total_atendimentos_por_turno[total_atendimentos_por_turno['Turno'] == 'Tarde']['Total de Atendimentos'].values
-tabela_madrugada_total = total_atendimentos_por_turno[total_atendimentos_por_turno['Turno'] == 'Madrugada']['Total de Atendimentos'].values
-
-# Exibe as tabelas em colunas lado a lado com verificação para evitar erros
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    if tabela_manha_total.size > 0:
-        st.markdown(f"### Turno da Manhã ({tabela_manha_total[0]} atendimentos)")
-        st.dataframe(tabela_manha)
-    else:
-        st.markdown("### Turno da Manhã")
-        st.write("Nenhum atendimento registrado.")
-
-with col2:
-    if tabela_tarde_total.size > 0:
-        st.markdown(f"### Turno da Tarde ({tabela_tarde_total[0]} atendimentos)")
-        st.dataframe(tabela_tarde)
-    else:
-        st.markdown("### Turno da Tarde")
-        st.write("Nenhum atendimento registrado.")
-
-with col3:
-    if tabela_madrugada_total.size > 0:
-        st.markdown(f"### Turno da Madrugada ({tabela_madrugada_total[0]} atendimentos)")
-        st.dataframe(tabela_madrugada)
-    else:
-        st.markdown("### Turno da Madrugada")
-        st.write("Nenhum atendimento registrado.")
+bloco("Bloco final: Tabelas de Quantidade de Atendimentos por Turno e Viatura no Mês Selecionado", linhas_entrada=len(cubo_mes))
+
+secao_turnos = st.expander("Atendimentos por Turno e Viatura", expanded=True, key="secao_turnos", on_change="rerun")
+with secao_turnos:
+    if visivel(secao_turnos):
+        tabelas_turno = calcular_secao("tabelas_turno", [exportacoes, mes, natureza, guarnicao], lambda: montar_tabelas_turno(cubo_mes))
+
+        # Exibe as tabelas em colunas lado a lado com verificação para evitar erros
+        for coluna, (turno, total_turno, tabela_turno) in zip(st.columns(3), tabelas_turno):
+            with coluna:
+                if total_turno is not None:
+                    st.markdown(f"### Turno da {turno} ({total_turno} atendimentos)")
+                    st.dataframe(tabela_turno)
+                else:
+                    st.markdown(f"### Turno da {turno}")
+                    st.write("Nenhum atendimento registrado.")
 
 # Bloco 7: Filtro de Turno, KPIs e Visualizações Condicionais
 # ---------------------------------------------
-
-# Converte 'Data/Hora inicial' para datetime, tratando valores inválidos como NaT (se ainda não estiver em datetime)
-df_mes['Data/Hora inicial'] = pd.to_datetime(df_mes['Data/Hora inicial'], errors='coerce')
-
-# Cria a coluna 'Dia' extraindo apenas a data (se ainda não estiver presente) e elimina valores nulos para evitar problemas com NaT
-if 'Dia' not in df_mes.columns:
-    df_mes['Dia'] = pd.to_datetime(df_mes['Data/Hora inicial'].dt.date, errors='coerce')
-
-# Cria a coluna 'Turno' com base no horário da 'Data/Hora inicial'
-def definir_turno(horario):
-    if pd.Timestamp("05:30:00").time() <= horario < pd.Timestamp("13:50:00").time():
-        return "Manhã"
-    elif pd.Timestamp("13:50:00").time() <= horario < pd.Timestamp("21:50:00").time():
-        return "Tarde"
-    else:
-        return "Madrugada"
-
-df_mes['Hora'] = df_mes['Data/Hora inicial'].dt.time
-df_mes['Turno'] = df_mes['Hora'].apply(definir_turno)
+bloco("Bloco 7: Filtro de Turno, KPIs e Visualizações Condicionais", linhas_entrada=len(cubo_mes))
 
 # Filtro de Turno na barra lateral
 turno_selecionado = st.sidebar.selectbox(
     "Selecione o Turno:",
-    options=["TODOS", "Manhã", "Tarde", "Madrugada"]
+    options=["TODOS"] + ordem_turnos()
 )
 
-# Filtra os dados com base no turno selecionado
-if turno_selecionado != "TODOS":
-    df_turno = df_mes[df_mes['Turno'] == turno_selecionado]
-else:
-    df_turno = df_mes
+# Filtra o cubo com base no turno selecionado
+cubo_turno = fatiar(cubo_mes, {'Turno': turno_selecionado})
+linhas_saida(len(cubo_turno))
 
 # Exibe a tabela, KPIs e o gráfico apenas quando um turno específico é selecionado
 if turno_selecionado != "TODOS":
     # Tabela com a soma das naturezas para o turno selecionado
-    natureza_counts = df_turno['Natureza'].value_counts().reset_index()
+    natureza_counts = totais_por(cubo_turno, 'Natureza').reset_index()
     natureza_counts.columns = ['Natureza', 'Total de Atendimentos']
     
     # KPIs
-    quantidade_atendimentos_turno = df_turno.shape[0]
+    quantidade_atendimentos_turno = total(cubo_turno)
     natureza_mais_atendida = natureza_counts.iloc[0]['Natureza'] if not natureza_counts.empty else "N/A"
     quantidade_natureza_mais_atendida = int(natureza_counts.iloc[0]['Total de Atendimentos']) if not natureza_counts.empty else 0  # Conversão para int
     
-    viatura_mais_ativa_counts = df_turno['Guarnição'].value_counts()
-    viatura_mais_ativa = viatura_mais_ativa_counts.idxmax()[:7] if not viatura_mais_ativa_counts.empty else "N/A"
+    viatura_mais_ativa_counts = totais_por(cubo_turno, 'Guarnição')
+    viatura_mais_ativa = viatura_mais_ativa_counts.index[0][:7] if not viatura_mais_ativa_counts.empty else "N/A"
     
     # Verificação para garantir que há dados para a viatura mais ativa antes de calcular a natureza
+    # (a busca usa o nome completo da guarnição; o truncado serve apenas para exibição)
     if viatura_mais_ativa != "N/A":
-        natureza_mais_atendida_viatura_series = df_turno[df_turno['Guarnição'] == viatura_mais_ativa]['Natureza'].mode()
-        natureza_mais_atendida_viatura = natureza_mais_atendida_viatura_series[0] if not natureza_mais_atendida_viatura_series.empty else "N/A"
+        naturezas_viatura = totais_por(fatiar(cubo_turno, {'Guarnição': viatura_mais_ativa_counts.index[0]}), 'Natureza')
+        natureza_mais_atendida_viatura = naturezas_viatura.index[0] if not naturezas_viatura.empty else "N/A"
     else:
         natureza_mais_atendida_viatura = "N/A"
 
@@ -422,22 +305,12 @@ if turno_selecionado != "TODOS":
     st.dataframe(natureza_counts)
 
     # Gráfico com a distribuição de atendimentos por dia no mês
-    atendimentos_por_dia = df_turno.groupby('Dia').size().reset_index(name='Total de Atendimentos')
-    atendimentos_por_dia['Dia'] = pd.to_datetime(atendimentos_por_dia['Dia'], errors='coerce')  # Garante que 'Dia' está em datetime
+    # ('Dia' já vem como data da dimensão de tempo montada na carga; só os dias presentes são formatados)
+    atendimentos_por_dia = totais_por(cubo_turno, 'Dia').sort_index().reset_index(name='Total de Atendimentos')
     max_valor_dia = atendimentos_por_dia['Total de Atendimentos'].max() + 10
 
     # Gráfico com cores alternadas (verde claro e azul claro)
-    colors = ["lightgreen" if i % 2 == 0 else "lightblue" for i in range(len(atendimentos_por_dia))]
-    
-    fig = go.Figure(data=[
-        go.Bar(
-            x=atendimentos_por_dia['Dia'].dt.strftime('%d/%m'),
-            y=atendimentos_por_dia['Total de Atendimentos'],
-            text=atendimentos_por_dia['Total de Atendimentos'],
-            textposition='outside',
-            marker_color=colors
-        )
-    ])
+    fig = grafico_barras([dia.strftime('%d/%m') for dia in atendimentos_por_dia['Dia']], atendimentos_por_dia['Total de Atendimentos'])
     
     fig.update_layout(
         title=f"Distribuição de Atendimentos por Dia no Turno {turno_selecionado}",
@@ -450,3 +323,6 @@ if turno_selecionado != "TODOS":
 else:
     st.markdown("### Exibindo dados completos do mês, sem filtro por turno.")
     # Aqui você pode adicionar um resumo geral ou outros componentes caso deseje mostrar algo para "TODOS"
+
+# Fim da instrumentação: painel de depuração e log JSONL (apenas com ?debug=1)
+finalizar_instrumentacao()
@@ -1,10 +1,19 @@
 # --- Importações e Configurações Iniciais ---
 import streamlit as st
 import pandas as pd
-import re
-import plotly.express as px
-from datetime import date, timedelta, datetime
 import numpy as np
+import os
+from ingestao import carregar_planilha, hash_arquivo
+from duracao import converter_duracoes
+from graficos import CORES_POR_CATEGORIA, grafico_barras
+from tabela_paginada import exibir_tabela_paginada
+from esquema import normalizar_esquema, preencher_categoria, truncar
+from filtros import construir_indice_filtros, filtrar
+from mapa_memoria import carregar_mapeado
+from dimensao_tempo import COLUNAS_TEMPO, construir_dimensao_tempo, construir_rollups, datas_do_dia, intervalo_mes, rotulo_mes
+from instrumentacao import bloco, finalizar_instrumentacao, iniciar_instrumentacao, linhas_saida
+from secoes import calcular_secao, indice_lembrado, lembrar, visivel
+from exportacao import exibir_exportacao
 
 # Corrige a depreciação do tipo np.bool_
 array = np.array([True, False, True], dtype=np.bool_)
@@ -12,8 +21,12 @@ array = np.array([True, False, True], dtype=np.bool_)
 # --- Configuração da Página ---
 st.set_page_config(page_title="Dashboard de Ocorrências", layout="wide")
 
+# Instrumentação opcional por bloco (?debug=1 na URL)
+iniciar_instrumentacao("Ocorrencias.py")
+
 
 # ====================== BLOCO 1: Função para Configuração de CSS ======================
+bloco("BLOCO 1: Função para Configuração de CSS")
 def aplicar_estilo():
     st.markdown("""
         <style>
@@ -61,41 +74,55 @@ aplicar_estilo()
 
 
 # ====================== BLOCO 2: Exibir Logo e Cabeçalho ======================
+bloco("BLOCO 2: Exibir Logo e Cabeçalho")
 st.markdown("### Dashboard de Ocorrências Cidade de Paulinia")
 st.image("logo.png", width=150)
 
 
 # ====================== BLOCO 3: Função para Carregar Dados ======================
-@st.cache_data
-def carregar_dados(file_path):
-    return pd.read_excel(file_path, sheet_name='Planilha1')
+bloco("BLOCO 3: Função para Carregar Dados")
+# Preparação na carga: Natureza, Guarnição e Endereço do fato como categorias e a dimensão de tempo
+# (chaves inteiras de hora, dia, semana ISO, mês e turno) calculada uma única vez
+def preparar_dados(file_path):
+    df = normalizar_esquema(carregar_planilha(file_path, sheet_name='Planilha1'))
+    df[COLUNAS_TEMPO] = construir_dimensao_tempo(df['Data/Hora inicial'])
+    return df
+
+# O DataFrame fica em um arquivo Arrow mapeado em memória, compartilhado (somente leitura) por todas as sessões
+# (a versão inclui o esquema, para não reaproveitar arquivos gravados sem a dimensão de tempo)
+@st.cache_resource
+def carregar_dados(file_path, versao_dados):
+    nome = "ocorrencias_" + os.path.splitext(os.path.basename(file_path))[0]
+    return carregar_mapeado(nome, (versao_dados, 'dimensao_tempo'), lambda: preparar_dados(file_path))
+
+# Agregados por balde de tempo (contagem por hora, dia, semana ISO, mês e turno), montados uma vez por versão dos dados
+# Somente leitura: compartilhados entre as sessões sem cópia por execução, como o índice de filtros
+@st.cache_resource
+def carregar_rollups(versao_dados, _df):
+    return construir_rollups(_df[COLUNAS_TEMPO])
 
 file_path = "Rel Outubro.xlsx"
-df = carregar_dados(file_path)
-
-
-# ====================== BLOCO 4: Função de Conversão da Duração ======================
-def converter_duracao(duracao):
-    if isinstance(duracao, str):
-        duracao = duracao.strip()
-        horas = minutos = 0
-        match = re.match(r'(?:(\d+)h)?\s*(\d+)min?', duracao)
-        if match:
-            if match.group(1):
-                horas = int(match.group(1))
-            minutos = int(match.group(2))
-        return horas * 60 + minutos
-    return 0
-
-# Aplicar conversão e ajustes no DataFrame
-df['Duração (min)'] = df['Duração'].apply(converter_duracao)
-df['Data/Hora inicial'] = pd.to_datetime(df['Data/Hora inicial']).dt.date
-df['Guarnição'] = df['Guarnição'].str[:7]
+versao_dados = hash_arquivo(file_path)  # Entrada das seções: quando a planilha muda, todas são recalculadas
+df = carregar_dados(file_path, versao_dados).copy(deep=False)  # Cópia rasa: as colunas alteradas abaixo não afetam as outras sessões
+rollups = carregar_rollups(versao_dados, df)
+linhas_saida(len(df))
+
+
+# ====================== BLOCO 4: Conversão da Duração ======================
+bloco("BLOCO 4: Conversão da Duração", linhas_entrada=len(df))
+# Conversão vetorizada; sem texto de duração, usa a diferença entre Data/Hora final e inicial
+df['Duração (min)'], duracoes_nao_convertidas = converter_duracoes(df['Duração'], df['Data/Hora inicial'], df['Data/Hora final'])
+
+# Ajustes no DataFrame
+df['Data/Hora inicial'] = datas_do_dia(df['Chave Dia'])  # Apenas a data (meia-noite), lida da dimensão de tempo
+df['Guarnição'] = truncar(df['Guarnição'], 7)  # Truncamento feito uma vez nas categorias
 df_reduzido = df[['Data/Hora inicial', 'Guarnição', 'Natureza', 'Endereço do fato', 'Duração (min)']]
-df_reduzido['Guarnição'] = df_reduzido['Guarnição'].fillna("Sem Necessidade").astype(str)
+df_reduzido['Guarnição'] = preencher_categoria(df_reduzido['Guarnição'], "Sem Necessidade")
+linhas_saida(len(df_reduzido))
 
 
 # ====================== BLOCO 5: Seção de Resumo Geral ======================
+bloco("BLOCO 5: Seção de Resumo Geral", linhas_entrada=len(df_reduzido))
 st.markdown("## Visão Geral")
 col1, col2, col3 = st.columns(3)
 valor_total_atendimentos = df_reduzido.shape[0]
@@ -105,183 +132,223 @@ with col1:
     st.markdown(f'<div class="card">Total de Atendimentos: {valor_total_atendimentos}</div>', unsafe_allow_html=True)
 with col2:
     st.markdown(f'<div class="card">Média de Duração (min): {media_duracao_total:.2f}</div>', unsafe_allow_html=True)
+    if duracoes_nao_convertidas:
+        st.caption(f"{duracoes_nao_convertidas} atendimentos sem duração informada foram desconsiderados na média.")
 with col3:
     top_natureza = df_reduzido['Natureza'].value_counts().idxmax()
     st.markdown(f'<div class="card">Natureza Mais Frequente: {top_natureza}</div>', unsafe_allow_html=True)
 
 
 # ====================== BLOCO 6: Visão Geral - Totais de Atendimentos ======================
-tabs = st.tabs(["Visão Geral", "Filtros e Relatórios"])
-with tabs[0]:
-    st.markdown("### Totais de Atendimentos")
-    
-    with st.spinner("Carregando dados..."):
-        total_por_natureza = df_reduzido.groupby('Natureza').size().reset_index(name='Total de Ocorrências').sort_values(by='Total de Ocorrências', ascending=False)
-        total_por_viatura_completo = df_reduzido.groupby('Guarnição').size().reset_index(name='Total de Atendimentos').sort_values(by='Total de Atendimentos', ascending=False)
+bloco("BLOCO 6: Visão Geral - Totais de Atendimentos", linhas_entrada=len(df_reduzido))
+# As abas rastreiam qual está aberta (on_change="rerun"): as seções da aba oculta não são calculadas nem exibidas
+aba_visao_geral, aba_filtros = st.tabs(["Visão Geral", "Filtros e Relatórios"], key="aba_ocorrencias", on_change="rerun")
+with aba_visao_geral:
+    if visivel(aba_visao_geral):
+        st.markdown("### Totais de Atendimentos")
+
+        with st.spinner("Carregando dados..."):
+            total_por_natureza, total_por_viatura_completo = calcular_secao("totais", [versao_dados], lambda: (
+                df_reduzido.groupby('Natureza').size().reset_index(name='Total de Ocorrências').sort_values(by='Total de Ocorrências', ascending=False),
+                df_reduzido.groupby('Guarnição').size().reset_index(name='Total de Atendimentos').sort_values(by='Total de Atendimentos', ascending=False),
+            ))
 
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown(f'<div class="card">Total de Atendimentos por Natureza</div>', unsafe_allow_html=True)
-        st.dataframe(total_por_natureza.style.format({"Total de Ocorrências": "{:.0f}"}), height=450)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f'<div class="card">Total de Atendimentos por Natureza</div>', unsafe_allow_html=True)
+            st.dataframe(total_por_natureza.style.format({"Total de Ocorrências": "{:.0f}"}), height=450)
 
-    with col2:
-        st.markdown('<div class="card">Total de Atendimentos por Viatura</div>', unsafe_allow_html=True)
-        st.dataframe(total_por_viatura_completo, height=450)
+        with col2:
+            st.markdown('<div class="card">Total de Atendimentos por Viatura</div>', unsafe_allow_html=True)
+            st.dataframe(total_por_viatura_completo, height=450)
 
 
 # ====================== BLOCO 8: Gráfico de Atendimentos por Dia ======================
-st.markdown("### Atendimentos Diários")
-
-# Garantir que 'Data/Hora inicial' esteja no formato datetime
-df_reduzido['Data/Hora inicial'] = pd.to_datetime(df_reduzido['Data/Hora inicial'])
-
-# Agrupar os dados por data e contar as ocorrências
-atendimentos_por_dia = df_reduzido.groupby('Data/Hora inicial').size().reset_index(name='Quantidade de Atendimentos').sort_values(by='Data/Hora inicial')
-
-# Adicionar uma coluna para exibir apenas o dia
-atendimentos_por_dia['Dia'] = atendimentos_por_dia['Data/Hora inicial'].dt.strftime('%d')
-
-# Criar gráfico de barras
-fig_atendimentos_dia = px.bar(
-    atendimentos_por_dia,
-    x='Data/Hora inicial',
-    y='Quantidade de Atendimentos',
-    title='Quantidade de Atendimentos por Dia',
-    labels={'Data/Hora inicial': 'Data', 'Quantidade de Atendimentos': 'Atendimentos'},
-    color='Data/Hora inicial', 
-    text=atendimentos_por_dia['Quantidade de Atendimentos']
-)
-
-# Atualizar layout e limitar o eixo y a um máximo de 120
-fig_atendimentos_dia.update_traces(texttemplate='%{text}', textposition='outside', textfont=dict(size=18))
-fig_atendimentos_dia.update_layout(
-    plot_bgcolor='rgba(0,0,0,0)',
-    paper_bgcolor='rgba(0,0,0,0)',
-    xaxis_title='Data',
-    yaxis_title='Quantidade de Atendimentos',
-    yaxis=dict(range=[0, 120]),  # Limite do eixo y definido para 120
-    title_font_size=20,
-    title_font_family='Verdana',
-    showlegend=False,
-    height=500,
-    width=1000,
-    xaxis=dict(tickvals=atendimentos_por_dia['Data/Hora inicial'], ticktext=atendimentos_por_dia['Dia'])
-)
-
-# Exibir o gráfico
-st.plotly_chart(fig_atendimentos_dia, use_container_width=True)
+bloco("BLOCO 8: Gráfico de Atendimentos por Dia", linhas_entrada=len(df_reduzido))
+def montar_grafico_atendimentos_dia(por_dia):
+    # Contagem por dia lida dos agregados da dimensão de tempo (chave AAAAMMDD convertida em data)
+    atendimentos_por_dia = pd.DataFrame({
+        'Data/Hora inicial': datas_do_dia(por_dia.index).to_numpy(),
+        'Quantidade de Atendimentos': por_dia.to_numpy(),
+    })
+
+    # Adicionar uma coluna para exibir apenas o dia
+    atendimentos_por_dia['Dia'] = atendimentos_por_dia['Data/Hora inicial'].dt.strftime('%d')
+
+    # Criar gráfico de barras (um único trace, com uma cor por dia)
+    fig_atendimentos_dia = grafico_barras(
+        atendimentos_por_dia['Data/Hora inicial'],
+        atendimentos_por_dia['Quantidade de Atendimentos'],
+        paleta=CORES_POR_CATEGORIA,
+        tamanho_texto=18
+    )
+
+    # Atualizar layout e limitar o eixo y a um máximo de 120
+    fig_atendimentos_dia.update_layout(
+        title='Quantidade de Atendimentos por Dia',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_title='Data',
+        yaxis_title='Quantidade de Atendimentos',
+        yaxis=dict(range=[0, 120]),  # Limite do eixo y definido para 120
+        title_font_size=20,
+        title_font_family='Verdana',
+        showlegend=False,
+        height=500,
+        width=1000,
+        xaxis=dict(tickvals=atendimentos_por_dia['Data/Hora inicial'], ticktext=atendimentos_por_dia['Dia'])
+    )
+    return fig_atendimentos_dia
+
+with aba_visao_geral:
+    if visivel(aba_visao_geral):
+        st.markdown("### Atendimentos Diários")
+
+        # Exibir o gráfico (montado novamente apenas quando os dados mudam)
+        fig_atendimentos_dia = calcular_secao("grafico_dia", [versao_dados], lambda: montar_grafico_atendimentos_dia(rollups['Dia']))
+        st.plotly_chart(fig_atendimentos_dia, use_container_width=True)
 
 
 
 # ====================== BLOCO 9: Filtros de Mês, Natureza e Viatura ======================
-st.markdown("### Filtros de Mês, Natureza e Viatura")
-
-# Seleção de Mês Simplificada
-st.markdown("#### Selecione o Mês")
-meses_disponiveis = sorted(df_reduzido['Data/Hora inicial'].dt.strftime('%Y-%m').unique())
-mes_selecionado = st.selectbox("Mês", options=meses_disponiveis, format_func=lambda x: datetime.strptime(x, '%Y-%m').strftime('%B %Y'))
-
-# Converter o mês selecionado para o primeiro e o último dia do mês
-ano_mes = datetime.strptime(mes_selecionado, '%Y-%m')
-primeiro_dia_mes = ano_mes.replace(day=1)
-ultimo_dia_mes = (ano_mes.replace(month=ano_mes.month % 12 + 1, day=1) - timedelta(days=1))
-
-# Filtros de Natureza e Viatura
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("#### Filtrar por Natureza")
-    naturezas_ordenadas = ["Todas"] + df_reduzido['Natureza'].value_counts().index.tolist()
-    natureza_selecionada = st.selectbox("Escolha uma Natureza", options=naturezas_ordenadas, index=0)
-
-with col2:
-    st.markdown("#### Filtrar por Viatura")
-    viaturas_disponiveis = ["Todas"] + sorted(df_reduzido['Guarnição'].unique())
-    viatura_selecionada = st.selectbox("Escolha uma Viatura", options=viaturas_disponiveis, index=0)
-
-# Aplicar os filtros de Mês, Natureza e Viatura ao DataFrame
-ocorrencias_filtradas = df_reduzido[
-    (df_reduzido['Data/Hora inicial'] >= primeiro_dia_mes) & 
-    (df_reduzido['Data/Hora inicial'] <= ultimo_dia_mes) & 
-    (df_reduzido['Natureza'].isin([natureza_selecionada] if natureza_selecionada != "Todas" else df_reduzido['Natureza'].unique())) &
-    (df_reduzido['Guarnição'].isin([viatura_selecionada] if viatura_selecionada != "Todas" else df_reduzido['Guarnição'].unique()))
-]
-
-# Exibir o Relatório Filtrado com base nos filtros aplicados
-st.markdown("### Relatório Filtrado")
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.markdown(f'<div class="card">Total de Atendimentos: {len(ocorrencias_filtradas)}</div>', unsafe_allow_html=True)
-
-with col2:
-    # Viatura com maior número de atendimentos
-    viatura_mais_frequente = ocorrencias_filtradas['Guarnição'].value_counts().idxmax() if not ocorrencias_filtradas.empty else "N/A"
-    st.markdown(f'<div class="card">Viatura com Mais Atendimentos: {viatura_mais_frequente}</div>', unsafe_allow_html=True)
-
-with col3:
-    # Natureza mais frequente nas ocorrências filtradas
-    natureza_mais_frequente = ocorrencias_filtradas['Natureza'].value_counts().idxmax() if not ocorrencias_filtradas.empty else "N/A"
-    st.markdown(f'<div class="card">Natureza Mais Frequente: {natureza_mais_frequente}</div>', unsafe_allow_html=True)
-
-# Exibir o DataFrame filtrado com largura aumentada e data formatada como DD/MM
-ocorrencias_filtradas['Data/Hora inicial'] = ocorrencias_filtradas['Data/Hora inicial'].dt.strftime('%d/%m')
-st.dataframe(ocorrencias_filtradas, height=500, width=1000)
-
-# Mostrar tabela extra de natureza quando apenas uma viatura específica é selecionada e natureza = "Todas"
-if natureza_selecionada == "Todas" and viatura_selecionada != "Todas":
-    # Agrupar por natureza para a viatura selecionada e exibir o total de ocorrências por natureza
-    total_por_natureza_viatura = ocorrencias_filtradas.groupby('Natureza').size().reset_index(name='Total de Ocorrências').sort_values(by='Total de Ocorrências', ascending=False)
-
-    # Exibir tabela adicional ao lado da tabela principal
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown(f'<div class="card">Total de Atendimentos por Natureza para a Viatura {viatura_selecionada}</div>', unsafe_allow_html=True)
-        st.dataframe(total_por_natureza_viatura.style.format({"Total de Ocorrências": "{:.0f}"}), height=450)
+bloco("BLOCO 9: Filtros de Mês, Natureza e Viatura", linhas_entrada=len(df_reduzido))
+# Índice de filtros (frame ordenado por data + posições por Natureza/Guarnição), montado uma vez por versão dos dados
+# O DataFrame não entra na chave do cache (parâmetro com "_"): ele é determinado pela versão
+# Compartilhado entre as sessões sem cópia (somente leitura): cada filtro copia apenas as linhas do resultado
+@st.cache_resource
+def carregar_indice_filtros(versao_dados, _df_reduzido):
+    return construir_indice_filtros(_df_reduzido, 'Data/Hora inicial', ['Natureza', 'Guarnição'])
+
+# Relatório filtrado: ocorrências do mês/natureza/viatura, versão para exibição (data DD/MM) e indicadores
+def montar_relatorio_filtrado(indice_filtros, primeiro_dia_mes, ultimo_dia_mes, natureza_selecionada, viatura_selecionada):
+    # Aplicar os filtros de Mês, Natureza e Viatura ("Todas" não filtra; o mês é buscado por busca binária nas datas)
+    ocorrencias_filtradas = filtrar(
+        indice_filtros,
+        inicio=primeiro_dia_mes,
+        fim=ultimo_dia_mes,
+        igualdades={'Natureza': natureza_selecionada, 'Guarnição': viatura_selecionada}
+    )
+    relatorio = {
+        'filtradas': ocorrencias_filtradas,
+        # Data formatada como DD/MM para a tabela e para o gráfico diário
+        'exibicao': ocorrencias_filtradas.assign(**{'Data/Hora inicial': ocorrencias_filtradas['Data/Hora inicial'].dt.strftime('%d/%m')}),
+        # Viatura com maior número de atendimentos e natureza mais frequente nas ocorrências filtradas
+        'viatura_mais_frequente': ocorrencias_filtradas['Guarnição'].value_counts().idxmax() if not ocorrencias_filtradas.empty else "N/A",
+        'natureza_mais_frequente': ocorrencias_filtradas['Natureza'].value_counts().idxmax() if not ocorrencias_filtradas.empty else "N/A",
+        'por_natureza': None,
+    }
+    # Tabela extra de natureza quando apenas uma viatura específica é selecionada e natureza = "Todas"
+    if natureza_selecionada == "Todas" and viatura_selecionada != "Todas":
+        relatorio['por_natureza'] = ocorrencias_filtradas.groupby('Natureza').size().reset_index(name='Total de Ocorrências').sort_values(by='Total de Ocorrências', ascending=False)
+    return relatorio
+
+with aba_filtros:
+    if visivel(aba_filtros):
+        st.markdown("### Filtros de Mês, Natureza e Viatura")
+
+        # Seleção de Mês Simplificada (as escolhas são lembradas enquanto a aba está oculta)
+        st.markdown("#### Selecione o Mês")
+        # (meses com ocorrências, em ordem crescente, lidos dos agregados por chave AAAAMM)
+        meses_disponiveis = rollups['Mês'].index.tolist()
+        mes_selecionado = lembrar("mes", st.selectbox("Mês", options=meses_disponiveis, index=indice_lembrado("mes", meses_disponiveis), format_func=rotulo_mes))
+
+        # Converter o mês selecionado para o primeiro e o último dia do mês
+        primeiro_dia_mes, ultimo_dia_mes = intervalo_mes(mes_selecionado)
+
+        # Filtros de Natureza e Viatura
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("#### Filtrar por Natureza")
+            naturezas_ordenadas = ["Todas"] + df_reduzido['Natureza'].value_counts().index.tolist()
+            natureza_selecionada = lembrar("natureza", st.selectbox("Escolha uma Natureza", options=naturezas_ordenadas, index=indice_lembrado("natureza", naturezas_ordenadas)))
+
+        with col2:
+            st.markdown("#### Filtrar por Viatura")
+            viaturas_disponiveis = ["Todas"] + sorted(df_reduzido['Guarnição'].unique())
+            viatura_selecionada = lembrar("viatura", st.selectbox("Escolha uma Viatura", options=viaturas_disponiveis, index=indice_lembrado("viatura", viaturas_disponiveis)))
+
+        # Relatório recalculado apenas quando os dados ou algum dos três filtros mudam
+        filtros_selecionados = [versao_dados, mes_selecionado, natureza_selecionada, viatura_selecionada]
+        relatorio = calcular_secao("relatorio_filtrado", filtros_selecionados, lambda: montar_relatorio_filtrado(
+            carregar_indice_filtros(versao_dados, df_reduzido), primeiro_dia_mes, ultimo_dia_mes, natureza_selecionada, viatura_selecionada
+        ))
+        ocorrencias_filtradas = relatorio['filtradas']
+        linhas_saida(len(ocorrencias_filtradas))
+
+        # Exibir o Relatório Filtrado com base nos filtros aplicados
+        st.markdown("### Relatório Filtrado")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.markdown(f'<div class="card">Total de Atendimentos: {len(ocorrencias_filtradas)}</div>', unsafe_allow_html=True)
+
+        with col2:
+            st.markdown(f'<div class="card">Viatura com Mais Atendimentos: {relatorio["viatura_mais_frequente"]}</div>', unsafe_allow_html=True)
+
+        with col3:
+            st.markdown(f'<div class="card">Natureza Mais Frequente: {relatorio["natureza_mais_frequente"]}</div>', unsafe_allow_html=True)
+
+        # Exibir o DataFrame filtrado com largura aumentada e data formatada como DD/MM (paginado no servidor)
+        exibir_tabela_paginada(relatorio['exibicao'], "ocorrencias_filtradas", height=500, width=1000)
+
+        # Exportação do resultado filtrado (gerada em segundo plano; a data sai completa, não como DD/MM)
+        exibir_exportacao(ocorrencias_filtradas, "exportar_filtradas", f"ocorrencias_{mes_selecionado}_{natureza_selecionada}_{viatura_selecionada}",
+                          tuple(filtros_selecionados))
+
+        # Mostrar tabela extra de natureza quando apenas uma viatura específica é selecionada e natureza = "Todas"
+        if relatorio['por_natureza'] is not None:
+            # Exibir tabela adicional ao lado da tabela principal
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown(f'<div class="card">Total de Atendimentos por Natureza para a Viatura {viatura_selecionada}</div>', unsafe_allow_html=True)
+                st.dataframe(relatorio['por_natureza'].style.format({"Total de Ocorrências": "{:.0f}"}), height=450)
 
 
 # ====================== BLOCO 10: Gráfico de Atendimentos Diários da Natureza Selecionada ======================
-st.markdown("### Gráfico de Atendimentos Diários")
-
-# Filtrar para obter apenas as ocorrências da natureza e viatura selecionadas por dia
-atendimentos_diarios = ocorrencias_filtradas.groupby('Data/Hora inicial').size().reset_index(name='Quantidade de Atendimentos')
-
-# Configuração do tamanho da fonte para o texto acima das barras e da legenda
-tamanho_fonte_texto = 25  # Ajuste o tamanho da fonte para os valores no topo das barras
-tamanho_fonte_legenda = 20  # Ajuste o tamanho da fonte da legenda
-
-# Criar gráfico de barras com cores diferentes para cada barra
-fig_natureza_dia = px.bar(
-    atendimentos_diarios,
-    x='Data/Hora inicial',
-    y='Quantidade de Atendimentos',
-    title=f'Quantidade de Atendimentos Diários - Natureza: {natureza_selecionada if natureza_selecionada != "Todas" else "Todas"}',
-    labels={'Data/Hora inicial': 'Data', 'Quantidade de Atendimentos': 'Atendimentos'},
-    color='Data/Hora inicial',
-    text='Quantidade de Atendimentos'
-)
-
-# Configurações de layout do gráfico
-fig_natureza_dia.update_traces(
-    texttemplate='%{text}',  # Quantidade de atendimentos no topo
-    textposition='outside',
-    textfont=dict(size=tamanho_fonte_texto)  # Define o tamanho da fonte do texto acima das barras
-)
-fig_natureza_dia.update_layout(
-    plot_bgcolor='rgba(0,0,0,0)',
-    paper_bgcolor='rgba(0,0,0,0)',
-    xaxis_title='Data',
-    yaxis_title='Quantidade de Atendimentos',
-    yaxis=dict(range=[0, 120]),  # Define o limite superior do eixo y para 120
-    showlegend=False,  # Ativa a legenda
-    width=1000,
-    legend=dict(font=dict(size=tamanho_fonte_legenda))  # Define o tamanho da fonte da legenda
-)
-
-# Exibir o gráfico
-st.plotly_chart(fig_natureza_dia, use_container_width=True)
+bloco("BLOCO 10: Gráfico de Atendimentos Diários da Natureza Selecionada")
+def montar_grafico_diario_filtrado(ocorrencias_exibicao, natureza_selecionada):
+    # Filtrar para obter apenas as ocorrências da natureza e viatura selecionadas por dia
+    atendimentos_diarios = ocorrencias_exibicao.groupby('Data/Hora inicial').size().reset_index(name='Quantidade de Atendimentos')
+
+    # Configuração do tamanho da fonte para o texto acima das barras e da legenda
+    tamanho_fonte_texto = 25  # Ajuste o tamanho da fonte para os valores no topo das barras
+    tamanho_fonte_legenda = 20  # Ajuste o tamanho da fonte da legenda
+
+    # Criar gráfico de barras com cores diferentes para cada barra (um único trace com array de cores)
+    # Quantidade de atendimentos no topo, com o tamanho de fonte definido acima
+    fig_natureza_dia = grafico_barras(
+        atendimentos_diarios['Data/Hora inicial'],
+        atendimentos_diarios['Quantidade de Atendimentos'],
+        paleta=CORES_POR_CATEGORIA,
+        tamanho_texto=tamanho_fonte_texto
+    )
+
+    # Configurações de layout do gráfico
+    fig_natureza_dia.update_layout(
+        title=f'Quantidade de Atendimentos Diários - Natureza: {natureza_selecionada if natureza_selecionada != "Todas" else "Todas"}',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_title='Data',
+        yaxis_title='Quantidade de Atendimentos',
+        yaxis=dict(range=[0, 120]),  # Define o limite superior do eixo y para 120
+        showlegend=False,  # Ativa a legenda
+        width=1000,
+        legend=dict(font=dict(size=tamanho_fonte_legenda))  # Define o tamanho da fonte da legenda
+    )
+    return atendimentos_diarios, fig_natureza_dia
+
+with aba_filtros:
+    if visivel(aba_filtros):
+        st.markdown("### Gráfico de Atendimentos Diários")
+
+        # Exibir o gráfico (montado novamente apenas quando os dados ou os filtros mudam)
+        atendimentos_diarios, fig_natureza_dia = calcular_secao("grafico_diario_filtrado", filtros_selecionados, lambda: montar_grafico_diario_filtrado(relatorio['exibicao'], natureza_selecionada))
+        linhas_saida(len(atendimentos_diarios))
+        st.plotly_chart(fig_natureza_dia, use_container_width=True)
 
 
 # ====================== BLOCO 10: Função de Rodapé ======================
+bloco("BLOCO 10: Função de Rodapé")
 def exibir_rodape():
     st.markdown("""
         ---
@@ -291,3 +358,6 @@ def exibir_rodape():
 
 # Exibir o rodapé
 exibir_rodape()
+
+# Fim da instrumentação: painel de depuração e log JSONL (apenas com ?debug=1)
+finalizar_instrumentacao()
@@ -2,6 +2,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+from anomalias_consumo import detectar_anomalias, motivos
+from carga_consumo import agregar_mensal, carregar_consumo
+from indice_placas import construir_indice_placas, diario_da_placa, linhas_da_placa, placas_do_mes
+from ingestao import hash_arquivo
+from kpis_consumo import calcular_kpis_mes
+from mapa_memoria import carregar_mapeado
+from relatorio_consumo import grafico_total_por_mes, grafico_valor_diario, nome_mes, total_por_mes, variacao_quinzenal
 
 # Configuração da Página
 st.set_page_config(layout="wide", page_title="Dashboard de Consumo de Veículos")
@@ -11,22 +18,50 @@ st.set_page_config(layout="wide", page_title="Dashboard de Consumo de Veículos"
 # =======================
 
 # Função para carregar e preparar dados com cache
-@st.cache_data
-def carregar_dados(filepath):
-    data = pd.read_csv(filepath, sep=';', encoding='utf-8')
-    data['Data/Hora'] = pd.to_datetime(data['Data/Hora'], dayfirst=True, errors='coerce')
-    data['Dia'] = data['Data/Hora'].dt.date
-    data['Dia'] = pd.to_datetime(data['Dia'])  # Forçando 'Dia' a ser datetime
-    data['Dia_Formatado'] = data['Data/Hora'].dt.strftime('%d/%m')
-    data['Mês'] = data['Data/Hora'].dt.month
-    data['Valor Venda'] = pd.to_numeric(data['Valor Venda'].str.replace(',', '.'), errors='coerce').fillna(0)
-    return data
+# A leitura é feita em blocos (decimal=',', tipos e formato de data explícitos), mantendo só as colunas de detalhe,
+# e os totais mensais são acumulados durante a leitura; retorna (dados, total_mensal)
+# 'versao' é o hash do conteúdo do arquivo: quando o CSV muda, todos os caches abaixo são refeitos
+# As linhas e os totais ficam em arquivos Arrow mapeados em memória e os mesmos DataFrames (somente leitura) são
+# compartilhados por todas as sessões (cache_resource não copia); quem for alterar colunas deve usar uma cópia rasa
+# Se apenas as linhas já estiverem gravadas, os totais são refeitos em uma passada por blocos (memória limitada ao bloco)
+@st.cache_resource
+def carregar_dados(filepath, versao):
+    carga = {}
+
+    def ler_consumo():
+        carga['dados'], carga['total_mensal'] = carregar_consumo(filepath)
+        return carga['dados']
+
+    versao = (versao, 'colunas_detalhe')  # Arquivos gravados antes do descarte das colunas são refeitos
+    data = carregar_mapeado('consumo', versao, ler_consumo)
+    total_mensal = carregar_mapeado('consumo_mensal', versao, lambda: carga['total_mensal'] if carga else agregar_mensal(filepath))
+    return data, total_mensal
+
+# Função para construir, uma vez por versão do arquivo, o índice por placa usado na análise por veículo
+# O índice contém o histórico ordenado: fica compartilhado entre as sessões (somente leitura), sem cópia por execução
+@st.cache_resource
+def carregar_indice_placas(filepath, versao):
+    data, _ = carregar_dados(filepath, versao)
+    return construir_indice_placas(data)
+
+# Função para calcular os KPIs do mês com cache por (versão dos dados, ano, mês); os meses menos usados são descartados
+@st.cache_data(max_entries=24)
+def carregar_kpis_mes(filepath, versao, ano, mes):
+    data, _ = carregar_dados(filepath, versao)
+    return calcular_kpis_mes(data[(data['Ano'] == ano) & (data['Mês'] == mes)])
+
+# Função para detectar, uma vez por versão do arquivo, as anomalias de consumo em todo o histórico da frota
+# O resultado tem uma linha por abastecimento: compartilhado entre as sessões (somente leitura), como os dados
+@st.cache_resource
+def carregar_anomalias(filepath, versao):
+    data, _ = carregar_dados(filepath, versao)
+    return detectar_anomalias(data)
 
 
 # =======================
 # Função para Exibir Gráfico Total por Mês com Título, Subtítulo, Comparação Dinâmica e Gráficos de Barras e Linhas
 # =======================
-def exibir_grafico_total_por_mes(data):
+def exibir_grafico_total_por_mes(total_mensal):
     # Título e Subtítulo do Dashboard
     st.markdown("<h1 style='text-align: center; color: #4A90E2;'>Histórico de Consumo de Veículos Paulinia 2024</h1>", unsafe_allow_html=True)
     st.write("""
@@ -35,61 +70,11 @@ def exibir_grafico_total_por_mes(data):
 
     st.markdown("### Gastos Mensais")
     
-    # Calcula o valor total gasto em cada mês
-    total_por_mes = data.groupby('Mês')['Valor Venda'].sum().reset_index()
-    
-    # Nome dos meses para exibir no eixo X
-    meses_nomes = {
-        1: "Janeiro", 2: "Fevereiro", 3: "Março", 4: "Abril", 5: "Maio", 6: "Junho",
-        7: "Julho", 8: "Agosto", 9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
-    }
-    total_por_mes['Mês Nome'] = total_por_mes['Mês'].map(meses_nomes)
-    
-    # Definir cores diferentes para cada barra
-    cores = [
-        "rgb(31, 119, 180)", "rgb(255, 127, 14)", "rgb(44, 160, 44)", "rgb(214, 39, 40)",
-        "rgb(148, 103, 189)", "rgb(140, 86, 75)", "rgb(227, 119, 194)", "rgb(127, 127, 127)",
-        "rgb(188, 189, 34)", "rgb(23, 190, 207)", "rgb(255, 165, 0)", "rgb(255, 69, 0)"
-    ]
-
-    # Adiciona uma coluna para a comparação percentual com o mês anterior
-    total_por_mes['Variação (%)'] = total_por_mes['Valor Venda'].pct_change() * 100
-
-    # Gráfico de barras para o total gasto em cada mês
-    fig = go.Figure()
-
-    # Adiciona as barras com cores distintas e tamanho do texto aumentado
-    fig.add_trace(go.Bar(
-        x=total_por_mes['Mês Nome'],
-        y=total_por_mes['Valor Venda'],
-        text=[f"R$ {v:,.2f}".replace(',', '.') for v in total_por_mes['Valor Venda']],
-        textposition='inside',
-        name="Total Gasto",
-        marker_color=cores[:len(total_por_mes)],  # Aplica uma cor para cada mês
-        textfont=dict(size=20)  # Define o tamanho do texto dentro das barras para 20
-    ))
-
-    # Gráfico de linha para o total gasto em cada mês
-    fig.add_trace(go.Scatter(
-        x=total_por_mes['Mês Nome'],
-        y=total_por_mes['Valor Venda'],
-        mode='lines+markers',
-        name="Tendência Mensal",
-        line=dict(color="black", width=2, dash="solid"),
-        marker=dict(size=6)
-    ))
-
-    # Configuração do layout com a legenda do mês em destaque
-    fig.update_layout(
-        title="Total Gasto por Mês",
-        xaxis_title="Mês",
-        yaxis_title="Valor Total (R$)",
-        template="plotly_white",
-        title_x=0.5,
-        xaxis=dict(
-            tickfont=dict(size=20)  # Aumenta o tamanho da fonte dos nomes dos meses
-        )
-    )
+    # Valor total gasto em cada mês (já acumulado na carga dos dados), com o nome do mês e a variação percentual
+    tabela_mensal = total_por_mes(total_mensal)
+
+    # Gráfico de barras com cores distintas por mês e linha de tendência
+    fig = grafico_total_por_mes(tabela_mensal)
 
     # Exibir o gráfico combinado em destaque
     st.plotly_chart(fig, use_container_width=True)
@@ -97,7 +82,7 @@ def exibir_grafico_total_por_mes(data):
     # Comparação com o mês anterior de forma dinâmica (apenas para os 3 meses mais recentes)
     st.markdown("### Comparativo Mês a Mês")
     # Seleciona os 3 últimos meses para exibição e ordena cronologicamente
-    comparativo_meses = total_por_mes.tail(3).sort_values(by="Mês")
+    comparativo_meses = tabela_mensal.tail(3).sort_values(by=["Ano", "Mês"])
     colunas = st.columns(3)  # Cria 3 colunas para os 3 meses mais recentes
 
     # Exibe cada um dos últimos 3 meses com valor total e variação percentual
@@ -125,42 +110,31 @@ def exibir_grafico_total_por_mes(data):
 # Função para exibir a introdução e o filtro de mês
 def exibir_introducao_e_filtro(data):
     st.write("### Selecione o Mês para Visualização")
-    # Mapeamento dos números dos meses para os nomes dos meses
-    meses_nomes = {
-        1: "Janeiro", 2: "Fevereiro", 3: "Março", 4: "Abril", 5: "Maio", 6: "Junho",
-        7: "Julho", 8: "Agosto", 9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
-    }
-    
-    # Obter os meses disponíveis no conjunto de dados
-    meses_disponiveis = sorted(data['Mês'].unique())
-    meses_disponiveis_nomes = [meses_nomes[mes] for mes in meses_disponiveis]
+    # Obter os meses (Ano, Mês) disponíveis no conjunto de dados: o mesmo mês de anos diferentes é uma opção separada
+    meses_disponiveis = sorted(data[['Ano', 'Mês']].dropna().drop_duplicates().astype(int).itertuples(index=False, name=None))
+    com_ano = len({ano for ano, _ in meses_disponiveis}) > 1  # Mesmo rótulo do gráfico de gastos mensais
 
-    # Seleção de mês com nome por extenso
-    mes_selecionado_nome = st.selectbox("", meses_disponiveis_nomes)
+    # Seleção de mês com nome por extenso (e o ano, quando houver mais de um)
+    mes_selecionado = st.selectbox("", meses_disponiveis, format_func=lambda ano_mes: nome_mes(*ano_mes, com_ano))
 
-    # Converter o nome do mês selecionado de volta para o número correspondente
-    mes_selecionado = [num for num, nome in meses_nomes.items() if nome == mes_selecionado_nome][0]
-    
-    # Filtrar dados pelo mês selecionado
-    data_filtrado = data[data['Mês'] == mes_selecionado]
-    
-    return data_filtrado
+    # O filtro do mês (Ano, Mês) é aplicado pelos KPIs, pelo índice de placas e pelas anomalias (com cache por mês)
+    return mes_selecionado
 
 # =======================
 # Funções de Exibição
 # =======================
 
-def exibir_visao_geral_com_tendencias_e_insights(data_filtrado):
+def exibir_visao_geral_com_tendencias_e_insights(kpis):
     st.subheader("Visão Detalhada do Mês")
 
-    # Cálculo dos KPIs com base no conjunto de dados filtrado
-    gasto_total_mes = data_filtrado['Valor Venda'].sum()
-    dias_maior_consumo = data_filtrado.groupby('Dia')['Valor Venda'].sum().idxmax()
-    maior_consumo = data_filtrado.groupby('Dia')['Valor Venda'].sum().max()
-    media_gasto_dia = data_filtrado.groupby('Dia')['Valor Venda'].sum().mean()
-    media_abastecimentos_dia = data_filtrado.groupby('Dia')['Valor Venda'].count().mean()
-    dia_maior_abastecimento = data_filtrado.groupby('Dia')['Valor Venda'].count().idxmax()
-    maior_abastecimento = data_filtrado.groupby('Dia')['Valor Venda'].count().max()
+    # KPIs do mês, calculados em uma única passada agrupada (ver kpis_consumo.calcular_kpis_mes)
+    gasto_total_mes = kpis['gasto_total_mes']
+    dias_maior_consumo = kpis['dia_maior_consumo']
+    maior_consumo = kpis['maior_consumo']
+    media_gasto_dia = kpis['media_gasto_dia']
+    media_abastecimentos_dia = kpis['media_abastecimentos_dia']
+    dia_maior_abastecimento = kpis['dia_maior_abastecimento']
+    maior_abastecimento = kpis['maior_abastecimento']
 
     # Exibir KPIs usando o conjunto de dados filtrado
     col1, col2, col3 = st.columns(3)
@@ -175,69 +149,18 @@ def exibir_visao_geral_com_tendencias_e_insights(data_filtrado):
         st.metric("Média de Abastecimentos por Dia", f"{media_abastecimentos_dia:.2f}")
         st.write(f"**Dia com mais abastecimentos:** {dia_maior_abastecimento.strftime('%d/%m')} com {maior_abastecimento} abastecimentos")
 
-    # Configuração de tamanhos da fonte no gráfico
-    tamanho_fonte_valores = 20  # Tamanho da fonte dos valores nas barras
-    tamanho_fonte_legenda = 16  # Tamanho da fonte dos rótulos no eixo X
-
     # Gráfico de valor total de consumo por dia com linha de média mensal, usando dados filtrados
-    valor_diario = data_filtrado.groupby('Dia')['Valor Venda'].sum().reset_index()
-    valor_diario['Dia'] = pd.to_datetime(valor_diario['Dia'])
-    valor_diario['Dia_Formatado'] = valor_diario['Dia'].dt.strftime('%d/%m')
-    
-    # Calcular a média mensal com os dados filtrados
-    media_mensal = valor_diario['Valor Venda'].mean()
-
-    # Criar gráfico com barras de consumo diário e linha de média mensal
-    fig_valor_diario = go.Figure()
-
-    # Barras para o valor diário, com cores alternadas
-    cores_barras = ["rgb(31, 119, 180)", "rgb(144, 238, 144)"]  # Azul e verde claro
-    fig_valor_diario.add_trace(go.Bar(
-        x=valor_diario['Dia_Formatado'],
-        y=valor_diario['Valor Venda'],
-        text=[f"R$ {v:,.2f}".replace(',', '.') for v in valor_diario['Valor Venda']],
-        textposition='outside',
-        name="Consumo Diário",
-        marker_color=[cores_barras[i % 2] for i in range(len(valor_diario))],  # Cores alternadas
-    ))
-
-    # Linha para a média mensal
-    fig_valor_diario.add_trace(go.Scatter(
-        x=valor_diario['Dia_Formatado'],
-        y=[media_mensal] * len(valor_diario),
-        mode='lines',
-        name="Média do Mês",
-        line=dict(color='red', dash='dash')
-    ))
-
-    fig_valor_diario.update_layout(
-        title="Valor Total de Consumo por Dia com Média do Mês",
-        xaxis_title="Data",
-        yaxis_title="Valor Total (R$)",
-        template="plotly_white",
-        title_x=0.5,
-        yaxis=dict(range=[0, 2200]),  # Define a escala máxima do eixo Y para 2200
-        xaxis=dict(tickfont=dict(size=tamanho_fonte_legenda)),  # Define o tamanho dos rótulos do eixo X
-    )
-
-    # Atualização do tamanho da fonte dos valores nas barras
-    fig_valor_diario.update_traces(textfont=dict(size=tamanho_fonte_valores))
+    fig_valor_diario = grafico_valor_diario(kpis)
 
     # Exibir o gráfico ocupando a largura total da tela
     st.plotly_chart(fig_valor_diario, use_container_width=True)
 
-    # Cálculo do gasto na primeira e segunda quinzena
-    primeira_quinzena = data_filtrado[data_filtrado['Data/Hora'].dt.day <= 15]
-    segunda_quinzena = data_filtrado[data_filtrado['Data/Hora'].dt.day > 15]
-    
-    gasto_primeira_quinzena = primeira_quinzena['Valor Venda'].sum()
-    gasto_segunda_quinzena = segunda_quinzena['Valor Venda'].sum()
+    # Gasto na primeira e segunda quinzena
+    gasto_primeira_quinzena = kpis['gasto_primeira_quinzena']
+    gasto_segunda_quinzena = kpis['gasto_segunda_quinzena']
     
     # Cálculo da variação percentual
-    if gasto_primeira_quinzena > 0:
-        variacao_quinzena = ((gasto_segunda_quinzena - gasto_primeira_quinzena) / gasto_primeira_quinzena) * 100
-    else:
-        variacao_quinzena = 0
+    variacao_quinzena = variacao_quinzenal(kpis)
 
     # Exibir KPIs da primeira e segunda quinzena
     st.write("### Gasto Quinzenal e Variação Percentual")
@@ -256,22 +179,24 @@ def exibir_visao_geral_com_tendencias_e_insights(data_filtrado):
 
     # Insights Automáticos
     st.write("### Insights")
-    st.write(f"- Veículo com maior consumo: **{data_filtrado.groupby('Placa')['Valor Venda'].sum().idxmax()}** com um total de **R$ {data_filtrado.groupby('Placa')['Valor Venda'].sum().max():,.2f}** no mês.".replace(',', '.'))
+    st.write(f"- Veículo com maior consumo: **{kpis['placa_maior_consumo']}** com um total de **R$ {kpis['valor_placa_maior_consumo']:,.2f}** no mês.".replace(',', '.'))
 
-def exibir_analise_por_veiculo(data_filtrado):
+def exibir_analise_por_veiculo(indice_placas, mes_selecionado):
     st.subheader("Análise por Veículo")
     
     # Expander para mostrar detalhes de um veículo selecionado
     with st.expander("Exibir Detalhes"):
         # Seleção da viatura
-        placa_selecionada = st.selectbox("Selecione a Placa do Veículo", data_filtrado['Placa'].unique())
-        dados_filtrados = data_filtrado[data_filtrado['Placa'] == placa_selecionada]
+        placa_selecionada = st.selectbox("Selecione a Placa do Veículo", placas_do_mes(indice_placas, *mes_selecionado))
+        # Linhas e somas diárias da placa vêm do índice (fatia contígua, sem varrer o mês)
+        dados_filtrados = linhas_da_placa(indice_placas, *mes_selecionado, placa_selecionada)
+        valor_por_dia = diario_da_placa(indice_placas, *mes_selecionado, placa_selecionada)
 
         # Cálculo dos KPIs
         gasto_total_mes_placa = dados_filtrados['Valor Venda'].sum()
         kms_rodados_mes = dados_filtrados['Km Rod.'].sum()
-        dia_maior_abastecimento = dados_filtrados.groupby('Dia')['Valor Venda'].sum().idxmax()
-        valor_maior_abastecimento = dados_filtrados.groupby('Dia')['Valor Venda'].sum().max()
+        dia_maior_abastecimento = valor_por_dia.idxmax()
+        valor_maior_abastecimento = valor_por_dia.max()
 
         # Exibição dos KPIs
         col1, col2 = st.columns(2)
@@ -290,7 +215,7 @@ def exibir_analise_por_veiculo(data_filtrado):
         tamanho_fonte_rotulos = 20  # Tamanho da fonte dos rótulos do eixo X
 
         # Dados para o gráfico de abastecimento diário
-        abastecimento_diario = dados_filtrados.groupby('Dia')['Valor Venda'].sum().reset_index()
+        abastecimento_diario = valor_por_dia.reset_index()
         abastecimento_diario['Dia'] = pd.to_datetime(abastecimento_diario['Dia'])
         abastecimento_diario['Dia_Formatado'] = abastecimento_diario['Dia'].dt.strftime('%d/%m')
 
@@ -324,19 +249,43 @@ def exibir_analise_por_veiculo(data_filtrado):
         # Exibir o gráfico
         st.plotly_chart(fig_abastecimento_diario, use_container_width=True)
 
+def exibir_anomalias(anomalias, mes_selecionado):
+    st.subheader("Anomalias de Consumo")
+
+    # A referência de eficiência (KM/Lt) de cada placa considera todo o histórico; aqui mostramos apenas o mês
+    ano, mes = mes_selecionado
+    anomalias_mes = anomalias[(anomalias['Ano'] == ano) & (anomalias['Mês'] == mes) & anomalias['Anomalia']]
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Regressões de Hodômetro", int(anomalias_mes['Regressão Hodômetro'].sum()))
+    col2.metric("Abastecimentos Excessivos", int(anomalias_mes['Abastecimento Excessivo'].sum()))
+    col3.metric("Eficiência Atípica (KM/Lt)", int(anomalias_mes['Eficiência Atípica'].sum()))
+
+    with st.expander("Exibir Abastecimentos Marcados"):
+        if anomalias_mes.empty:
+            st.write("Nenhuma anomalia encontrada no mês.")
+        else:
+            tabela = anomalias_mes[['Data/Hora', 'Placa', 'Motorista', 'Produto', 'Km Ant.', 'Km Rod.', 'Quant.to ', 'KM/Lt', 'Eficiência Base']].copy()
+            tabela['Motivo'] = motivos(anomalias_mes)
+            st.dataframe(tabela, use_container_width=True)
+
 # =======================
 # Carregamento de Dados e Exibição do Dashboard
 # =======================
 
 # Carregar dados
-data = carregar_dados("historico_consumo1.csv")
+arquivo_consumo = "historico_consumo1.csv"
+versao_consumo = hash_arquivo(arquivo_consumo)
+data, total_mensal = carregar_dados(arquivo_consumo, versao_consumo)
+data, total_mensal = data.copy(deep=False), total_mensal.copy(deep=False)  # Visões da sessão, sem copiar os dados
 
 # Exibir gráfico total por mês
-exibir_grafico_total_por_mes(data)
+exibir_grafico_total_por_mes(total_mensal)
 
 # Exibir introdução e filtro de mês
-data_filtrado = exibir_introducao_e_filtro(data)
+mes_selecionado = exibir_introducao_e_filtro(data)
 
 # Exibir visão geral do mês e análise detalhada usando o filtro
-exibir_visao_geral_com_tendencias_e_insights(data_filtrado)
-exibir_analise_por_veiculo(data_filtrado)
+exibir_visao_geral_com_tendencias_e_insights(carregar_kpis_mes(arquivo_consumo, versao_consumo, *mes_selecionado))
+exibir_analise_por_veiculo(carregar_indice_placas(arquivo_consumo, versao_consumo), mes_selecionado)
+exibir_anomalias(carregar_anomalias(arquivo_consumo, versao_consumo), mes_selecionado)
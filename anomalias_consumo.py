@@ -0,0 +1,95 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Produtos que não são combustível (ARLA 32 é aditivo; o KM/Lt registrado nesses cupons não é eficiência)
+PRODUTOS_NAO_COMBUSTIVEL = ("ARLA",)
+
+# Parâmetros do detector
+JANELA_BASE = 10              # Quantidade de abastecimentos anteriores usados na eficiência de referência
+MINIMO_BASE = 3               # Mínimo de leituras válidas na janela para haver referência
+LIMIAR_MAD = 3.5              # Desvios robustos (MAD escalado) para considerar a eficiência atípica
+TOLERANCIA_RELATIVA = 0.25    # Desvio mínimo relativo à referência (evita alarmes quando a frota é muito regular)
+FATOR_EXCESSO = 1.6           # Litros acima de FATOR_EXCESSO × mediana da placa indicam abastecimento excessivo
+
+
+# Função para calcular a mediana e o MAD das últimas `janela` leituras anteriores a cada posição
+def _referencia_rolante(valores, janela=JANELA_BASE, minimo=MINIMO_BASE):
+    preenchido = np.concatenate([np.full(janela, np.nan), valores])
+    janelas = sliding_window_view(preenchido[:-1], janela)  # Linha i = valores[i - janela:i]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)  # Janelas sem leitura válida
+        mediana = np.nanmedian(janelas, axis=1)
+        mad = np.nanmedian(np.abs(janelas - mediana[:, None]), axis=1) * 1.4826
+    insuficiente = np.sum(~np.isnan(janelas), axis=1) < minimo
+    mediana[insuficiente] = np.nan
+    mad[insuficiente] = np.nan
+    return mediana, mad
+
+
+# Função para analisar os abastecimentos de uma placa (arrays já ordenados por data) em uma passada NumPy
+def _analisar_placa(hodometro, eficiencia, litros, combustivel):
+    # Regressão do hodômetro: leitura menor que a do abastecimento anterior da mesma placa
+    regressao = np.zeros(len(hodometro), dtype=bool)
+    regressao[1:] = hodometro[1:] < hodometro[:-1]
+
+    # Eficiência de referência: só leituras de combustível, válidas e sem regressão de hodômetro
+    valida = combustivel & np.isfinite(eficiencia) & (eficiencia > 0) & ~regressao
+    base, mad = _referencia_rolante(np.where(valida, eficiencia, np.nan))
+    desvio = eficiencia - base
+    limite = np.fmax(LIMIAR_MAD * mad, TOLERANCIA_RELATIVA * base)
+    with np.errstate(invalid='ignore'):
+        atipica = combustivel & np.isfinite(base) & (np.abs(desvio) > limite)
+
+    # Abastecimento excessivo: litros muito acima do habitual da placa (apenas combustível)
+    litros_combustivel = litros[combustivel & np.isfinite(litros)]
+    mediana_litros = np.median(litros_combustivel) if litros_combustivel.size else np.nan
+    with np.errstate(invalid='ignore'):
+        excessivo = combustivel & (litros > FATOR_EXCESSO * mediana_litros)
+
+    return base, np.where(combustivel, desvio, np.nan), regressao, excessivo, atipica
+
+
+# Função principal: detecta anomalias em todo o histórico da frota
+# Retorna os abastecimentos ordenados por (Placa, Data/Hora) com a referência de eficiência e as marcações
+def detectar_anomalias(data):
+    colunas = ['Data/Hora', 'Dia', 'Ano', 'Mês', 'Placa', 'Motorista', 'Produto', 'Km Ant.', 'Km Rod.', 'KM/Lt', 'Quant.to ', 'Valor Venda']
+    ordenado = data[colunas].dropna(subset=['Data/Hora']).sort_values(['Placa', 'Data/Hora'], kind='stable').reset_index(drop=True)
+
+    produto = ordenado['Produto'].astype(str).str.upper()
+    combustivel = ~produto.str.contains("|".join(PRODUTOS_NAO_COMBUSTIVEL), regex=True).to_numpy()
+    hodometro = ordenado['Km Ant.'].to_numpy(dtype=float)
+    eficiencia = ordenado['KM/Lt'].to_numpy(dtype=float)
+    litros = ordenado['Quant.to '].to_numpy(dtype=float)
+
+    # Limites de cada placa no frame ordenado
+    codigos = pd.factorize(ordenado['Placa'].astype(str))[0]
+    inicios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]]) if len(codigos) else np.array([], dtype=int)
+    fins = np.append(inicios[1:], len(codigos))
+
+    n = len(ordenado)
+    base, desvio = np.full(n, np.nan), np.full(n, np.nan)
+    regressao, excessivo, atipica = np.zeros(n, bool), np.zeros(n, bool), np.zeros(n, bool)
+    for inicio, fim in zip(inicios, fins):
+        faixa = slice(inicio, fim)
+        base[faixa], desvio[faixa], regressao[faixa], excessivo[faixa], atipica[faixa] = _analisar_placa(
+            hodometro[faixa], eficiencia[faixa], litros[faixa], combustivel[faixa]
+        )
+
+    ordenado['Combustível'] = combustivel
+    ordenado['Eficiência Base'] = base.round(2)
+    ordenado['Desvio Eficiência'] = desvio.round(2)
+    ordenado['Regressão Hodômetro'] = regressao
+    ordenado['Abastecimento Excessivo'] = excessivo
+    ordenado['Eficiência Atípica'] = atipica
+    ordenado['Anomalia'] = regressao | excessivo | atipica
+    return ordenado
+
+
+# Função para descrever as marcações de cada linha em texto (para exibição)
+def motivos(anomalias):
+    rotulos = ['Regressão Hodômetro', 'Abastecimento Excessivo', 'Eficiência Atípica']
+    marcadas = anomalias[rotulos].to_numpy()
+    return pd.Series([", ".join(r for r, m in zip(rotulos, linha) if m) for linha in marcadas], index=anomalias.index)
@@ -0,0 +1,202 @@
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dimensao_tempo import construir_dimensao_tempo, rotular_tempo
+from esquema import normalizar_esquema
+from ingestao import DIRETORIO_CACHE, carregar_planilha, hash_arquivo
+
+# Diretório do armazém: cada exportação ingerida vira um arquivo Parquet só com as linhas novas
+DIRETORIO_ARMAZEM = os.path.join(DIRETORIO_CACHE, "ocorrencias")
+ARQUIVO_MANIFESTO = "manifesto.json"
+
+# Padrões das exportações mensais do sistema de ocorrências
+PADROES_EXPORTACAO = ("Rel *.xlsx", "Relatorio *.xlsx")
+
+
+# Versão do formato do manifesto: um armazém em formato anterior é descartado e reconstruído
+VERSAO_MANIFESTO = 2
+
+
+# O manifesto guarda, por hash de exportação: arquivo, parte Parquet, período coberto, mtime e linhas na parte
+def _ler_manifesto(diretorio):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_MANIFESTO), "r", encoding="utf-8") as arquivo:
+            manifesto = json.load(arquivo)
+    except (OSError, ValueError):
+        manifesto = {}
+    if manifesto.get("versao") != VERSAO_MANIFESTO:
+        for parte in _arquivos_partes(diretorio):
+            os.remove(parte)
+        manifesto = {"versao": VERSAO_MANIFESTO, "exportacoes": {}}
+    return manifesto
+
+
+def _gravar_manifesto(diretorio, manifesto):
+    caminho = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    with open(caminho + ".tmp", "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=1)
+    os.replace(caminho + ".tmp", caminho)
+
+
+# Colunas que identificam as linhas de apoio (outras guarnições da mesma ocorrência), que vêm sem 'Id' e sem talão
+COLUNAS_CHAVE_APOIO = ['Data/Hora inicial', 'Data/Hora final', 'Guarnição', 'Natureza', 'Endereço do fato']
+
+
+# Função para montar a chave única da ocorrência: 'Id' quando existir, senão o 'N° Talão',
+# senão o conteúdo da linha de apoio
+def chave_ocorrencia(df):
+    chave = pd.Series(pd.NA, index=df.index, dtype=object)
+    if all(coluna in df.columns for coluna in COLUNAS_CHAVE_APOIO):
+        tabela = df[COLUNAS_CHAVE_APOIO].astype(str).fillna("")
+        chave = "linha:" + tabela.iloc[:, 0].str.cat([tabela[coluna] for coluna in COLUNAS_CHAVE_APOIO[1:]], sep="|")
+    if 'N° Talão' in df.columns:
+        talao = df['N° Talão']
+        if pd.api.types.is_float_dtype(talao):
+            talao = talao.astype('Int64')  # Talão numérico em coluna com vazios vira float ("123.0"); a chave usa o inteiro
+        chave = chave.mask(talao.notna(), "talao:" + talao.astype(str))
+    if 'Id' in df.columns:
+        ids = pd.to_numeric(df['Id'], errors='coerce').astype('Int64')
+        chave = chave.mask(ids.notna(), "id:" + ids.astype(str))
+    return chave
+
+
+# Função para listar as exportações disponíveis com o mtime, usada como versão para o cache do Streamlit
+def listar_exportacoes(padroes=PADROES_EXPORTACAO):
+    arquivos = sorted({arquivo for padrao in padroes for arquivo in glob.glob(padrao)})
+    return tuple((arquivo, os.stat(arquivo).st_mtime_ns) for arquivo in arquivos)
+
+
+def _arquivos_partes(diretorio):
+    return sorted(glob.glob(os.path.join(diretorio, "parte-*.parquet")))
+
+
+# Função para obter o período (primeira e última data inicial) coberto por uma exportação; None se não houver datas
+def _periodo(datas):
+    datas = datas.dropna()
+    return None if datas.empty else [datas.min().isoformat(), datas.max().isoformat()]
+
+
+def _no_periodo(datas, periodo):
+    return datas.between(pd.Timestamp(periodo[0]), pd.Timestamp(periodo[1])).to_numpy()
+
+
+# Recência de uma exportação: a que chega a uma data mais tardia foi gerada depois; o mtime desempata
+# (as exportações parciais do mês, como "Relatorio 1 a 28", são substituídas pela exportação completa)
+def _recencia(registro):
+    return (registro["periodo"][1], registro["mtime"])
+
+
+# Função para retirar de uma parte do armazém as linhas do período informado (substituídas por uma exportação mais recente)
+def _remover_periodo(diretorio, registro, periodo):
+    if registro["parte"] is None:
+        return
+    caminho = os.path.join(diretorio, registro["parte"])
+    datas = pd.to_datetime(pd.read_parquet(caminho, columns=['Data/Hora inicial'])['Data/Hora inicial'])
+    remover = _no_periodo(datas, periodo)
+    if not remover.any():
+        return
+    restantes = pd.read_parquet(caminho)[~remover]
+    if restantes.empty:
+        os.remove(caminho)
+        registro["parte"] = None
+    else:
+        restantes.to_parquet(caminho, index=False)
+    registro["linhas"] = int(len(restantes))
+
+
+# Função para ingerir uma exportação no armazém
+# A exportação mais recente de um período é a fonte daquele período: ao ingerir uma exportação, as linhas das exportações
+# mais antigas dentro do seu período são substituídas, e as suas linhas dentro do período de uma mais recente são
+# descartadas. Assim as linhas de apoio (sem 'Id'/talão, identificadas pelo conteúdo, inclusive a guarnição) de uma
+# exportação parcial não se somam às da exportação completa quando a guarnição foi alterada
+# Fora desses períodos, entram apenas as ocorrências ainda não vistas
+# Retorna a quantidade de linhas novas (0 se o arquivo já foi ingerido)
+def ingerir_exportacao(file_path, diretorio=DIRETORIO_ARMAZEM):
+    os.makedirs(diretorio, exist_ok=True)
+    manifesto = _ler_manifesto(diretorio)
+    exportacoes = manifesto["exportacoes"]
+    hash_atual = hash_arquivo(file_path)
+    if hash_atual in exportacoes:
+        return 0
+
+    df = carregar_planilha(file_path).dropna(how='all')  # Exportações podem trazer linhas totalmente vazias
+    if 'Id' in df.columns:
+        df['Id'] = pd.to_numeric(df['Id'], errors='coerce').astype('Int64')
+    datas = pd.to_datetime(df['Data/Hora inicial'])
+    registro = {
+        "arquivo": os.path.basename(file_path),
+        "parte": None,
+        "periodo": _periodo(datas),
+        "mtime": os.stat(file_path).st_mtime_ns,
+    }
+
+    # Substitui o período desta exportação nas mais antigas e descarta as suas linhas cobertas pelas mais recentes
+    manter = np.ones(len(df), dtype=bool)
+    if registro["periodo"] is not None:
+        for existente in exportacoes.values():
+            if existente["periodo"] is None:
+                continue
+            if _recencia(existente) > _recencia(registro):
+                manter &= ~_no_periodo(datas, existente["periodo"])
+            else:
+                _remover_periodo(diretorio, existente, registro["periodo"])
+    df = df[manter]
+    chaves = chave_ocorrencia(df)
+
+    # Chaves já armazenadas (lendo só as colunas da chave de cada parte)
+    existentes = set()
+    for parte in _arquivos_partes(diretorio):
+        colunas = ['Id', 'N° Talão'] + COLUNAS_CHAVE_APOIO
+        existentes.update(chave_ocorrencia(pd.read_parquet(parte, columns=colunas)).dropna())
+
+    # Mantém apenas a primeira ocorrência de cada chave ainda não armazenada
+    novas = ~chaves.isin(existentes) & ~chaves.duplicated()
+    df_novas = df[novas]
+    if not df_novas.empty:
+        registro["parte"] = f"parte-{hash_atual[:16]}.parquet"
+        df_novas.to_parquet(os.path.join(diretorio, registro["parte"]), index=False)
+
+    registro["linhas"] = registro["linhas_novas"] = int(len(df_novas))
+    exportacoes[hash_atual] = registro
+    _gravar_manifesto(diretorio, manifesto)
+    return len(df_novas)
+
+
+# Função para carregar todo o histórico armazenado, do mais recente para o mais antigo
+def carregar_armazem(diretorio=DIRETORIO_ARMAZEM):
+    partes = [pd.read_parquet(parte) for parte in _arquivos_partes(diretorio)]
+    if not partes:
+        return pd.DataFrame()
+    df = pd.concat(partes, ignore_index=True)
+    return df.sort_values('Data/Hora inicial', ascending=False, ignore_index=True)
+
+
+# Função para ingerir as exportações informadas (das mais recentes para as mais antigas) e devolver o histórico
+def atualizar_armazem(arquivos, diretorio=DIRETORIO_ARMAZEM):
+    for arquivo in sorted(arquivos, key=os.path.getmtime, reverse=True):
+        ingerir_exportacao(arquivo, diretorio)
+    return carregar_armazem(diretorio)
+
+
+# Função para preparar o histórico para os dashboards: datas convertidas, dimensão de tempo (chaves inteiras de hora,
+# dia, semana ISO, mês e turno), rótulos Dia/Mês/Turno derivados das chaves e texto repetitivo como categoria
+# Linhas sem data inicial não entram em nenhum mês
+def preparar_historico(df):
+    df['Data/Hora inicial'] = pd.to_datetime(df['Data/Hora inicial'])
+    df = df.dropna(subset=['Data/Hora inicial'])
+    df['Data/Hora final'] = pd.to_datetime(df['Data/Hora final'])
+
+    # Mês inclui o ano, pois o histórico cobre vários meses; turnos: Manhã 05:30, Tarde 13:50, Madrugada 21:50
+    tempo = construir_dimensao_tempo(df['Data/Hora inicial'])
+    df[tempo.columns] = tempo
+    df[['Dia', 'Mês', 'Turno']] = rotular_tempo(tempo)
+    return normalizar_esquema(df)
+
+
+# Função para ingerir as exportações informadas e devolver o histórico pronto para os dashboards
+def carregar_historico(arquivos, diretorio=DIRETORIO_ARMAZEM):
+    return preparar_historico(atualizar_armazem(arquivos, diretorio))
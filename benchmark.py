@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from anomalias_consumo import detectar_anomalias
+from armazem_ocorrencias import chave_ocorrencia, preparar_historico
+from carga_consumo import FORMATO_DATA_HORA, carregar_consumo
+from cubo import construir_cubo, fatiar, meses_do_cubo, totais_por
+from dimensao_tempo import COLUNAS_TEMPO, construir_rollups
+from duracao import converter_duracoes
+from filtros import construir_indice_filtros, filtrar
+from graficos import grafico_barras
+from indice_placas import construir_indice_placas
+from kpis_consumo import calcular_kpis_mes
+from turnos import classificar_turno
+
+# Benchmark dos pipelines dos dashboards com dados sintéticos no mesmo esquema das exportações reais
+# Uso: python benchmark.py [--linhas 10000 100000 ...] [--conjuntos ocorrencias consumo] [--base relatorio.json]
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000, 5_000_000]
+CONJUNTOS = ('ocorrencias', 'consumo')
+
+# Comparação com um relatório base: etapas mais lentas que TOLERANCIA × base são regressões
+# (etapas abaixo de MINIMO_COMPARAVEL segundos na base são ignoradas, pois oscilam demais)
+TOLERANCIA = 1.25
+MINIMO_COMPARAVEL = 0.05
+
+GUARNICOES = [f"PLN-7{k:02d} | F{chr(65 + k)}{chr(75 + k)}-{k}A{k:02d} Caminhonete" for k in range(1, 13)]
+NATUREZAS = ["APOIO À GUARNIÇÃO"] + [f"COD {k:02d} - NATUREZA {k:02d}" for k in range(0, 57, 3)] + [f"COD {k} - NATUREZA {k}" for k in range(37, 56)]
+PLACAS = ["FDZ-7H43", "FFY-2J42", "FGH-8F42", "FIM-4H51", "FNK-9I54", "FPP-5B22",
+          "FSR-8C53", "FTQ-4A82", "FWJ-6D54", "FXO-8C34", "FZW-1B64", "FZZ-4A11"]
+POSTOS = ["RODO SHOPPING", "AUTO POSTO CENTRAL", "POSTO PAULINIA"]
+
+
+# Função para gerar pesos decrescentes (poucos valores concentram a maioria das linhas, como nos relatórios reais)
+def _pesos(quantidade, expoente=1.1):
+    pesos = 1 / np.arange(1, quantidade + 1) ** expoente
+    return pesos / pesos.sum()
+
+
+# Função para gerar as ocorrências no esquema da exportação do sistema ("Rel *.xlsx")
+def gerar_ocorrencias(linhas, semente=0):
+    gerador = np.random.default_rng(semente)
+    inicio = pd.Timestamp("2024-01-01") + pd.to_timedelta(gerador.integers(0, 366 * 24 * 60, linhas), unit='min')
+    duracao = np.clip(gerador.exponential(30, linhas).astype(int) + 1, 1, 300)
+    horas, minutos = duracao // 60, duracao % 60
+    texto_minutos = pd.Series(minutos).astype(str).str.zfill(2) + "min"
+    texto_duracao = texto_minutos.where(horas == 0, pd.Series(horas).astype(str) + "h " + texto_minutos)
+    texto_duracao[gerador.random(linhas) < 0.05] = None  # Duração em branco: usa Data/Hora final - inicial
+
+    enderecos = np.array([f"RUA {k} - BAIRRO {k % 40}" for k in range(max(50, min(5_000, linhas // 4)))])
+    identificadores = np.arange(linhas, 0, -1)
+    return pd.DataFrame({
+        'Id': identificadores.astype(float),
+        'N° Talão': pd.Series(identificadores).astype(str) + "/2024",
+        'N° BO GCM': np.nan,
+        'Data/Hora inicial': inicio,
+        'Data/Hora final': inicio + pd.to_timedelta(duracao, unit='min'),
+        'Guarnição': gerador.choice(GUARNICOES, linhas, p=_pesos(len(GUARNICOES), 0.6)),
+        'Natureza': gerador.choice(NATUREZAS, linhas, p=_pesos(len(NATUREZAS))),
+        'Endereço do fato': gerador.choice(enderecos, linhas, p=_pesos(len(enderecos))),
+        'Suporte à guarnição': None,
+        'Status': "Encerrado",
+        'Duração': texto_duracao,
+    })
+
+
+# Função para gerar os abastecimentos no esquema do extrato do cartão combustível (historico_consumo1.csv)
+def gerar_consumo(linhas, semente=0):
+    gerador = np.random.default_rng(semente)
+    data_hora = np.sort(pd.Timestamp("2024-01-01") + pd.to_timedelta(gerador.integers(0, 366 * 24 * 60, linhas), unit='min'))
+    placa = gerador.choice(PLACAS, linhas)
+    arla = gerador.random(linhas) < 0.1
+    litros = np.where(arla, gerador.normal(8, 1.5, linhas), gerador.normal(45, 8, linhas)).clip(1).round(3)
+    km_rodados = np.where(arla, gerador.integers(200, 400, linhas), gerador.integers(100, 600, linhas))
+    # Hodômetro crescente por placa (soma acumulada dos km rodados na ordem dos abastecimentos)
+    km_anterior = 50_000 + pd.Series(km_rodados).groupby(placa).cumsum().to_numpy() - km_rodados
+    preco = np.where(arla, 2.95, 5.89)
+
+    return pd.DataFrame({
+        'Cupom': np.arange(800_000, 800_000 + linhas),
+        'Data/Hora': pd.Series(data_hora).dt.strftime(FORMATO_DATA_HORA),
+        'Placa': placa,
+        'Motorista': np.char.add("MOTORISTA ", gerador.integers(1, 80, linhas).astype(str)),
+        'Km Ant.': km_anterior,
+        'Km Rod.': km_rodados,
+        'KM/Lt': (km_rodados / litros).round(2),
+        'Quant.to ': litros,
+        'Preço Unit.': preco,
+        'Valor Venda': (litros * preco).round(2),
+        'Desconto': 0,
+        'Acréscimo': 0,
+        'Produto': np.where(arla, "ARLA", "DIESEL S10"),
+        'Centro de Custo': None,
+        'Vlr/Lts': None,
+        'Posto': gerador.choice(POSTOS, linhas),
+    })
+
+
+# Função para executar uma etapa, registrando o tempo (em segundos) no dicionário de etapas
+def _medir(etapas, nome, funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    etapas[nome] = round(time.perf_counter() - inicio, 4)
+    print(f"  {nome:<16} {etapas[nome]:>9.3f}s", flush=True)
+    return resultado
+
+
+# Agregados de uma interação típica no Oco.py: fatia do mês mais recente e totais por dimensão
+def _agregados_ocorrencias(cubo):
+    cubo_mes = fatiar(cubo, {'Mês': meses_do_cubo(cubo)[0]})
+    return [totais_por(cubo_mes, dimensoes) for dimensoes in ('Natureza', 'Guarnição', 'Dia', ['Turno', 'Guarnição'])]
+
+
+# Filtros do Bloco 9 do Ocorrencias.py: mês inteiro, mês + natureza, mês + natureza + viatura
+def _filtros_ocorrencias(indice):
+    datas = indice['datas']
+    fim = pd.Timestamp(datas[-1]).normalize()
+    inicio = fim.replace(day=1)
+    return [
+        filtrar(indice, inicio, fim, {'Natureza': "Todas", 'Guarnição': "Todas"}),
+        filtrar(indice, inicio, fim, {'Natureza': NATUREZAS[1], 'Guarnição': "Todas"}),
+        filtrar(indice, inicio, fim, {'Natureza': NATUREZAS[1], 'Guarnição': GUARNICOES[0]}),
+    ]
+
+
+# Gráficos de barras dos dashboards a partir dos totais do cubo
+def _graficos_ocorrencias(cubo):
+    por_dia = totais_por(cubo, 'Dia').sort_index()
+    por_guarnicao = totais_por(cubo, 'Guarnição')
+    return [grafico_barras(por_dia.index, por_dia.values), grafico_barras(por_guarnicao.index, por_guarnicao.values)]
+
+
+def _kpis_consumo(data):
+    return [calcular_kpis_mes(data_mes) for _, data_mes in data.groupby(['Ano', 'Mês'])]
+
+
+def _graficos_consumo(data, total_mensal):
+    diario = data.groupby('Dia')['Valor Venda'].sum()
+    return [grafico_barras(total_mensal['Mês'], total_mensal['Valor Venda']), grafico_barras(diario.index, diario.values)]
+
+
+# Pipeline das ocorrências (Oco.py e Ocorrencias.py)
+def executar_ocorrencias(linhas, diretorio, semente=0):
+    arquivo = os.path.join(diretorio, f"ocorrencias_{linhas}.parquet")
+    gerar_ocorrencias(linhas, semente).to_parquet(arquivo, index=False)  # Mesmo formato do cache de ingestão
+
+    etapas = {}
+    df = _medir(etapas, 'carga', pd.read_parquet, arquivo)
+    _medir(etapas, 'chave_ingestao', chave_ocorrencia, df)
+    df['Duração (min)'], _ = _medir(etapas, 'duracao', converter_duracoes, df['Duração'], df['Data/Hora inicial'], df['Data/Hora final'])
+    df = _medir(etapas, 'preparo', preparar_historico, df)
+    _medir(etapas, 'turno', classificar_turno, df['Data/Hora inicial'])
+    _medir(etapas, 'rollups_tempo', construir_rollups, df[COLUNAS_TEMPO])
+    cubo = _medir(etapas, 'cubo', construir_cubo, df)
+    _medir(etapas, 'agregados', _agregados_ocorrencias, cubo)
+    indice = _medir(etapas, 'indice_filtros', construir_indice_filtros, df, 'Data/Hora inicial', ['Natureza', 'Guarnição'])
+    _medir(etapas, 'filtros', _filtros_ocorrencias, indice)
+    _medir(etapas, 'graficos', _graficos_ocorrencias, cubo)
+    return etapas
+
+
+# Pipeline do consumo de combustível (abastecimento.py)
+def executar_consumo(linhas, diretorio, semente=0):
+    arquivo = os.path.join(diretorio, f"consumo_{linhas}.csv")
+    gerar_consumo(linhas, semente).to_csv(arquivo, sep=';', decimal=',', index=False, encoding='utf-8')
+
+    etapas = {}
+    data, total_mensal = _medir(etapas, 'carga', carregar_consumo, arquivo)
+    _medir(etapas, 'kpis', _kpis_consumo, data)
+    _medir(etapas, 'indice_placas', construir_indice_placas, data)
+    _medir(etapas, 'anomalias', detectar_anomalias, data)
+    _medir(etapas, 'graficos', _graficos_consumo, data, total_mensal)
+    return etapas
+
+
+EXECUTORES = {'ocorrencias': executar_ocorrencias, 'consumo': executar_consumo}
+
+
+# Função para comparar o relatório com um relatório base; devolve a lista de regressões encontradas
+def comparar(relatorio, base, tolerancia=TOLERANCIA):
+    tempos_base = {(r['conjunto'], r['linhas']): r['etapas'] for r in base['resultados']}
+    regressoes = []
+    for resultado in relatorio['resultados']:
+        anteriores = tempos_base.get((resultado['conjunto'], resultado['linhas']), {})
+        for etapa, tempo in resultado['etapas'].items():
+            anterior = anteriores.get(etapa)
+            if anterior is not None and anterior >= MINIMO_COMPARAVEL and tempo > tolerancia * anterior:
+                regressoes.append(f"{resultado['conjunto']} ({resultado['linhas']:,} linhas) {etapa}: {anterior:.3f}s -> {tempo:.3f}s")
+    return regressoes
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos pipelines dos dashboards com dados sintéticos")
+    parser.add_argument('--linhas', type=int, nargs='+', default=TAMANHOS_PADRAO, help="Tamanhos dos conjuntos gerados")
+    parser.add_argument('--conjuntos', nargs='+', choices=CONJUNTOS, default=list(CONJUNTOS))
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', default=f"benchmark_{datetime.now():%Y%m%d-%H%M%S}.json", help="Arquivo JSON do relatório")
+    parser.add_argument('--base', help="Relatório anterior para detectar regressões (sai com código 1 se houver)")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    args = parser.parse_args(argumentos)
+
+    relatorio = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+                     'processador': platform.processor() or platform.machine()},
+        'resultados': [],
+    }
+    with tempfile.TemporaryDirectory() as diretorio:
+        for conjunto in args.conjuntos:
+            for linhas in args.linhas:
+                print(f"{conjunto}: {linhas:,} linhas", flush=True)
+                etapas = EXECUTORES[conjunto](linhas, diretorio, args.semente)
+                relatorio['resultados'].append({'conjunto': conjunto, 'linhas': linhas, 'etapas': etapas,
+                                                'total': round(sum(etapas.values()), 4)})
+
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"Relatório gravado em {args.saida}")
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo), args.tolerancia)
+        for regressao in regressoes:
+            print(f"REGRESSÃO {regressao}")
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Formato da coluna 'Data/Hora' no extrato do cartão combustível (ex.: 01/10/2024 06:01)
+FORMATO_DATA_HORA = '%d/%m/%Y %H:%M'
+
+# Tipos explícitos: texto repetido como categoria, números com vírgula decimal lidos direto como float
+TIPOS_CONSUMO = {
+    'Cupom': 'string',
+    'Placa': 'category',
+    'Motorista': 'string',
+    'Produto': 'category',
+    'Posto': 'category',
+    'Km Ant.': 'float64',
+    'Km Rod.': 'float64',
+    'KM/Lt': 'float64',
+    'Quant.to ': 'float64',
+    'Preço Unit.': 'float64',
+    'Valor Venda': 'float64',
+    'Desconto': 'float64',
+    'Acréscimo': 'float64',
+}
+
+TAMANHO_BLOCO = 50_000
+
+# Colunas mantidas em memória: as usadas pelos dashboards, pelos relatórios e pela detecção de anomalias
+# As demais (cupom, posto, preço unitário, desconto...) são descartadas bloco a bloco, logo após a leitura
+COLUNAS_DETALHE = ['Data/Hora', 'Dia', 'Ano', 'Mês', 'Placa', 'Motorista', 'Produto',
+                   'Km Ant.', 'Km Rod.', 'KM/Lt', 'Quant.to ', 'Valor Venda']
+
+
+# Função para preparar um bloco lido do CSV (datas e colunas auxiliares usadas pelo dashboard)
+def _preparar_bloco(bloco):
+    bloco['Data/Hora'] = pd.to_datetime(bloco['Data/Hora'], format=FORMATO_DATA_HORA, errors='coerce')
+    bloco['Dia'] = bloco['Data/Hora'].dt.normalize()
+    bloco['Ano'] = bloco['Data/Hora'].dt.year
+    bloco['Mês'] = bloco['Data/Hora'].dt.month
+    bloco['Valor Venda'] = bloco['Valor Venda'].fillna(0)
+    return bloco
+
+
+# Função para ler o CSV em blocos de tamanho fixo, já tipados
+def ler_em_blocos(filepath, tamanho_bloco=TAMANHO_BLOCO):
+    leitor = pd.read_csv(filepath, sep=';', encoding='utf-8', decimal=',', dtype=TIPOS_CONSUMO, chunksize=tamanho_bloco)
+    for bloco in leitor:
+        yield _preparar_bloco(bloco)
+
+
+# Função para somar os totais de um bloco nos acumuladores mensais (Ano, Mês)
+def _acumular_mensal(acumulado, bloco):
+    parcial = bloco.groupby(['Ano', 'Mês']).agg(
+        **{'Valor Venda': ('Valor Venda', 'sum'), 'Km Rod.': ('Km Rod.', 'sum'), 'Abastecimentos': ('Valor Venda', 'size')}
+    )
+    return parcial if acumulado is None else acumulado.add(parcial, fill_value=0)
+
+
+# Função para concatenar blocos mantendo as colunas categóricas (une as categorias de todos os blocos)
+def _concatenar_blocos(blocos):
+    if not blocos:
+        return pd.DataFrame()
+    for coluna in [c for c, tipo in TIPOS_CONSUMO.items() if tipo == 'category' and c in blocos[0].columns]:
+        categorias = union_categoricals([bloco[coluna] for bloco in blocos]).categories
+        for bloco in blocos:
+            bloco[coluna] = bloco[coluna].cat.set_categories(categorias)
+    return pd.concat(blocos, ignore_index=True)
+
+
+# Função para agregar o histórico mês a mês sem manter as linhas em memória (memória limitada ao bloco)
+def agregar_mensal(filepath, tamanho_bloco=TAMANHO_BLOCO):
+    acumulado = None
+    for bloco in ler_em_blocos(filepath, tamanho_bloco):
+        acumulado = _acumular_mensal(acumulado, bloco)
+    return _finalizar_mensal(acumulado)
+
+
+def _finalizar_mensal(acumulado):
+    if acumulado is None:
+        return pd.DataFrame(columns=['Ano', 'Mês', 'Valor Venda', 'Km Rod.', 'Abastecimentos'])
+    acumulado['Abastecimentos'] = acumulado['Abastecimentos'].astype(int)
+    return acumulado.sort_index().reset_index()
+
+
+# Função para carregar o histórico em blocos: devolve as linhas (tipadas, só com as colunas de detalhe) e os totais
+# mensais, acumulados bloco a bloco durante a própria leitura
+def carregar_consumo(filepath, tamanho_bloco=TAMANHO_BLOCO, colunas=COLUNAS_DETALHE):
+    blocos = []
+    acumulado = None
+    for bloco in ler_em_blocos(filepath, tamanho_bloco):
+        acumulado = _acumular_mensal(acumulado, bloco)
+        blocos.append(bloco[colunas])
+    return _concatenar_blocos(blocos), _finalizar_mensal(acumulado)
@@ -0,0 +1,94 @@
+import hashlib
+import io
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+# Colunas do sistema de ocorrências que não são usadas nos relatórios
+COLUNAS_PARA_REMOVER = ['Id', 'N', 'N° Talão', 'N° BO GCM', 'Anexos', 'Suporte à guarnição', 'Status']
+
+# Mapeamento das colunas sem cabeçalho da planilha financeira
+COLUNAS_VALORES = {'Unnamed: 9': 'Valor Total', 'Unnamed: 8': 'Valor'}
+
+
+# Normalização das exportações de ocorrências: remove as colunas indesejadas
+def normalizar_ocorrencias(df):
+    return df.drop(columns=[coluna for coluna in COLUNAS_PARA_REMOVER if coluna in df.columns])
+
+
+# Normalização da planilha financeira: mantém apenas 'Valor Total' e 'Valor' (vindas de 'Unnamed: 9' e 'Unnamed: 8')
+def normalizar_valores(df):
+    faltando = [coluna for coluna in COLUNAS_VALORES if coluna not in df.columns]
+    if faltando:
+        raise ValueError(f"As seguintes colunas não foram encontradas no arquivo: {', '.join(faltando)}")
+    return df[list(COLUNAS_VALORES)].rename(columns=COLUNAS_VALORES)
+
+
+# Pool de processos compartilhado por todas as leituras do servidor: criado no primeiro uso (os processos ficam prontos
+# para os próximos uploads) e recriado se algum processo morrer
+_executor = None
+_trava_executor = threading.Lock()
+
+
+def _executor_planilhas():
+    global _executor
+    with _trava_executor:
+        if _executor is None:
+            _executor = ProcessPoolExecutor()
+        return _executor
+
+
+def _descartar_executor(executor):
+    global _executor
+    with _trava_executor:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Função para identificar os arquivos enviados pelo conteúdo: (nome, SHA-256) de cada um, na ordem do upload
+# Usada como chave do cache das leituras nos dashboards
+def assinatura_arquivos(arquivos):
+    return tuple((nome, hashlib.sha256(conteudo).hexdigest()) for nome, conteudo in arquivos)
+
+
+# Tarefa do pool: lê uma planilha a partir dos bytes e aplica a normalização
+def _ler_planilha(conteudo, normalizar):
+    return normalizar(pd.read_excel(io.BytesIO(conteudo)))
+
+
+# Função para ler várias planilhas em paralelo (uma por processo do pool compartilhado) e concatená-las na ordem do upload
+# 'arquivos' é uma lista de (nome, bytes); 'ao_concluir(nome, concluidos, total, erro)' é chamado a cada arquivo
+# Retorna o DataFrame concatenado e um dicionário {nome: mensagem} com os arquivos que falharam
+def ler_planilhas(arquivos, normalizar=normalizar_ocorrencias, ao_concluir=None):
+    resultados, erros = {}, {}
+
+    def registrar(posicao, concluidos, tarefa):
+        nome = arquivos[posicao][0]
+        try:
+            resultados[posicao] = tarefa()
+        except Exception as erro:
+            erros[nome] = str(erro)
+        if ao_concluir:
+            ao_concluir(nome, concluidos, len(arquivos), erros.get(nome))
+
+    if len(arquivos) == 1:
+        registrar(0, 1, lambda: _ler_planilha(arquivos[0][1], normalizar))
+    elif arquivos:
+        executor = _executor_planilhas()
+        try:
+            futuros = {executor.submit(_ler_planilha, conteudo, normalizar): posicao
+                       for posicao, (_, conteudo) in enumerate(arquivos)}
+        except BrokenProcessPool:
+            _descartar_executor(executor)
+            raise
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            registrar(futuros[futuro], concluidos, futuro.result)
+        if any(isinstance(futuro.exception(), BrokenProcessPool) for futuro in futuros):
+            _descartar_executor(executor)
+
+    frames = [resultados[posicao] for posicao in sorted(resultados)]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return df, erros
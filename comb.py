@@ -1,5 +1,6 @@
 import streamlit as st
-import pandas as pd
+from carga_planilhas import assinatura_arquivos, ler_planilhas, normalizar_valores
+from limpeza_valores import limpar_valores
 
 # Configuração da página em modo "wide"
 st.set_page_config(layout="wide")
@@ -7,48 +8,48 @@ st.set_page_config(layout="wide")
 # Título da aplicação
 st.title("Leitor de Excel para DataFrame")
 
-# Upload do arquivo Excel
-uploaded_file = st.file_uploader("Carregue seu arquivo Excel", type=["xlsx"])
+# Leitura das planilhas enviadas (mantendo apenas 'Valor Total' e 'Valor'), com progresso por arquivo
+# Feita uma vez por conjunto de arquivos (nome e hash do conteúdo de cada um): as interações seguintes usam o cache
+# O progresso é criado dentro da função para que o cache possa reproduzi-lo
+@st.cache_data(show_spinner=False, max_entries=4)
+def ler_uploads(assinatura, _arquivos):
+    progresso = st.progress(0.0, text="Lendo arquivos...")
 
-if uploaded_file is not None:
-    # Ler o arquivo Excel
-    df = pd.read_excel(uploaded_file)
+    def atualizar_progresso(nome, concluidos, total, erro):
+        progresso.progress(concluidos / total, text=f"{concluidos}/{total} arquivos lidos ({nome})")
 
-    # Verifica se as colunas 'Unnamed: 9' e 'Unnamed: 8' existem
-    if 'Unnamed: 9' in df.columns and 'Unnamed: 8' in df.columns:
-        # Criar a nova coluna 'Valor Total' com os valores da coluna 'Unnamed: 9'
-        df['Valor Total'] = df['Unnamed: 9']
+    resultado = ler_planilhas(_arquivos, normalizar_valores, ao_concluir=atualizar_progresso)
+    progresso.empty()
+    return resultado
 
-        # Criar a nova coluna 'Valor' com os valores da coluna 'Unnamed: 8'
-        df['Valor'] = df['Unnamed: 8']
+# Upload dos arquivos Excel (um ou vários, lidos em paralelo e concatenados)
+uploaded_files = st.file_uploader("Carregue seus arquivos Excel", type=["xlsx"], accept_multiple_files=True)
 
-        # Manter apenas as colunas 'Valor Total' e 'Valor'
-        df = df[['Valor Total', 'Valor']]
+if uploaded_files:
+    # Ler os arquivos mantendo apenas 'Valor Total' (coluna 'Unnamed: 9') e 'Valor' (coluna 'Unnamed: 8'),
+    # relidos apenas quando os arquivos enviados mudam
+    arquivos = [(arquivo.name, arquivo.getvalue()) for arquivo in uploaded_files]
+    df, erros = ler_uploads(assinatura_arquivos(arquivos), arquivos)
 
-        # Remover linhas onde 'Valor Total' ou 'Valor' são 0 ou que contenham 'Observação'
-        df = df[(df['Valor Total'] != 0) & (df['Valor'] != 0)]  # Remove linhas com valor 0
-        df = df[~df.apply(lambda row: row.astype(str).str.contains('Observação').any(), axis=1)]  # Remove linhas com 'Observação'
-        df = df.dropna()  # Remove linhas com NaN
+    # Arquivos sem as colunas esperadas são informados e ficam de fora
+    for nome, erro in erros.items():
+        st.error(f"{nome}: {erro}")
 
-        # Arredondar os valores para 2 casas decimais
-        df['Valor Total'] = df['Valor Total'].round(2)
-        df['Valor'] = df['Valor'].round(2)
-
-        # Formatar os valores para exibição com 2 casas decimais
-        df['Valor Total'] = df['Valor Total'].map('{}'.format)
-        df['Valor'] = df['Valor'].map('{:,.2f}'.format)
+    if not df.empty:
+        # Remover linhas com valor 0, NaN ou que contenham 'Observação', com os valores arredondados para 2 casas
+        # O zero é verificado só no 'Valor Total': 'Valor' é o desconto do abastecimento, normalmente 0,000
+        df = limpar_valores(df, ['Valor Total', 'Valor'], colunas_zero=['Valor Total'])
 
         # Exibir o DataFrame
         st.subheader("Dados do Arquivo Excel (Apenas 'Valor Total' e 'Valor')")
-        st.dataframe(df, width=1950)
-    else:
-        missing_columns = []
-        if 'Unnamed: 9' not in df.columns:
-            missing_columns.append("Unnamed: 9")
-        if 'Unnamed: 8' not in df.columns:
-            missing_columns.append("Unnamed: 8")
-        
-        st.error(f"As seguintes colunas não foram encontradas no arquivo: {', '.join(missing_columns)}")
+        st.dataframe(
+            df,
+            width=1950,
+            column_config={
+                'Valor Total': st.column_config.NumberColumn(format="%.2f"),
+                'Valor': st.column_config.NumberColumn(format="accounting"),
+            },
+        )
 
 else:
-    st.write("Por favor, carregue um arquivo Excel para visualizar os dados.")
+    st.write("Por favor, carregue um ou mais arquivos Excel para visualizar os dados.")
@@ -0,0 +1,38 @@
+# Dimensões do cubo de contagem de atendimentos
+DIMENSOES = ['Mês', 'Dia', 'Turno', 'Natureza', 'Guarnição']
+
+# Valores de filtro que significam "sem filtro" nos selectbox dos dashboards
+VALORES_SEM_FILTRO = (None, "TODOS", "Todas")
+
+
+# Função para materializar o cubo: uma linha por combinação (Mês, Dia, Turno, Natureza, Guarnição) com a contagem
+# Deve ser construído uma vez por versão dos dados; os blocos do dashboard apenas fatiam e somam o cubo
+def construir_cubo(df, dimensoes=DIMENSOES):
+    return df.groupby(dimensoes, observed=True, dropna=False).size().reset_index(name='Atendimentos')
+
+
+# Função para fatiar o cubo por igualdade nas dimensões informadas (ignora filtros "TODOS"/"Todas"/None)
+def fatiar(cubo, filtros):
+    mascara = None
+    for dimensao, valor in filtros.items():
+        if valor in VALORES_SEM_FILTRO:
+            continue
+        condicao = cubo[dimensao] == valor
+        mascara = condicao if mascara is None else mascara & condicao
+    return cubo if mascara is None else cubo[mascara]
+
+
+# Função para somar o cubo por uma ou mais dimensões, do maior para o menor total
+def totais_por(cubo, dimensoes):
+    totais = cubo.groupby(dimensoes, observed=True)['Atendimentos'].sum()
+    return totais[totais > 0].sort_values(ascending=False, kind='stable')
+
+
+# Função para obter o total de atendimentos de uma fatia do cubo
+def total(cubo):
+    return int(cubo['Atendimentos'].sum())
+
+
+# Função para listar os meses do cubo do mais recente para o mais antigo (opções do filtro de mês)
+def meses_do_cubo(cubo):
+    return cubo.sort_values('Dia', ascending=False, kind='stable')['Mês'].unique().tolist()
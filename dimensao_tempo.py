@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from turnos import classificar_turno, ordem_turnos
+
+# Dimensão de tempo montada uma vez na carga: uma chave inteira por balde de tempo para cada linha
+# Chave Hora 0-23, Chave Dia AAAAMMDD, Chave Semana ISO AAAAWW, Chave Mês AAAAMM e Chave Turno (código do turno)
+# Linhas sem data recebem -1 em todas as chaves
+BALDES = ['Hora', 'Dia', 'Semana ISO', 'Mês', 'Turno']
+COLUNAS_TEMPO = [f"Chave {balde}" for balde in BALDES]
+TIPOS_CHAVE = {'Hora': np.int8, 'Dia': np.int32, 'Semana ISO': np.int32, 'Mês': np.int32, 'Turno': np.int8}
+
+
+# Função para construir a dimensão de tempo de uma série datetime (uma linha por data, mesmo índice)
+def construir_dimensao_tempo(datas):
+    datas = pd.to_datetime(datas)
+    validas = datas.notna().to_numpy()
+    preenchidas = datas.fillna(pd.Timestamp(0))  # Datas vazias recebem uma data qualquer e depois a chave -1
+    ano, mes, dia = (preenchidas.dt.year.to_numpy(), preenchidas.dt.month.to_numpy(), preenchidas.dt.day.to_numpy())
+    semana_iso = preenchidas.dt.isocalendar()
+
+    chaves = {
+        'Hora': preenchidas.dt.hour.to_numpy(),
+        'Dia': ano * 10000 + mes * 100 + dia,
+        'Semana ISO': semana_iso['year'].to_numpy(dtype=np.int64) * 100 + semana_iso['week'].to_numpy(dtype=np.int64),
+        'Mês': ano * 100 + mes,
+        'Turno': classificar_turno(datas).cat.codes.to_numpy(),
+    }
+    return pd.DataFrame(
+        {f"Chave {balde}": np.where(validas, chave, -1).astype(TIPOS_CHAVE[balde]) for balde, chave in chaves.items()},
+        index=datas.index,
+    )
+
+
+# Função para converter uma série de chaves em rótulos, calculando cada rótulo uma vez por chave distinta
+def _rotular(chaves, rotulo):
+    unicas, codigos = np.unique(np.asarray(chaves), return_inverse=True)
+    rotulos = np.array([rotulo(chave) if chave >= 0 else None for chave in unicas.tolist()], dtype=object)
+    return rotulos[codigos.ravel()]
+
+
+# Funções de rótulo por chave: data do dia, primeiro dia do mês e nome do mês com o ano ("October 2024")
+def data_do_dia(chave):
+    return pd.Timestamp(year=chave // 10000, month=chave // 100 % 100, day=chave % 100).date()
+
+
+def inicio_do_mes(chave):
+    return pd.Timestamp(year=chave // 100, month=chave % 100, day=1)
+
+
+def rotulo_mes(chave):
+    return inicio_do_mes(chave).strftime('%B %Y')
+
+
+# Função para obter o primeiro e o último dia do mês de uma chave AAAAMM
+def intervalo_mes(chave):
+    inicio = inicio_do_mes(chave)
+    return inicio, inicio + pd.offsets.MonthEnd(0)
+
+
+# Função para obter as datas (meia-noite) das chaves de dia; chaves -1 viram NaT
+def datas_do_dia(chaves):
+    return pd.Series(pd.to_datetime(_rotular(chaves, data_do_dia)), index=getattr(chaves, 'index', None))
+
+
+# Função para derivar, a partir da dimensão de tempo, as colunas de rótulo usadas no cubo e nos filtros:
+# Dia (date), Mês ("%B %Y", categoria em ordem cronológica) e Turno (categoria ordenada Manhã, Tarde, Madrugada)
+def rotular_tempo(tempo):
+    meses = np.unique(tempo['Chave Mês'].to_numpy())
+    meses = meses[meses >= 0]
+    return pd.DataFrame({
+        'Dia': _rotular(tempo['Chave Dia'], data_do_dia),
+        'Mês': pd.Categorical(_rotular(tempo['Chave Mês'], rotulo_mes), categories=[rotulo_mes(mes) for mes in meses.tolist()], ordered=True),
+        'Turno': pd.Categorical.from_codes(tempo['Chave Turno'].to_numpy(), categories=ordem_turnos(), ordered=True),
+    }, index=tempo.index)
+
+
+# Função para montar os agregados por balde: para cada balde, a quantidade de linhas por chave (ordem crescente)
+# Montados uma vez por versão dos dados; os dashboards leem as contagens daqui em vez de agrupar datas a cada execução
+def construir_rollups(tempo, baldes=BALDES):
+    rollups = {}
+    for balde in baldes:
+        chaves, contagens = np.unique(tempo[f"Chave {balde}"].to_numpy(), return_counts=True)
+        validas = chaves >= 0
+        rollups[balde] = pd.Series(contagens[validas], index=pd.Index(chaves[validas], name=f"Chave {balde}"), name='Atendimentos')
+    return rollups
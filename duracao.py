@@ -0,0 +1,25 @@
+import pandas as pd
+
+# Padrão da coluna 'Duração' do sistema: "03min", "1h 25min", "2h"
+PADRAO_DURACAO = r'^\s*(?:(?P<horas>\d+)\s*h)?\s*(?:(?P<minutos>\d+)\s*min)?\s*$'
+
+
+# Função vetorizada para converter a coluna 'Duração' em minutos
+# Quando o texto está vazio ou fora do padrão, usa 'Data/Hora final' - 'Data/Hora inicial' (se informados)
+# Retorna a série em minutos (NaN quando não foi possível calcular) e a quantidade de linhas não convertidas
+def converter_duracoes(duracao, inicio=None, fim=None):
+    partes = duracao.astype("string").str.extract(PADRAO_DURACAO)
+    horas = pd.to_numeric(partes['horas'], errors='coerce')
+    minutos = pd.to_numeric(partes['minutos'], errors='coerce')
+
+    # Só considera convertido quando ao menos horas ou minutos foram encontrados
+    convertido = horas.notna() | minutos.notna()
+    resultado = (horas.fillna(0) * 60 + minutos.fillna(0)).where(convertido)
+
+    if inicio is not None and fim is not None:
+        diferenca = (pd.to_datetime(fim) - pd.to_datetime(inicio)).dt.total_seconds() / 60
+        diferenca = diferenca.where(diferenca >= 0)
+        resultado = resultado.fillna(diferenca.round())
+
+    nao_convertidas = int(resultado.isna().sum())
+    return resultado.astype(float), nao_convertidas
@@ -0,0 +1,175 @@
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from esquema import derivar_categorias
+from filtros import posicoes_por_valor
+
+# Gazetteer local (offline) de Paulínia: CSV com as colunas Logradouro, Bairro, Latitude e Longitude
+# Linhas com Bairro vazio dão o ponto de referência do logradouro inteiro; linhas com Logradouro vazio, o do bairro
+ARQUIVO_GAZETTEER = os.environ.get("GAZETTEER_PAULINIA", "gazetteer_paulinia.csv")
+COLUNAS_GAZETTEER = ['Logradouro', 'Bairro', 'Latitude', 'Longitude']
+
+# Tamanho da célula da grade, em graus (0,005° ≈ 550 m em Paulínia)
+TAMANHO_CELULA = 0.005
+
+# Abreviações expandidas na forma canônica (palavra inteira, já sem acento e sem ponto)
+ABREVIACOES = {
+    'AV': 'AVENIDA', 'R': 'RUA', 'AL': 'ALAMEDA', 'TV': 'TRAVESSA', 'TRAV': 'TRAVESSA',
+    'PCA': 'PRACA', 'PC': 'PRACA', 'EST': 'ESTRADA', 'ESTR': 'ESTRADA', 'ROD': 'RODOVIA',
+    'DR': 'DOUTOR', 'PROF': 'PROFESSOR', 'STA': 'SANTA', 'STO': 'SANTO',
+    'JD': 'JARDIM', 'JDM': 'JARDIM', 'PQ': 'PARQUE', 'VL': 'VILA', 'RES': 'RESIDENCIAL',
+}
+
+# Separador entre as partes do endereço exportado ("[código - ponto - ]logradouro[, número] - bairro")
+_SEPARADOR = re.compile(r'\s+-\s+')
+_NUMERO = re.compile(r',\s*(\d+)\s*$')
+_PARENTESES = re.compile(r'\([^)]*\)')
+_PONTUACAO = re.compile(r'[.;]')
+
+
+# Função para canonicalizar um nome: sem acentos, maiúsculo, sem parênteses/pontuação e com abreviações expandidas
+def canonicalizar_nome(nome):
+    nome = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode().upper()
+    palavras = _PONTUACAO.sub(' ', _PARENTESES.sub(' ', nome)).split()
+    return ' '.join(ABREVIACOES.get(palavra, palavra) for palavra in palavras)
+
+
+# Função para separar o endereço exportado em (logradouro, número, bairro), já canonicalizados
+# O código e o nome do ponto de referência que às vezes antecedem o logradouro são descartados
+def separar_endereco(endereco):
+    partes = [parte for parte in _SEPARADOR.split(str(endereco).strip()) if parte]
+    if partes and partes[0].isdigit() and len(partes) > 1:
+        partes = partes[1:]
+    if len(partes) >= 2:
+        logradouro, bairro = partes[-2], partes[-1]
+    else:
+        logradouro, bairro = (partes[0] if partes else ''), ''
+    numero = _NUMERO.search(logradouro)
+    if numero:
+        logradouro = logradouro[:numero.start()]
+    return canonicalizar_nome(logradouro), numero.group(1) if numero else '', canonicalizar_nome(bairro)
+
+
+# Função para normalizar a coluna de endereços: o parsing é feito uma vez por endereço distinto (categoria)
+# Retorna as colunas Logradouro, Número, Bairro e Endereço Normalizado ("LOGRADOURO[, NÚMERO] - BAIRRO")
+def normalizar_enderecos(serie):
+    def parte(indice):
+        return lambda categorias: categorias.map(lambda endereco: separar_endereco(endereco)[indice])
+
+    def completo(categorias):
+        def formatar(endereco):
+            logradouro, numero, bairro = separar_endereco(endereco)
+            texto = f"{logradouro}, {numero}" if numero else logradouro
+            return f"{texto} - {bairro}" if bairro else texto
+        return categorias.map(formatar)
+
+    return pd.DataFrame({
+        'Logradouro': derivar_categorias(serie, parte(0)),
+        'Número': derivar_categorias(serie, parte(1)),
+        'Bairro': derivar_categorias(serie, parte(2)),
+        'Endereço Normalizado': derivar_categorias(serie, completo),
+    })
+
+
+# Função para carregar o gazetteer local, com os nomes canonicalizados; sem o arquivo, retorna um gazetteer vazio
+def carregar_gazetteer(caminho=ARQUIVO_GAZETTEER):
+    if not os.path.exists(caminho):
+        return pd.DataFrame(columns=COLUNAS_GAZETTEER)
+    gazetteer = pd.read_csv(caminho, dtype={'Logradouro': str, 'Bairro': str}, keep_default_na=False)
+    faltando = [coluna for coluna in COLUNAS_GAZETTEER if coluna not in gazetteer.columns]
+    if faltando:
+        raise ValueError(f"As seguintes colunas não foram encontradas no gazetteer: {', '.join(faltando)}")
+    gazetteer['Logradouro'] = gazetteer['Logradouro'].map(canonicalizar_nome)
+    gazetteer['Bairro'] = gazetteer['Bairro'].map(canonicalizar_nome)
+    return gazetteer[COLUNAS_GAZETTEER].drop_duplicates(['Logradouro', 'Bairro'])
+
+
+# Função para localizar cada combinação (logradouro, bairro): primeiro o trecho no bairro, depois o logradouro
+# inteiro e, por último, o centro do bairro. Retorna latitude e longitude por linha (NaN quando não localizada)
+def localizar(partes, gazetteer):
+    pontos = {(linha.Logradouro, linha.Bairro): (linha.Latitude, linha.Longitude) for linha in gazetteer.itertuples()}
+    chaves = [partes[coluna].astype(object).fillna('').to_numpy() for coluna in ('Logradouro', 'Bairro')]
+    codigos, combinacoes = pd.MultiIndex.from_arrays(chaves).factorize()
+    coordenadas = np.full((len(combinacoes), 2), np.nan)
+    for k, (logradouro, bairro) in enumerate(combinacoes):
+        ponto = pontos.get((logradouro, bairro)) or pontos.get((logradouro, '')) or (bairro and pontos.get(('', bairro)))
+        if ponto:
+            coordenadas[k] = ponto
+    return coordenadas[codigos, 0], coordenadas[codigos, 1]
+
+
+# Função para construir o índice de endereços: forma normalizada por linha, célula da grade e índices invertidos
+# célula -> posições e endereço normalizado -> posições (posições = linhas do DataFrame, em ordem crescente)
+def construir_indice_enderecos(df, coluna='Endereço do fato', gazetteer=None, tamanho_celula=TAMANHO_CELULA):
+    partes = normalizar_enderecos(df[coluna].reset_index(drop=True))
+    gazetteer = carregar_gazetteer() if gazetteer is None else gazetteer
+    latitude, longitude = localizar(partes, gazetteer)
+
+    # Célula de cada linha como (linha, coluna) da grade; linhas não localizadas ficam sem célula
+    localizadas = ~np.isnan(latitude)
+    grade = np.full((len(partes), 2), -1, dtype=np.int64)
+    grade[localizadas, 0] = np.floor(latitude[localizadas] / tamanho_celula)
+    grade[localizadas, 1] = np.floor(longitude[localizadas] / tamanho_celula)
+    celulas = pd.Series(pd.MultiIndex.from_arrays([grade[:, 0], grade[:, 1]]).to_flat_index()).where(localizadas)
+
+    return {
+        'partes': partes,
+        'com_gazetteer': not gazetteer.empty,  # Sem gazetteer nenhuma linha é localizada (os mapas ficam ocultos)
+        'tamanho_celula': tamanho_celula,
+        'celulas': posicoes_por_valor(celulas),
+        'enderecos': posicoes_por_valor(partes['Endereço Normalizado']),
+    }
+
+
+# Função para restringir as posições do índice invertido às posições selecionadas (ex.: linhas de uma natureza)
+def _restringir(posicoes_indice, posicoes):
+    return posicoes_indice if posicoes is None else np.intersect1d(posicoes_indice, posicoes, assume_unique=True)
+
+
+# Função para os pontos quentes: total por célula (centro da célula) e o endereço mais frequente nela
+# 'posicoes' restringe a contagem a um subconjunto de linhas (ordenado); None usa todas
+def pontos_quentes(indice, posicoes=None):
+    enderecos = indice['partes']['Endereço Normalizado']
+    tamanho = indice['tamanho_celula']
+    linhas = []
+    for (linha, coluna), posicoes_celula in indice['celulas'].items():
+        posicoes_celula = _restringir(posicoes_celula, posicoes)
+        if len(posicoes_celula):
+            linhas.append({
+                'Latitude': (linha + 0.5) * tamanho,
+                'Longitude': (coluna + 0.5) * tamanho,
+                'Ocorrências': len(posicoes_celula),
+                'Endereço mais frequente': enderecos.iloc[posicoes_celula].value_counts().index[0],
+            })
+    quentes = pd.DataFrame(linhas, columns=['Latitude', 'Longitude', 'Ocorrências', 'Endereço mais frequente'])
+    return quentes.sort_values('Ocorrências', ascending=False, ignore_index=True)
+
+
+# Função para contar as ocorrências por endereço normalizado (variações de grafia somadas), do maior para o menor
+# Um único agrupamento pelos códigos da coluna normalizada, restrito às linhas selecionadas
+def contar_enderecos(indice, posicoes=None):
+    enderecos = indice['partes']['Endereço Normalizado']
+    if posicoes is not None:
+        enderecos = enderecos.iloc[posicoes]
+    contagem = enderecos.groupby(enderecos, observed=True).size().sort_values(ascending=False, kind='stable')
+    contagem.index = pd.Index(contagem.index.astype(object), name='Endereço Normalizado')
+    return contagem.rename('Ocorrências')
+
+
+# Função para o detalhamento de um endereço normalizado: posições das suas linhas (restritas a 'posicoes')
+def linhas_do_endereco(indice, endereco, posicoes=None):
+    return _restringir(indice['enderecos'].get(endereco, np.array([], dtype=np.intp)), posicoes)
+
+
+# Função para gerar o modelo do gazetteer com as combinações (logradouro, bairro) ainda não localizadas
+# (para preencher Latitude e Longitude e salvar como gazetteer_paulinia.csv)
+def modelo_gazetteer(indice, gazetteer=None):
+    partes = indice['partes']
+    latitude, _ = localizar(partes, carregar_gazetteer() if gazetteer is None else gazetteer)
+    faltando = partes.loc[np.isnan(latitude), ['Logradouro', 'Bairro']].astype(str)
+    modelo = faltando.value_counts().rename('Ocorrências').reset_index()
+    return modelo.assign(Latitude=np.nan, Longitude=np.nan)[COLUNAS_GAZETTEER + ['Ocorrências']]
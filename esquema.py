@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+# Colunas de texto repetitivo convertidas para categoria na carga (poucos valores distintos, muitas linhas)
+COLUNAS_CATEGORICAS = ['Natureza', 'Guarnição', 'Endereço do fato', 'Placa']
+
+
+# Função para normalizar o esquema na carga: converte as colunas categóricas presentes no DataFrame
+def normalizar_esquema(df, colunas=COLUNAS_CATEGORICAS):
+    for coluna in colunas:
+        if coluna in df.columns and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+
+# Função para derivar uma coluna categórica aplicando 'funcao' apenas às categorias (não a cada linha)
+# Categorias que ficam iguais após a transformação são unificadas; valores vazios continuam vazios
+def derivar_categorias(serie, funcao):
+    serie = serie if isinstance(serie.dtype, pd.CategoricalDtype) else serie.astype('category')
+    derivadas = pd.Index(funcao(serie.cat.categories.to_series()).to_numpy())
+    unicas = derivadas.dropna().unique()
+    mapa_codigos = np.append(unicas.get_indexer(derivadas), -1)  # Código -1 (vazio) aponta para o último item
+    novos_codigos = mapa_codigos[serie.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(novos_codigos, unicas), index=serie.index, name=serie.name)
+
+
+# Função para limitar o texto das categorias a 'tamanho' caracteres (ex.: Guarnição com 7 caracteres)
+def truncar(serie, tamanho):
+    return derivar_categorias(serie, lambda categorias: categorias.str[:tamanho])
+
+
+# Função para extrair o código da Natureza ("46 - Perturbação do sossego" -> "46")
+def codigo_natureza(serie):
+    return derivar_categorias(serie, lambda categorias: categorias.str.split(' - ').str[0])
+
+
+# Função para preencher valores vazios de uma coluna categórica com um valor que pode não ser categoria
+def preencher_categoria(serie, valor):
+    if valor not in serie.cat.categories:
+        serie = serie.cat.add_categories([valor])
+    return serie.fillna(valor)
+
+
+# Função de contagem por valor sem as categorias ausentes (value_counts lista categorias com contagem zero)
+def contar(serie):
+    contagem = serie.value_counts()
+    return contagem[contagem > 0]
@@ -0,0 +1,152 @@
+import os
+import re
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+from openpyxl import Workbook
+
+from ingestao import DIRETORIO_CACHE
+
+# Exportação dos resultados filtrados (XLSX, CSV ou Parquet) gerada em segundo plano, sem bloquear a sessão
+DIRETORIO_EXPORTACOES = os.path.join(DIRETORIO_CACHE, "exportacoes")
+
+# Nome da planilha no XLSX (o mesmo de arquivo_com_filtros.xlsx, lido por colunas.py)
+PLANILHA_PADRAO = "FilteredData"
+
+# Linhas convertidas por vez na escrita do XLSX (a memória usada não cresce com o tamanho do resultado)
+TAMANHO_BLOCO = 10_000
+
+# Formatos disponíveis: extensão e tipo MIME do download
+FORMATOS = {
+    'XLSX': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'CSV': ('.csv', 'text/csv'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+# Poucas threads para todo o servidor: as exportações ficam na fila em vez de competir com as sessões
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="exportacao")
+
+_CHAVE_TRABALHOS = "_exportacoes"
+
+
+# Função para converter um bloco de linhas em valores aceitos pelo openpyxl (vazios viram None, categorias viram texto)
+def _valores_bloco(bloco):
+    colunas = []
+    for coluna in bloco.columns:
+        serie = bloco[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype(object)
+        elif pd.api.types.is_timedelta64_dtype(serie.dtype):
+            serie = serie.astype(str)  # Excel não tem tipo de duração
+        colunas.append(serie.astype(object).where(serie.notna(), None).tolist())
+    return zip(*colunas)
+
+
+# Função para gravar o XLSX com um workbook somente escrita (as linhas vão direto para o arquivo, bloco a bloco)
+def exportar_xlsx(df, caminho, planilha=PLANILHA_PADRAO, tamanho_bloco=TAMANHO_BLOCO):
+    workbook = Workbook(write_only=True)
+    aba = workbook.create_sheet(planilha)
+    aba.append([str(coluna) for coluna in df.columns])
+    for inicio in range(0, len(df), tamanho_bloco):
+        for linha in _valores_bloco(df.iloc[inicio:inicio + tamanho_bloco]):
+            aba.append(linha)
+    workbook.save(caminho)
+
+
+# Função para gravar o CSV no mesmo padrão dos arquivos do repositório (separador ';' e vírgula decimal)
+# O BOM do utf-8-sig faz o Excel reconhecer os acentos
+def exportar_csv(df, caminho):
+    df.to_csv(caminho, sep=';', decimal=',', index=False, encoding='utf-8-sig')
+
+
+def exportar_parquet(df, caminho):
+    df.to_parquet(caminho, index=False)
+
+
+EXPORTADORES = {'XLSX': exportar_xlsx, 'CSV': exportar_csv, 'Parquet': exportar_parquet}
+
+
+def _remover_arquivo(caminho):
+    for arquivo in (caminho, caminho + ".tmp"):
+        if os.path.exists(arquivo):
+            os.remove(arquivo)
+
+
+# Função para iniciar a exportação em segundo plano; devolve o Future com o caminho do arquivo gerado
+# O DataFrame não deve ser alterado enquanto a exportação estiver em andamento
+# O arquivo é removido quando o Future deixa de existir (fim da sessão ou encerramento do servidor), se ainda existir
+def iniciar_exportacao(df, formato, diretorio=DIRETORIO_EXPORTACOES):
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, uuid.uuid4().hex + FORMATOS[formato][0])
+
+    def exportar():
+        EXPORTADORES[formato](df, caminho + ".tmp")
+        os.replace(caminho + ".tmp", caminho)
+        return caminho
+
+    futuro = _executor.submit(exportar)
+    weakref.finalize(futuro, _remover_arquivo, caminho)
+    return futuro
+
+
+# Função para obter o conteúdo do arquivo exportado: lido uma única vez, no primeiro download, e guardado na sessão
+# O arquivo é removido logo após a leitura (os downloads seguintes usam o conteúdo guardado)
+def _conteudo(trabalho):
+    if 'conteudo' not in trabalho:
+        caminho = trabalho['futuro'].result()
+        with open(caminho, "rb") as arquivo:
+            trabalho['conteudo'] = arquivo.read()
+        _remover_arquivo(caminho)
+    return trabalho['conteudo']
+
+
+# Função para descartar o arquivo de uma exportação anterior da sessão (apenas se já terminou com sucesso)
+def _descartar(trabalho):
+    futuro = trabalho['futuro']
+    if futuro.done() and futuro.exception() is None:
+        _remover_arquivo(futuro.result())
+
+
+# Fragmento que acompanha a exportação em andamento: reexecuta só esta parte a cada segundo e,
+# ao terminar, reexecuta a página para exibir o botão de download
+@st.fragment(run_every=1)
+def _aguardar_exportacao(futuro):
+    if futuro.done():
+        st.rerun()
+    st.info("Gerando o arquivo em segundo plano... a página continua disponível.")
+
+
+# Função para exibir a exportação de um resultado: formato, geração em segundo plano e download
+# 'chave' identifica a exportação na sessão; 'assinatura' identifica o resultado pelo que o define (versão dos dados,
+# relatório e filtros), sem percorrer o DataFrame: uma nova geração é pedida quando a assinatura ou o formato mudam
+def exibir_exportacao(df, chave, nome_arquivo, assinatura):
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        formato = st.radio("Exportar como", list(FORMATOS), horizontal=True, key=f"{chave}_formato")
+    assinatura = (assinatura, formato)
+
+    trabalhos = st.session_state.setdefault(_CHAVE_TRABALHOS, {})
+    trabalho = trabalhos.get(chave)
+    if trabalho is None or trabalho['assinatura'] != assinatura:
+        with col2:
+            if not st.button("Gerar arquivo", key=f"{chave}_gerar", disabled=df.empty):
+                return
+        if trabalho is not None:
+            _descartar(trabalho)
+        trabalho = trabalhos[chave] = {'assinatura': assinatura, 'formato': formato, 'futuro': iniciar_exportacao(df, formato)}
+
+    futuro = trabalho['futuro']
+    if not futuro.done():
+        _aguardar_exportacao(futuro)
+    elif futuro.exception() is not None:
+        st.error(f"Não foi possível gerar o arquivo: {futuro.exception()}")
+        del trabalhos[chave]
+    else:
+        extensao, mime = FORMATOS[trabalho['formato']]
+        nome_arquivo = re.sub(r'[^\w-]+', '_', nome_arquivo).strip('_')  # Sem espaços, barras e pontuação no nome
+        # O conteúdo é lido só no clique (as reexecuções da página não leem o arquivo)
+        with col2:
+            st.download_button("Baixar arquivo", lambda: _conteudo(trabalho), file_name=nome_arquivo + extensao, mime=mime, key=f"{chave}_baixar")
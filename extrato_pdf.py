@@ -0,0 +1,114 @@
+import hashlib
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from PyPDF2 import PdfReader, PdfWriter
+
+from ingestao import DIRETORIO_CACHE
+
+# Diretório com os extratos já convertidos (um Parquet por hash do conteúdo do PDF)
+DIRETORIO_EXTRATOS = os.path.join(DIRETORIO_CACHE, "extratos")
+
+# Páginas por tarefa do pool de processos; PDFs menores que isso são processados no próprio processo
+PAGINAS_POR_TAREFA = 25
+
+COLUNAS_EXTRATO = ['Placa', 'Data de Emissão', 'Produto', 'Quantidade', 'Valor']
+
+# Rótulo das linhas sem placa na linha e sem cabeçalho "Agregado" antes delas (agrupadas à parte nos dashboards)
+SEM_PLACA = "Sem placa"
+
+# Versão do formato dos extratos convertidos: extratos gravados em formato anterior são convertidos de novo
+VERSAO_EXTRATO = 2
+
+# Cabeçalho de cada grupo do extrato: "Agregado: FDZ-7H43 - PLN-703"
+PADRAO_AGREGADO = re.compile(r'Agregado:\s*(?P<placa>[A-Z]{3}-?\d[A-Z0-9]\d{2})')
+
+# Linha de abastecimento: Doc, Ordem (opcional), Qtd. Parcel, Emissão, Produto, Val. Unt., Qtde, Acrésc., Desc.,
+# Val. Consu, Motorista e Placa (ex.: "773831 1 / 1 17/04/2024 DIESEL S10 5,790 38,151 0,000 0,000 220,890 BEATRIZ MEL FDZ-7H43 ...")
+PADRAO_LINHA = re.compile(
+    r'^\s*(?P<doc>\d+)\s+(?:\S+\s+)?(?P<parcela>\d+\s*/\s*\d+)\s+(?P<emissao>\d{2}/\d{2}/\d{4})\s+(?P<produto>.+?)\s+'
+    r'(?P<unitario>[\d.]+,\d+)\s+(?P<quantidade>[\d.]+,\d+)\s+(?P<acrescimo>[\d.]+,\d+)\s+(?P<desconto>[\d.]+,\d+)\s+'
+    r'(?P<valor>[\d.]+,\d+)(?:\s+(?P<motorista>.*?)\s*(?P<placa>[A-Z]{3}-?\d[A-Z0-9]\d{2})\b)?'
+)
+
+
+# Função para converter número no formato brasileiro ("1.553,11") em float
+def _numero(texto):
+    return float(texto.replace('.', '').replace(',', '.'))
+
+
+# Função para extrair as linhas de abastecimento de um trecho de texto
+# 'Agregado' guarda a placa do cabeçalho do grupo, usada quando a linha não traz a placa
+def interpretar_texto(texto, agregado=None):
+    linhas = []
+    for linha in texto.splitlines():
+        cabecalho = PADRAO_AGREGADO.search(linha)
+        if cabecalho:
+            agregado = cabecalho.group('placa')
+            continue
+        encontrada = PADRAO_LINHA.match(linha)
+        if encontrada:
+            linhas.append({
+                'Placa': encontrada.group('placa'),
+                'Agregado': agregado,
+                'Data de Emissão': encontrada.group('emissao'),
+                'Produto': encontrada.group('produto').strip(),
+                'Quantidade': _numero(encontrada.group('quantidade')),
+                'Valor': _numero(encontrada.group('valor')),
+            })
+    return linhas
+
+
+# Tarefa do pool: abre o PDF a partir dos bytes e interpreta todas as suas páginas
+def _extrair_paginas(conteudo):
+    leitor = PdfReader(io.BytesIO(conteudo))
+    return interpretar_texto("\n".join(pagina.extract_text() or "" for pagina in leitor.pages))
+
+
+# Função para gravar as páginas [inicio, fim) em um PDF próprio: cada tarefa recebe só a sua faixa, não o arquivo inteiro
+def _pdf_da_faixa(leitor, inicio, fim):
+    escritor = PdfWriter()
+    for i in range(inicio, fim):
+        escritor.add_page(leitor.pages[i])
+    buffer = io.BytesIO()
+    escritor.write(buffer)
+    return buffer.getvalue()
+
+
+# Função para montar o DataFrame final a partir das linhas de todas as faixas (na ordem das páginas)
+def _montar_dataframe(linhas):
+    if not linhas:
+        return pd.DataFrame(columns=COLUNAS_EXTRATO)
+    df = pd.DataFrame(linhas)
+    # O cabeçalho "Agregado" de uma faixa vale para as linhas seguintes, mesmo em outra faixa de páginas;
+    # linhas anteriores a qualquer cabeçalho e sem placa ficam com o rótulo SEM_PLACA
+    df['Placa'] = df['Placa'].fillna(df['Agregado'].ffill()).fillna(SEM_PLACA)
+    return df[COLUNAS_EXTRATO]
+
+
+# Função principal: extrai os abastecimentos de um extrato em PDF, com páginas interpretadas em paralelo
+# e resultado em cache pelo hash do conteúdo
+def extrair_extrato(conteudo, max_workers=None, diretorio=DIRETORIO_EXTRATOS):
+    os.makedirs(diretorio, exist_ok=True)
+    destino = os.path.join(diretorio, f"{hashlib.sha256(conteudo).hexdigest()[:32]}-v{VERSAO_EXTRATO}.parquet")
+    if os.path.exists(destino):
+        return pd.read_parquet(destino)
+
+    leitor = PdfReader(io.BytesIO(conteudo))
+    total_paginas = len(leitor.pages)
+    faixas = [(inicio, min(inicio + PAGINAS_POR_TAREFA, total_paginas)) for inicio in range(0, total_paginas, PAGINAS_POR_TAREFA)]
+
+    if len(faixas) <= 1:
+        resultados = [_extrair_paginas(conteudo)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # map preserva a ordem das faixas, necessária para propagar o "Agregado" entre páginas
+            resultados = list(executor.map(_extrair_paginas, (_pdf_da_faixa(leitor, inicio, fim) for inicio, fim in faixas)))
+
+    df = _montar_dataframe([linha for faixa in resultados for linha in faixa])
+    df.to_parquet(destino + ".tmp", index=False)
+    os.replace(destino + ".tmp", destino)
+    return df
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from cubo import VALORES_SEM_FILTRO
+
+POSICOES_VAZIAS = np.array([], dtype=np.intp)
+
+
+# Função para obter, para cada valor da série, as posições (crescentes) das linhas com aquele valor
+# Vazios recebem código -1 no factorize e ficam fora do índice
+def posicoes_por_valor(serie):
+    codigos, valores = pd.factorize(serie)
+    ordem = np.argsort(codigos, kind='stable')
+    limites = np.searchsorted(codigos[ordem], np.arange(len(valores) + 1))
+    return {valor: ordem[limites[k]:limites[k + 1]] for k, valor in enumerate(valores)}
+
+
+# Função para construir o índice de filtros: linhas ordenadas pela data e, para cada coluna de igualdade,
+# as posições (crescentes) das linhas de cada valor. Construído uma vez por versão dos dados
+def construir_indice_filtros(df, coluna_data, colunas):
+    ordenado = df.sort_values(coluna_data, kind='stable')
+    posicoes = {coluna: posicoes_por_valor(ordenado[coluna]) for coluna in colunas}
+    return {'dados': ordenado, 'datas': ordenado[coluna_data].to_numpy(), 'posicoes': posicoes}
+
+
+# Função para filtrar pelo intervalo [inicio, fim] de datas (busca binária) e por igualdade nas colunas indexadas
+# Filtros "TODOS"/"Todas"/None são ignorados; o resultado volta na ordem original do DataFrame
+def filtrar(indice, inicio=None, fim=None, igualdades=None):
+    datas = indice['datas']
+    i = 0 if inicio is None else int(np.searchsorted(datas, np.datetime64(inicio), side='left'))
+    j = len(datas) if fim is None else int(np.searchsorted(datas, np.datetime64(fim), side='right'))
+
+    # Posições de cada valor selecionado, já restritas ao intervalo de datas
+    conjuntos = []
+    for coluna, valor in (igualdades or {}).items():
+        if valor in VALORES_SEM_FILTRO:
+            continue
+        posicoes = indice['posicoes'][coluna].get(valor, POSICOES_VAZIAS)
+        conjuntos.append(posicoes[np.searchsorted(posicoes, i):np.searchsorted(posicoes, j)])
+
+    if not conjuntos:
+        return indice['dados'].iloc[i:j].sort_index()
+
+    # Interseção a partir do menor conjunto
+    conjuntos.sort(key=len)
+    posicoes = conjuntos[0]
+    for outro in conjuntos[1:]:
+        posicoes = np.intersect1d(posicoes, outro, assume_unique=True)
+    return indice['dados'].iloc[posicoes].sort_index()
@@ -0,0 +1,203 @@
+import argparse
+import html
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from anomalias_consumo import detectar_anomalias, motivos
+from armazem_ocorrencias import carregar_historico, listar_exportacoes
+from carga_consumo import carregar_consumo
+from cubo import construir_cubo, fatiar, meses_do_cubo
+from kpis_consumo import calcular_kpis_mes
+from relatorio_atendimento import grafico_atendimentos_dia, kpis_atendimento, montar_tabelas_turno, tabelas_natureza_viatura
+from relatorio_consumo import formatar_reais, grafico_total_por_mes, grafico_valor_diario, nome_mes, total_por_mes, variacao_quinzenal
+from servico_dados import ErroServico, consultar
+
+# Geração dos relatórios mensais estáticos, sem Streamlit: para cada mês, um HTML com os gráficos Plotly interativos
+# e um XLSX com as tabelas, usando as mesmas funções de agregação dos dashboards. Os meses são gerados em paralelo
+# Uso: python gerar_relatorios.py [--saida relatorios] [--conjuntos atendimento consumo] [--processos N]
+
+DIRETORIO_RELATORIOS = "relatorios"
+ARQUIVO_CONSUMO = "historico_consumo1.csv"
+CONJUNTOS = ('atendimento', 'consumo')
+
+# Colunas da tabela de anomalias (as mesmas exibidas em abastecimento.py)
+COLUNAS_ANOMALIAS = ['Data/Hora', 'Placa', 'Motorista', 'Produto', 'Km Ant.', 'Km Rod.', 'Quant.to ', 'KM/Lt', 'Eficiência Base']
+
+MODELO_PAGINA = """<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>{titulo}</title>
+<style>
+body {{ font-family: Verdana, sans-serif; color: #2C3E50; margin: 2rem; }}
+.kpis {{ display: flex; flex-wrap: wrap; gap: 1rem; }}
+.kpi {{ padding: 15px; border-radius: 10px; box-shadow: 0px 4px 12px rgba(0, 0, 0, 0.1); min-width: 200px; }}
+.kpi span {{ display: block; font-size: 14px; }}
+.kpi strong {{ font-size: 22px; }}
+table {{ border-collapse: collapse; margin-bottom: 2rem; }}
+th, td {{ border: 1px solid #d3d3d3; padding: 4px 8px; text-align: left; }}
+</style>
+</head>
+<body>
+<h1>{titulo}</h1>
+<p>Gerado em {gerado_em}</p>
+{conteudo}
+</body>
+</html>
+"""
+
+
+# Função para montar a página HTML: indicadores, gráficos e tabelas
+# Os gráficos usam o plotly.min.js gravado uma vez no diretório dos relatórios (funciona offline e fica no cache do navegador)
+def pagina_html(titulo, indicadores, figuras, tabelas):
+    partes = ['<div class="kpis">']
+    partes += [f'<div class="kpi"><span>{html.escape(rotulo)}</span><strong>{html.escape(str(valor))}</strong></div>'
+               for rotulo, valor in indicadores]
+    partes.append('</div>')
+    partes += [figura.to_html(full_html=False, include_plotlyjs='directory' if i == 0 else False) for i, figura in enumerate(figuras)]
+    for nome, tabela in tabelas.items():
+        partes.append(f"<h2>{html.escape(nome)}</h2>")
+        partes.append(tabela.to_html(index=False, border=0) if not tabela.empty else "<p>Nenhum registro.</p>")
+    return MODELO_PAGINA.format(titulo=html.escape(titulo), gerado_em=f"{datetime.now():%d/%m/%Y %H:%M}", conteudo="\n".join(partes))
+
+
+# Função para gravar o relatório de um mês: <caminho_base>.html e <caminho_base>.xlsx (uma aba por tabela)
+def gravar_relatorio(caminho_base, titulo, indicadores, figuras, tabelas):
+    with open(caminho_base + ".html", "w", encoding="utf-8") as arquivo:
+        arquivo.write(pagina_html(titulo, indicadores, figuras, tabelas))
+    with pd.ExcelWriter(caminho_base + ".xlsx", engine="openpyxl") as planilha:
+        pd.DataFrame(indicadores, columns=['Indicador', 'Valor']).to_excel(planilha, sheet_name="Indicadores", index=False)
+        for nome, tabela in tabelas.items():
+            tabela.to_excel(planilha, sheet_name=nome[:31], index=False)
+    return [caminho_base + ".html", caminho_base + ".xlsx"]
+
+
+# Relatório de Atendimento de um mês (mesmo conteúdo de Oco.py sem filtros de natureza/guarnição)
+def relatorio_atendimento(cubo_mes, mes, caminho_base):
+    kpis = kpis_atendimento(cubo_mes)
+    dia_maior = kpis['dia_maior_ocorrencias']
+    indicadores = [
+        ("Total de Atendimentos no Mês", kpis['total_atendimentos_mes']),
+        ("Média de Atendimentos Diário", kpis['media_atendimentos_diario']),
+        ("Dia com Mais Ocorrências", dia_maior if dia_maior == "N/A" else f"{dia_maior.strftime('%d/%m')} ({kpis['atendimentos_maior_dia']} atendimentos)"),
+    ]
+    atendimentos_natureza, atendimentos_viatura = tabelas_natureza_viatura(cubo_mes)
+    tabelas = {"Atendimentos por Natureza": atendimentos_natureza, "Atendimentos por Viatura": atendimentos_viatura}
+    for turno, total_turno, tabela_turno in montar_tabelas_turno(cubo_mes):
+        indicadores.append((f"Turno da {turno}", total_turno or 0))
+        tabelas[f"Turno da {turno}"] = tabela_turno
+    figuras = [grafico_atendimentos_dia(kpis['atendimentos_dia'])] if not kpis['atendimentos_dia'].empty else []
+    return gravar_relatorio(caminho_base, f"Relatório de Atendimento - {mes}", indicadores, figuras, tabelas)
+
+
+# Relatório de consumo de um mês (mesmo conteúdo de abastecimento.py)
+def relatorio_consumo(data_mes, anomalias_mes, tabela_mensal, nome_mes, caminho_base):
+    kpis = calcular_kpis_mes(data_mes)
+    variacao = variacao_quinzenal(kpis)
+    indicadores = [
+        ("Gasto Total no Mês", formatar_reais(kpis['gasto_total_mes'])),
+        ("Dia com maior consumo", f"{kpis['dia_maior_consumo'].strftime('%d/%m')} com {formatar_reais(kpis['maior_consumo'])}"),
+        ("Média de Gasto por Dia", formatar_reais(kpis['media_gasto_dia'])),
+        ("Média de Abastecimentos por Dia", f"{kpis['media_abastecimentos_dia']:.2f}"),
+        ("Dia com mais abastecimentos", f"{kpis['dia_maior_abastecimento'].strftime('%d/%m')} com {kpis['maior_abastecimento']} abastecimentos"),
+        ("Gasto 1ª Quinzena", formatar_reais(kpis['gasto_primeira_quinzena'])),
+        ("Gasto 2ª Quinzena", formatar_reais(kpis['gasto_segunda_quinzena'])),
+        ("Variação Quinzenal", f"Aumento de {variacao:.2f}%" if variacao > 0 else f"Redução de {abs(variacao):.2f}%"),
+        ("Veículo com maior consumo", f"{kpis['placa_maior_consumo']} ({formatar_reais(kpis['valor_placa_maior_consumo'])})"),
+    ]
+    por_placa = data_mes.groupby('Placa', observed=True).agg(
+        **{'Valor Venda': ('Valor Venda', 'sum'), 'Km Rod.': ('Km Rod.', 'sum'), 'Abastecimentos': ('Valor Venda', 'size')}
+    ).sort_values('Valor Venda', ascending=False).reset_index()
+    marcadas = anomalias_mes[COLUNAS_ANOMALIAS].assign(Motivo=motivos(anomalias_mes))
+    tabelas = {
+        "Consumo por Dia": kpis['valor_diario'].reset_index(),
+        "Consumo por Placa": por_placa,
+        "Anomalias": marcadas,
+        "Gastos Mensais": tabela_mensal[['Mês Nome', 'Valor Venda', 'Variação (%)']],
+    }
+    figuras = [grafico_total_por_mes(tabela_mensal), grafico_valor_diario(kpis)]
+    return gravar_relatorio(caminho_base, f"Relatório de Consumo de Veículos - {nome_mes}", indicadores, figuras, tabelas)
+
+
+# Cubo de atendimentos: do serviço de dados, se estiver no ar, senão ingerindo as exportações localmente (como Oco.py)
+def carregar_cubo():
+    try:
+        return consultar('cubo')
+    except ErroServico:
+        return construir_cubo(carregar_historico([arquivo for arquivo, _ in listar_exportacoes()]))
+
+
+# Funções para listar as tarefas (função, argumentos) de cada conjunto: um relatório por mês
+# Os dados são carregados uma vez no processo principal e cada processo recebe apenas a fatia do seu mês
+def tarefas_atendimento(saida):
+    cubo = carregar_cubo()
+    tarefas = []
+    for mes in meses_do_cubo(cubo):
+        cubo_mes = fatiar(cubo, {'Mês': mes})
+        caminho_base = os.path.join(saida, f"atendimento_{min(cubo_mes['Dia']):%Y-%m}")
+        tarefas.append((relatorio_atendimento, (cubo_mes, mes, caminho_base)))
+    return tarefas
+
+
+def tarefas_consumo(saida):
+    data, total_mensal = carregar_consumo(ARQUIVO_CONSUMO)
+    anomalias = detectar_anomalias(data)  # A referência de eficiência de cada placa considera todo o histórico
+    tabela_mensal = total_por_mes(total_mensal)
+    com_ano = data['Ano'].nunique() > 1  # Mesmo rótulo do gráfico de gastos mensais
+    anomalias_por_mes = dict(tuple(anomalias[anomalias['Anomalia']].groupby(['Ano', 'Mês'])))
+    tarefas = []
+    # Um relatório por (Ano, Mês): o mesmo mês de anos diferentes gera relatórios separados
+    for (ano, mes), data_mes in data.groupby(['Ano', 'Mês']):
+        anomalias_mes = anomalias_por_mes.get((ano, mes), anomalias.iloc[:0])
+        caminho_base = os.path.join(saida, f"consumo_{int(ano)}-{int(mes):02d}")
+        tarefas.append((relatorio_consumo, (data_mes, anomalias_mes, tabela_mensal, nome_mes(ano, mes, com_ano), caminho_base)))
+    return tarefas
+
+
+TAREFAS = {'atendimento': tarefas_atendimento, 'consumo': tarefas_consumo}
+
+
+# Função para gravar o índice com os links para todos os relatórios gerados
+def gravar_indice(saida, arquivos):
+    itens = "\n".join(f'<li><a href="{html.escape(os.path.basename(arquivo))}">{html.escape(os.path.basename(arquivo))}</a></li>'
+                      for arquivo in sorted(arquivos))
+    caminho = os.path.join(saida, "index.html")
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write(MODELO_PAGINA.format(titulo="Relatórios Mensais", gerado_em=f"{datetime.now():%d/%m/%Y %H:%M}", conteudo=f"<ul>\n{itens}\n</ul>"))
+    return caminho
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Gera os relatórios mensais dos dashboards em HTML e XLSX")
+    parser.add_argument('--saida', default=DIRETORIO_RELATORIOS, help="Diretório dos relatórios")
+    parser.add_argument('--conjuntos', nargs='+', choices=CONJUNTOS, default=list(CONJUNTOS))
+    parser.add_argument('--processos', type=int, default=None, help="Quantidade de processos (padrão: um por núcleo)")
+    args = parser.parse_args(argumentos)
+
+    os.makedirs(args.saida, exist_ok=True)
+    with open(os.path.join(args.saida, "plotly.min.js"), "w", encoding="utf-8") as arquivo:
+        arquivo.write(get_plotlyjs())
+    tarefas = [tarefa for conjunto in args.conjuntos for tarefa in TAREFAS[conjunto](args.saida)]
+
+    gerados, erros = [], []
+    with ProcessPoolExecutor(max_workers=args.processos) as executor:
+        futuros = {executor.submit(funcao, *parametros): parametros[-1] for funcao, parametros in tarefas}
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            try:
+                gerados += futuro.result()
+                print(f"{concluidos}/{len(tarefas)} {futuros[futuro]}", flush=True)
+            except Exception as erro:
+                erros.append(f"{futuros[futuro]}: {erro}")
+                print(f"{concluidos}/{len(tarefas)} {futuros[futuro]} falhou: {erro}", file=sys.stderr, flush=True)
+
+    print(f"Índice gravado em {gravar_indice(args.saida, gerados)}")
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
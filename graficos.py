@@ -0,0 +1,31 @@
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Paletas usadas nos dashboards
+CORES_ALTERNADAS = ["lightgreen", "lightblue"]
+CORES_POR_CATEGORIA = px.colors.qualitative.Plotly
+
+
+# Função para repetir a paleta até cobrir n barras (uma cor por barra, em ciclo)
+def cores_em_ciclo(n, paleta=CORES_ALTERNADAS):
+    return np.resize(np.asarray(paleta, dtype=object), n).tolist()
+
+
+# Função para criar um gráfico de barras com um único trace e um array de cores por barra
+# Evita um go.Bar por categoria: o JSON do gráfico não cresce em número de traces com a quantidade de dias
+def grafico_barras(x, y, paleta=CORES_ALTERNADAS, texto=None, tamanho_texto=None, posicao_texto='outside', nome=None):
+    y = list(y)
+    fig = go.Figure(data=[
+        go.Bar(
+            x=list(x),
+            y=y,
+            text=y if texto is None else list(texto),
+            textposition=posicao_texto,
+            textfont=dict(size=tamanho_texto) if tamanho_texto else None,
+            marker_color=cores_em_ciclo(len(y), paleta),
+            name=nome,
+            showlegend=nome is not None,
+        )
+    ])
+    return fig
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+
+# Função para construir o índice por placa: linhas ordenadas por (Ano, Mês, Placa, Data/Hora), a faixa de posições
+# de cada (Ano, Mês, Placa) e as somas diárias por placa. Construído uma vez na carga dos dados
+def construir_indice_placas(data):
+    ordenado = data.dropna(subset=['Ano', 'Mês']).sort_values(['Ano', 'Mês', 'Placa', 'Data/Hora'], kind='stable').reset_index(drop=True)
+
+    # Limites de cada grupo (Ano, Mês, Placa) contíguo no frame ordenado
+    anos = ordenado['Ano'].to_numpy()
+    meses = ordenado['Mês'].to_numpy()
+    placas = ordenado['Placa'].astype(str).to_numpy()
+    codigos_placa = pd.factorize(placas)[0]
+    mudou = np.ones(len(ordenado), dtype=bool)
+    mudou[1:] = (anos[1:] != anos[:-1]) | (meses[1:] != meses[:-1]) | (codigos_placa[1:] != codigos_placa[:-1])
+    inicios = np.flatnonzero(mudou)
+    fins = np.append(inicios[1:], len(ordenado))
+    faixas = {(int(anos[inicio]), int(meses[inicio]), placas[inicio]): (int(inicio), int(fim)) for inicio, fim in zip(inicios, fins)}
+
+    diario = ordenado.groupby(['Ano', 'Mês', 'Placa', 'Dia'], observed=True)['Valor Venda'].sum().sort_index()
+    return {'dados': ordenado, 'faixas': faixas, 'diario': diario}
+
+
+# Função para listar as placas com abastecimento no mês (Ano, Mês), em ordem alfabética
+def placas_do_mes(indice, ano, mes):
+    return sorted(placa for (ano_indice, mes_indice, placa) in indice['faixas'] if (ano_indice, mes_indice) == (ano, mes))
+
+
+# Função para obter as linhas de uma placa no mês (fatia contígua, sem varrer o mês inteiro)
+def linhas_da_placa(indice, ano, mes, placa):
+    inicio, fim = indice['faixas'].get((ano, mes, placa), (0, 0))
+    return indice['dados'].iloc[inicio:fim]
+
+
+# Função para obter os valores diários já somados de uma placa no mês
+def diario_da_placa(indice, ano, mes, placa):
+    try:
+        return indice['diario'].loc[(ano, mes, placa)]
+    except KeyError:
+        return pd.Series(dtype=float, name='Valor Venda')
@@ -0,0 +1,101 @@
+import glob
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+# Diretório onde ficam as cópias colunares (Parquet) das planilhas já convertidas
+DIRETORIO_CACHE = ".cache_dados"
+
+# Arquivo com o índice caminho -> (mtime, tamanho, hash) para evitar recalcular o hash a cada carga
+ARQUIVO_INDICE = "indice_hashes.json"
+
+
+# Função para calcular o hash SHA-256 do conteúdo de um arquivo, lendo em blocos
+def hash_conteudo(file_path, tamanho_bloco=1 << 20):
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _ler_indice(diretorio):
+    caminho = os.path.join(diretorio, ARQUIVO_INDICE)
+    try:
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_indice(diretorio, indice):
+    caminho = os.path.join(diretorio, ARQUIVO_INDICE)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(indice, arquivo)
+    os.replace(temporario, caminho)
+
+
+# Função para obter o hash do arquivo: só relê o conteúdo quando o mtime ou o tamanho mudaram
+def hash_arquivo(file_path, diretorio=DIRETORIO_CACHE):
+    os.makedirs(diretorio, exist_ok=True)
+    caminho_absoluto = os.path.abspath(file_path)
+    status = os.stat(caminho_absoluto)
+
+    indice = _ler_indice(diretorio)
+    registro = indice.get(caminho_absoluto)
+    if registro and registro["mtime"] == status.st_mtime_ns and registro["tamanho"] == status.st_size:
+        return registro["hash"]
+
+    hash_atual = hash_conteudo(caminho_absoluto)
+    indice[caminho_absoluto] = {"mtime": status.st_mtime_ns, "tamanho": status.st_size, "hash": hash_atual}
+    _gravar_indice(diretorio, indice)
+    return hash_atual
+
+
+# Função para montar o caminho do Parquet correspondente a um arquivo/aba
+def caminho_cache(file_path, sheet_name=None, diretorio=DIRETORIO_CACHE):
+    nome_base = os.path.splitext(os.path.basename(file_path))[0].replace(" ", "_")
+    aba = "padrao" if sheet_name is None else str(sheet_name).replace(" ", "_")
+    return os.path.join(diretorio, f"{nome_base}-{aba}-{hash_arquivo(file_path, diretorio)[:16]}.parquet")
+
+
+# Converte colunas de texto com tipos misturados para string, pois o Parquet exige um tipo por coluna
+def _normalizar_tipos(df):
+    df = df.copy()
+    for coluna in df.columns:
+        if df[coluna].dtype == object:
+            tipo = pd.api.types.infer_dtype(df[coluna], skipna=True)
+            if tipo not in ("string", "empty", "datetime", "date", "time", "bytes"):
+                df[coluna] = df[coluna].where(df[coluna].isna(), df[coluna].astype(str))
+    return df
+
+
+# Função para ler a planilha via openpyxl (caminho lento, usado apenas na primeira carga)
+def _ler_excel(file_path, sheet_name=None):
+    excel_file = pd.ExcelFile(file_path)
+    if sheet_name is None:
+        sheet_name = "Planilha1" if "Planilha1" in excel_file.sheet_names else excel_file.sheet_names[0]
+    return pd.read_excel(excel_file, sheet_name=sheet_name)
+
+
+# Função principal: carrega a planilha a partir do Parquet em cache, convertendo-a apenas uma vez
+# sheet_name=None usa "Planilha1" quando existir, senão a primeira aba
+def carregar_planilha(file_path, sheet_name=None, diretorio=DIRETORIO_CACHE):
+    destino = caminho_cache(file_path, sheet_name, diretorio)
+    if os.path.exists(destino):
+        return pd.read_parquet(destino)
+
+    df = _normalizar_tipos(_ler_excel(file_path, sheet_name))
+    temporario = destino + ".tmp"
+    df.to_parquet(temporario, index=False)
+    os.replace(temporario, destino)
+
+    # Remove versões antigas da mesma planilha/aba (conteúdo anterior do arquivo)
+    prefixo = destino.rsplit("-", 1)[0]
+    for antigo in glob.glob(glob.escape(prefixo) + "-*.parquet"):
+        if antigo != destino:
+            os.remove(antigo)
+    return df
@@ -0,0 +1,97 @@
+import json
+import os
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from ingestao import DIRETORIO_CACHE
+
+# Instrumentação opcional dos blocos dos dashboards: tempo, linhas de entrada/saída e pico de alocação por bloco
+# Ativada com ?debug=1 na URL ou com a variável de ambiente DASHBOARD_INSTRUMENTACAO=1; desativada não mede nada
+VARIAVEL_AMBIENTE = "DASHBOARD_INSTRUMENTACAO"
+ARQUIVO_METRICAS = os.path.join(DIRETORIO_CACHE, "metricas_blocos.jsonl")
+
+_CHAVE_ESTADO = "_instrumentacao"
+
+
+# Função para verificar se a instrumentação está ativa nesta execução
+def instrumentacao_ativa():
+    return os.environ.get(VARIAVEL_AMBIENTE) == "1" or st.query_params.get("debug") == "1"
+
+
+# Função para iniciar a medição de uma execução do script (chamada logo após o set_page_config)
+def iniciar_instrumentacao(app):
+    if not instrumentacao_ativa():
+        st.session_state.pop(_CHAVE_ESTADO, None)
+        return
+    # O tracemalloc vale para o processo inteiro: só é iniciado se ainda não estiver ativo e é parado ao fim
+    # da execução que o iniciou, para que as demais sessões do servidor não paguem o custo do rastreamento
+    iniciou_rastreamento = not tracemalloc.is_tracing()
+    if iniciou_rastreamento:
+        tracemalloc.start()
+    st.session_state[_CHAVE_ESTADO] = {
+        'app': app, 'execucao': uuid.uuid4().hex[:12], 'blocos': [], 'atual': None, 'iniciou_rastreamento': iniciou_rastreamento,
+    }
+
+
+def _fechar_bloco(estado):
+    atual = estado['atual']
+    if atual is None:
+        return
+    atual['tempo_s'] = round(time.perf_counter() - atual.pop('_inicio'), 4)
+    # Pico de memória alocada durante o bloco, acima do que já estava alocado no início dele
+    # (o tracemalloc é do processo inteiro: com várias sessões simultâneas o pico inclui as demais)
+    atual['pico_mb'] = round(max(tracemalloc.get_traced_memory()[1] - atual.pop('_memoria_inicial'), 0) / 1e6, 3)
+    estado['blocos'].append(atual)
+    estado['atual'] = None
+
+
+# Função para marcar o início de um bloco (encerra o bloco anterior)
+def bloco(nome, linhas_entrada=None):
+    estado = st.session_state.get(_CHAVE_ESTADO)
+    if estado is None:
+        return
+    _fechar_bloco(estado)
+    tracemalloc.reset_peak()
+    estado['atual'] = {
+        'bloco': nome,
+        'linhas_entrada': linhas_entrada,
+        'linhas_saida': None,
+        '_inicio': time.perf_counter(),
+        '_memoria_inicial': tracemalloc.get_traced_memory()[0],
+    }
+
+
+# Função para registrar quantas linhas o bloco atual produziu
+def linhas_saida(quantidade):
+    estado = st.session_state.get(_CHAVE_ESTADO)
+    if estado is not None and estado['atual'] is not None:
+        estado['atual']['linhas_saida'] = int(quantidade)
+
+
+# Função para encerrar a execução: grava as medições no log JSONL e exibe o painel de depuração
+def finalizar_instrumentacao():
+    estado = st.session_state.get(_CHAVE_ESTADO)
+    if estado is None:
+        return
+    _fechar_bloco(estado)
+    if estado['iniciou_rastreamento']:
+        tracemalloc.stop()
+    momento = datetime.now().isoformat(timespec='seconds')
+    registros = [{'momento': momento, 'app': estado['app'], 'execucao': estado['execucao'], **medicao} for medicao in estado['blocos']]
+
+    os.makedirs(os.path.dirname(ARQUIVO_METRICAS), exist_ok=True)
+    with open(ARQUIVO_METRICAS, "a", encoding="utf-8") as arquivo:
+        for registro in registros:
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    with st.expander("Depuração: tempo e memória por bloco"):
+        tabela = pd.DataFrame(registros, columns=['bloco', 'tempo_s', 'linhas_entrada', 'linhas_saida', 'pico_mb'])
+        tabela[['linhas_entrada', 'linhas_saida']] = tabela[['linhas_entrada', 'linhas_saida']].astype('Int64')
+        st.dataframe(tabela.rename(columns={'pico_mb': 'pico_processo_mb'}), hide_index=True)
+        st.caption(f"Execução {estado['execucao']}: {tabela['tempo_s'].sum():.3f}s no total. Registrado em {ARQUIVO_METRICAS}")
+        st.caption("O pico de memória é do processo inteiro: com outras sessões ativas, inclui as alocações delas.")
@@ -0,0 +1,24 @@
+# Função para calcular todos os KPIs de consumo de um mês em uma passada agrupada por dia e outra por placa
+# Os demais indicadores (máximos, médias, quinzenas) saem das séries já agregadas
+def calcular_kpis_mes(data_mes):
+    diario = data_mes.groupby('Dia')['Valor Venda'].agg(['sum', 'count'])
+    por_placa = data_mes.groupby('Placa', observed=True)['Valor Venda'].sum()
+
+    valor_diario = diario['sum']
+    abastecimentos_diario = diario['count']
+    primeira_quinzena = valor_diario.index.day <= 15
+
+    return {
+        'gasto_total_mes': float(valor_diario.sum()),
+        'dia_maior_consumo': valor_diario.idxmax(),
+        'maior_consumo': float(valor_diario.max()),
+        'media_gasto_dia': float(valor_diario.mean()),
+        'media_abastecimentos_dia': float(abastecimentos_diario.mean()),
+        'dia_maior_abastecimento': abastecimentos_diario.idxmax(),
+        'maior_abastecimento': int(abastecimentos_diario.max()),
+        'valor_diario': valor_diario.rename('Valor Venda'),
+        'gasto_primeira_quinzena': float(valor_diario[primeira_quinzena].sum()),
+        'gasto_segunda_quinzena': float(valor_diario[~primeira_quinzena].sum()),
+        'placa_maior_consumo': por_placa.idxmax(),
+        'valor_placa_maior_consumo': float(por_placa.max()),
+    }
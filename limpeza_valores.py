@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+# Texto que identifica as linhas de observação do relatório financeiro
+MARCADOR_OBSERVACAO = 'Observação'
+
+
+# Função para converter uma coluna de valores em float: números vindos do Excel ficam como estão e os textos que não
+# são número simples são lidos no formato brasileiro ("1.553,110", sempre com a vírgula decimal); textos que não são
+# número (cabeçalhos repetidos, por exemplo) viram NaN
+def converter_valores(coluna):
+    if pd.api.types.is_numeric_dtype(coluna):
+        return coluna.astype(float)
+    valores = pd.to_numeric(coluna, errors='coerce').astype(float)
+
+    # Apenas as linhas que não viraram número e não estão vazias passam pela conversão do formato brasileiro
+    texto = valores.isna() & coluna.notna()
+    brasileiro = coluna[texto].astype(str).str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    valores[texto] = pd.to_numeric(brasileiro, errors='coerce')
+    return valores
+
+
+# Função para limpar os valores em uma única máscara combinada:
+# remove linhas que contenham o marcador em qualquer coluna de texto, linhas com NaN e linhas com valor 0
+# O filtro de zero é aplicado depois da conversão (o texto "0,000" também é zero), nas colunas de 'colunas_zero'
+# (padrão: todas as colunas de valor)
+# Os valores ficam numéricos e arredondados; a formatação com 2 casas fica na exibição
+def limpar_valores(df, colunas_valor=('Valor Total', 'Valor'), marcador=MARCADOR_OBSERVACAO, colunas_zero=None):
+    colunas_valor = list(colunas_valor)
+    colunas_zero = colunas_valor if colunas_zero is None else list(colunas_zero)
+
+    # Busca do marcador coluna a coluna, apenas nas colunas de texto
+    tem_marcador = np.zeros(len(df), dtype=bool)
+    for coluna in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[coluna]):
+            tem_marcador |= df[coluna].astype('string').str.contains(marcador, regex=False).fillna(False).to_numpy(dtype=bool)
+
+    valores = pd.DataFrame({coluna: converter_valores(df[coluna]) for coluna in colunas_valor}, index=df.index)
+    outras = df.columns.difference(colunas_valor, sort=False)
+    mantidas = (
+        ~tem_marcador
+        & valores.notna().all(axis=1).to_numpy()
+        & df[outras].notna().all(axis=1).to_numpy()
+        & (valores[colunas_zero] != 0).all(axis=1).to_numpy()
+    )
+
+    limpo = df.loc[mantidas].copy()
+    limpo[colunas_valor] = valores.loc[mantidas].round(2)
+    return limpo
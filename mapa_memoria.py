@@ -0,0 +1,43 @@
+import glob
+import hashlib
+import os
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from ingestao import DIRETORIO_CACHE
+
+# Diretório com os DataFrames gravados em Arrow IPC (Feather v2) sem compressão, prontos para mapeamento em memória
+DIRETORIO_MAPAS = os.path.join(DIRETORIO_CACHE, "mapas")
+
+
+# Função para obter o caminho do arquivo mapeável de um conjunto de dados em uma versão
+# (a versão pode ser composta, ex.: hash do arquivo + versão do esquema; o nome usa um resumo dela)
+def caminho_mapa(nome, versao, diretorio=DIRETORIO_MAPAS):
+    return os.path.join(diretorio, f"{nome}-{hashlib.sha1(str(versao).encode()).hexdigest()[:16]}.arrow")
+
+
+# Função para gravar o DataFrame em Arrow IPC sem compressão (o arquivo é lido direto do mapeamento, sem decodificar)
+def gravar_mapa(df, caminho):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), caminho + ".tmp", compression='uncompressed')
+    os.replace(caminho + ".tmp", caminho)
+
+
+# Função para abrir o arquivo mapeado em memória: as colunas numéricas e de data sem vazios apontam para as páginas
+# do arquivo (somente leitura, compartilhadas entre sessões e processos pelo cache do sistema operacional)
+def abrir_mapa(caminho):
+    tabela = pa.ipc.open_file(pa.memory_map(caminho, 'r')).read_all()
+    return tabela.to_pandas(split_blocks=True)
+
+
+# Função principal: devolve o conjunto mapeado em memória, gravando-o com 'carregar()' apenas quando a versão muda
+# Versões anteriores do mesmo conjunto são removidas
+def carregar_mapeado(nome, versao, carregar, diretorio=DIRETORIO_MAPAS):
+    caminho = caminho_mapa(nome, versao, diretorio)
+    if not os.path.exists(caminho):
+        gravar_mapa(carregar(), caminho)
+        for antigo in glob.glob(os.path.join(diretorio, f"{glob.escape(nome)}-*.arrow")):
+            if antigo != caminho:
+                os.remove(antigo)
+    return abrir_mapa(caminho)
@@ -0,0 +1,82 @@
+import pandas as pd
+
+from cubo import total, totais_por
+from esquema import truncar
+from graficos import grafico_barras
+from turnos import ordem_turnos
+
+# Peças do "Relatório de Atendimento" (Oco.py) montadas a partir do cubo do mês
+# Usadas pelo dashboard e pela geração dos relatórios estáticos (gerar_relatorios.py)
+
+# Tamanhos de fonte do gráfico de atendimentos por dia
+FONTE_EIXO_X_DIA = 16
+FONTE_TEXTO_DIA = 16
+
+
+# Função para calcular os KPIs do mês: total, média diária e dia com mais ocorrências
+# 'atendimentos_dia' (total por dia, do maior para o menor) é devolvido para o gráfico e o filtro por dia
+def kpis_atendimento(cubo_mes):
+    total_atendimentos_mes = total(cubo_mes)
+    atendimentos_dia = totais_por(cubo_mes, 'Dia')
+    dias_unicos = len(atendimentos_dia)
+    return {
+        'total_atendimentos_mes': total_atendimentos_mes,
+        'atendimentos_dia': atendimentos_dia,
+        # Média de atendimentos diário apenas se houver dias únicos
+        'media_atendimentos_diario': round(total_atendimentos_mes / dias_unicos, 2) if dias_unicos > 0 else 0,
+        # Dia com mais ocorrências e quantidade de atendimentos no dia
+        'dia_maior_ocorrencias': atendimentos_dia.index[0] if dias_unicos > 0 else "N/A",
+        'atendimentos_maior_dia': atendimentos_dia.iloc[0] if dias_unicos > 0 else "N/A",
+    }
+
+
+# Função para montar o gráfico de atendimentos por dia com cores alternadas e eixo x com todos os dias do mês
+def grafico_atendimentos_dia(atendimentos_dia, font_size_x_axis=FONTE_EIXO_X_DIA, font_size_text=FONTE_TEXTO_DIA):
+    atendimentos_por_dia = atendimentos_dia.sort_index().reindex(pd.date_range(start=atendimentos_dia.index.min(), end=atendimentos_dia.index.max()), fill_value=0).reset_index(name='Total de Atendimentos')
+    atendimentos_por_dia.columns = ['Dia', 'Total de Atendimentos']
+
+    # Criando o gráfico com barras alternadas e sem legenda (um único trace com uma cor por barra)
+    fig = grafico_barras(atendimentos_por_dia['Dia'], atendimentos_por_dia['Total de Atendimentos'], tamanho_texto=font_size_text)
+
+    # Configuração do layout do gráfico
+    fig.update_layout(
+        title="Atendimentos por Dia",
+        xaxis_title="Dia do Mês",
+        yaxis_title="Quantidade de Atendimentos",
+        yaxis=dict(range=[0, 120]),  # Limite do eixo y para 120
+        xaxis=dict(tickformat="%d", tickvals=atendimentos_por_dia['Dia'], tickfont=dict(size=font_size_x_axis))  # Define o tamanho da fonte do eixo x
+    )
+    return fig
+
+
+# Função para montar as tabelas de atendimentos por natureza e por viatura, do maior para o menor
+def tabelas_natureza_viatura(cubo_mes):
+    return (
+        totais_por(cubo_mes, 'Natureza').reset_index(name='Total de Atendimentos'),
+        totais_por(cubo_mes, 'Guarnição').reset_index(name='Total de Atendimentos'),
+    )
+
+
+# Função para montar, para cada turno, o total de atendimentos (None quando não há) e a tabela por viatura
+def montar_tabelas_turno(cubo_mes):
+    # Conta a quantidade total de atendimentos por turno (o 'Turno' já vem calculado no cubo)
+    total_atendimentos_por_turno = totais_por(cubo_mes, 'Turno')
+
+    # Conta a quantidade de atendimentos por viatura dentro de cada turno
+    atendimentos_por_turno_e_viatura = totais_por(cubo_mes, ['Turno', 'Guarnição']).reset_index(name='Atendimentos por Viatura')
+
+    # Limita a Guarnição aos primeiros 7 caracteres
+    atendimentos_por_turno_e_viatura['Guarnição'] = truncar(atendimentos_por_turno_e_viatura['Guarnição'], 7)
+
+    # Ordena os dados por quantidade de atendimentos (maior para menor) dentro de cada turno
+    atendimentos_por_turno_e_viatura = atendimentos_por_turno_e_viatura.sort_values(by=['Turno', 'Atendimentos por Viatura'], ascending=[True, False])
+
+    # Divide os dados em tabelas separadas para cada turno (na ordem Manhã, Tarde, Madrugada) e remove a coluna 'Turno'
+    return [
+        (
+            turno,
+            total_atendimentos_por_turno.get(turno),
+            atendimentos_por_turno_e_viatura[atendimentos_por_turno_e_viatura['Turno'] == turno].drop(columns=['Turno']),
+        )
+        for turno in ordem_turnos()
+    ]
@@ -0,0 +1,132 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+# Peças do relatório de consumo (abastecimento.py) montadas a partir dos totais mensais e dos KPIs do mês
+# Usadas pelo dashboard e pela geração dos relatórios estáticos (gerar_relatorios.py)
+
+# Nome dos meses para exibição
+MESES_NOMES = {
+    1: "Janeiro", 2: "Fevereiro", 3: "Março", 4: "Abril", 5: "Maio", 6: "Junho",
+    7: "Julho", 8: "Agosto", 9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
+}
+
+# Cores diferentes para cada barra do gráfico mensal
+CORES_MESES = [
+    "rgb(31, 119, 180)", "rgb(255, 127, 14)", "rgb(44, 160, 44)", "rgb(214, 39, 40)",
+    "rgb(148, 103, 189)", "rgb(140, 86, 75)", "rgb(227, 119, 194)", "rgb(127, 127, 127)",
+    "rgb(188, 189, 34)", "rgb(23, 190, 207)", "rgb(255, 165, 0)", "rgb(255, 69, 0)"
+]
+
+# Cores alternadas das barras diárias (azul e verde claro)
+CORES_BARRAS_DIA = ["rgb(31, 119, 180)", "rgb(144, 238, 144)"]
+
+
+# Função para formatar valores em reais como nos dashboards (R$ 1.234.56)
+def formatar_reais(valor):
+    return f"R$ {valor:,.2f}".replace(',', '.')
+
+
+# Função para montar o nome de exibição de um mês: com o ano quando os dados cobrem mais de um ano (ex.: "Outubro/2024")
+def nome_mes(ano, mes, com_ano=True):
+    return f"{MESES_NOMES[int(mes)]}/{int(ano)}" if com_ano else MESES_NOMES[int(mes)]
+
+
+# Função para montar a tabela do total gasto por mês com o nome do mês e a variação percentual sobre o mês anterior
+def total_por_mes(total_mensal):
+    tabela = total_mensal[['Ano', 'Mês', 'Valor Venda']].copy()
+    tabela['Mês Nome'] = tabela['Mês'].map(MESES_NOMES)
+    if tabela['Ano'].nunique() > 1:
+        tabela['Mês Nome'] += "/" + tabela['Ano'].astype(int).astype(str)
+    tabela['Variação (%)'] = tabela['Valor Venda'].pct_change() * 100
+    return tabela
+
+
+# Função para montar o gráfico do total gasto em cada mês (barras com cores distintas e linha de tendência)
+def grafico_total_por_mes(tabela):
+    fig = go.Figure()
+
+    # Adiciona as barras com cores distintas e tamanho do texto aumentado
+    fig.add_trace(go.Bar(
+        x=tabela['Mês Nome'],
+        y=tabela['Valor Venda'],
+        text=[formatar_reais(v) for v in tabela['Valor Venda']],
+        textposition='inside',
+        name="Total Gasto",
+        marker_color=CORES_MESES[:len(tabela)],  # Aplica uma cor para cada mês
+        textfont=dict(size=20)  # Define o tamanho do texto dentro das barras para 20
+    ))
+
+    # Gráfico de linha para o total gasto em cada mês
+    fig.add_trace(go.Scatter(
+        x=tabela['Mês Nome'],
+        y=tabela['Valor Venda'],
+        mode='lines+markers',
+        name="Tendência Mensal",
+        line=dict(color="black", width=2, dash="solid"),
+        marker=dict(size=6)
+    ))
+
+    # Configuração do layout com a legenda do mês em destaque
+    fig.update_layout(
+        title="Total Gasto por Mês",
+        xaxis_title="Mês",
+        yaxis_title="Valor Total (R$)",
+        template="plotly_white",
+        title_x=0.5,
+        xaxis=dict(
+            tickfont=dict(size=20)  # Aumenta o tamanho da fonte dos nomes dos meses
+        )
+    )
+    return fig
+
+
+# Função para montar o gráfico do valor total de consumo por dia com a linha de média do mês
+def grafico_valor_diario(kpis, tamanho_fonte_valores=20, tamanho_fonte_legenda=16):
+    valor_diario = kpis['valor_diario'].reset_index()
+    valor_diario['Dia_Formatado'] = pd.to_datetime(valor_diario['Dia']).dt.strftime('%d/%m')
+
+    # Calcular a média mensal com os dados filtrados
+    media_mensal = valor_diario['Valor Venda'].mean()
+
+    # Criar gráfico com barras de consumo diário e linha de média mensal
+    fig_valor_diario = go.Figure()
+
+    # Barras para o valor diário, com cores alternadas
+    fig_valor_diario.add_trace(go.Bar(
+        x=valor_diario['Dia_Formatado'],
+        y=valor_diario['Valor Venda'],
+        text=[formatar_reais(v) for v in valor_diario['Valor Venda']],
+        textposition='outside',
+        name="Consumo Diário",
+        marker_color=[CORES_BARRAS_DIA[i % 2] for i in range(len(valor_diario))],  # Cores alternadas
+    ))
+
+    # Linha para a média mensal
+    fig_valor_diario.add_trace(go.Scatter(
+        x=valor_diario['Dia_Formatado'],
+        y=[media_mensal] * len(valor_diario),
+        mode='lines',
+        name="Média do Mês",
+        line=dict(color='red', dash='dash')
+    ))
+
+    fig_valor_diario.update_layout(
+        title="Valor Total de Consumo por Dia com Média do Mês",
+        xaxis_title="Data",
+        yaxis_title="Valor Total (R$)",
+        template="plotly_white",
+        title_x=0.5,
+        yaxis=dict(range=[0, 2200]),  # Define a escala máxima do eixo Y para 2200
+        xaxis=dict(tickfont=dict(size=tamanho_fonte_legenda)),  # Define o tamanho dos rótulos do eixo X
+    )
+
+    # Atualização do tamanho da fonte dos valores nas barras
+    fig_valor_diario.update_traces(textfont=dict(size=tamanho_fonte_valores))
+    return fig_valor_diario
+
+
+# Função para calcular a variação percentual do gasto da 2ª quinzena sobre a 1ª (0 quando a 1ª não tem gasto)
+def variacao_quinzenal(kpis):
+    if kpis['gasto_primeira_quinzena'] > 0:
+        return ((kpis['gasto_segunda_quinzena'] - kpis['gasto_primeira_quinzena']) / kpis['gasto_primeira_quinzena']) * 100
+    return 0
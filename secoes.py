@@ -0,0 +1,53 @@
+import hashlib
+
+import pandas as pd
+import streamlit as st
+
+# Seções preguiçosas dos dashboards: cada seção declara suas entradas e só é calculada quando está visível
+# (aba ou expander criado com on_change="rerun") e quando alguma entrada mudou desde o último cálculo
+_CHAVE_MEMO = "_secoes_memo"
+_PREFIXO_LEMBRADO = "_secoes_lembrado_"
+
+
+# Função para gerar a impressão digital das entradas (DataFrames/Series pelo hash do conteúdo, demais pelo repr)
+def impressao_digital(entradas):
+    hasher = hashlib.sha1()
+    for entrada in entradas:
+        if isinstance(entrada, (pd.DataFrame, pd.Series, pd.Index)):
+            hasher.update(pd.util.hash_pandas_object(entrada).to_numpy().tobytes())
+        else:
+            hasher.update(repr(entrada).encode())
+    return hasher.hexdigest()
+
+
+# Função para verificar se a aba/expander está visível; sem rastreamento de estado (.open = None) conta como visível
+def visivel(container):
+    return getattr(container, 'open', None) is not False
+
+
+# Função para obter o resultado da seção: recalcula apenas quando a impressão digital das entradas muda
+# O memo fica na sessão do usuário e guarda só o último resultado de cada seção
+def calcular_secao(nome, entradas, calcular):
+    memo = st.session_state.setdefault(_CHAVE_MEMO, {})
+    impressao = impressao_digital(entradas)
+    guardado = memo.get(nome)
+    if guardado is None or guardado[0] != impressao:
+        guardado = memo[nome] = (impressao, calcular())
+    return guardado[1]
+
+
+# Funções para lembrar a escolha de um filtro: o Streamlit descarta o estado de widgets que não foram exibidos
+# na execução (ex.: aba oculta), então o valor é guardado à parte e usado como padrão quando o widget volta
+def lembrado(chave, padrao=None):
+    return st.session_state.get(_PREFIXO_LEMBRADO + chave, padrao)
+
+
+def lembrar(chave, valor):
+    st.session_state[_PREFIXO_LEMBRADO + chave] = valor
+    return valor
+
+
+# Função para obter a posição da opção lembrada em uma lista de opções (padrão quando não lembrada ou ausente)
+def indice_lembrado(chave, opcoes, padrao=0):
+    valor = lembrado(chave)
+    return opcoes.index(valor) if valor in opcoes else padrao
@@ -0,0 +1,133 @@
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+
+import pandas as pd
+
+from armazem_ocorrencias import carregar_historico, listar_exportacoes
+from cubo import construir_cubo, fatiar, totais_por
+
+# Serviço local de dados: um único processo carrega o histórico de ocorrências e entrega o cubo de contagens aos
+# dashboards (Oco.py) e aos relatórios (gerar_relatorios.py), que assim não mantêm o histórico em memória
+# Os abastecimentos não passam pelo serviço: abastecimento.py usa as linhas de detalhe (KPIs, índice por placa,
+# anomalias), compartilhadas entre as sessões pelo cache_resource e pelo arquivo mapeado em memória
+# Uso: python servico_dados.py   (os dashboards voltam a carregar os dados localmente se o serviço não estiver no ar)
+
+# Endereço do serviço (somente loopback por padrão)
+HOST_SERVICO = os.environ.get("SERVICO_DADOS_HOST", "127.0.0.1")
+PORTA_SERVICO = int(os.environ.get("SERVICO_DADOS_PORTA", "8765"))
+
+# Tempo máximo de uma consulta, em segundos: o serviço carrega o histórico antes de aceitar conexões, então uma
+# consulta lenta indica serviço travado e o dashboard carrega os dados localmente sem deixar a página presa
+TEMPO_LIMITE = 5
+
+# Protocolo: pedido = tamanho (4 bytes) + JSON {"operacao", "parametros"}
+# resposta = status (0 ok, 1 erro) + tamanho + corpo (Parquet do resultado ou mensagem de erro)
+TAMANHO_PEDIDO = struct.Struct('>I')
+CABECALHO_RESPOSTA = struct.Struct('>BI')
+
+# Erro de consulta ao serviço (fora do ar, conexão interrompida ou consulta com erro): os dashboards
+# tratam esta exceção voltando a carregar os dados localmente
+class ErroServico(RuntimeError):
+    pass
+
+
+# Conjuntos carregados: nome -> (versão, dados); recarregados quando a versão dos arquivos muda
+_conjuntos = {}
+_trava = threading.Lock()
+
+
+# Função para ler exatamente 'tamanho' bytes do socket
+def _receber_exato(conexao, tamanho):
+    recebido = bytearray()
+    while len(recebido) < tamanho:
+        parte = conexao.recv(min(tamanho - len(recebido), 1 << 20))
+        if not parte:
+            raise ConnectionError("Conexão encerrada antes do fim da mensagem")
+        recebido += parte
+    return bytes(recebido)
+
+
+# Função para obter um conjunto de dados, carregando-o apenas quando a versão muda
+def _conjunto(nome, versao, carregar):
+    with _trava:
+        atual = _conjuntos.get(nome)
+        if atual is None or atual[0] != versao:
+            _conjuntos[nome] = (versao, carregar())
+        return _conjuntos[nome][1]
+
+
+# Cubo de atendimentos (o histórico completo só existe durante a montagem do cubo)
+def _cubo_ocorrencias():
+    exportacoes = listar_exportacoes()
+    return _conjunto('ocorrencias', exportacoes, lambda: construir_cubo(carregar_historico([arquivo for arquivo, _ in exportacoes])))
+
+
+# Operação "cubo": o cubo completo de contagens (Mês × Dia × Turno × Natureza × Guarnição)
+def _operacao_cubo():
+    return _cubo_ocorrencias()
+
+
+# Operação "atendimentos": totais por dimensões do cubo, com filtros por igualdade
+def _operacao_atendimentos(dimensoes, filtros=None):
+    return totais_por(fatiar(_cubo_ocorrencias(), filtros or {}), dimensoes).reset_index(name='Atendimentos')
+
+
+OPERACOES = {
+    'cubo': _operacao_cubo,
+    'atendimentos': _operacao_atendimentos,
+}
+
+
+class _AtenderConsulta(socketserver.BaseRequestHandler):
+    def handle(self):
+        tamanho, = TAMANHO_PEDIDO.unpack(_receber_exato(self.request, TAMANHO_PEDIDO.size))
+        pedido = json.loads(_receber_exato(self.request, tamanho))
+        try:
+            resultado = OPERACOES[pedido['operacao']](**pedido.get('parametros', {}))
+            buffer = io.BytesIO()
+            resultado.to_parquet(buffer, index=False)
+            status, corpo = 0, buffer.getvalue()
+        except Exception as erro:
+            status, corpo = 1, f"{type(erro).__name__}: {erro}".encode()
+        self.request.sendall(CABECALHO_RESPOSTA.pack(status, len(corpo)) + corpo)
+
+
+class _Servidor(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+# Função para consultar o serviço; devolve o DataFrame do resultado
+# Levanta ErroServico se o serviço não estiver no ar, se a conexão cair ou se a consulta falhar no serviço
+def consultar(operacao, host=HOST_SERVICO, porta=PORTA_SERVICO, tempo_limite=TEMPO_LIMITE, **parametros):
+    pedido = json.dumps({'operacao': operacao, 'parametros': parametros}).encode()
+    try:
+        with socket.create_connection((host, porta), timeout=tempo_limite) as conexao:
+            conexao.sendall(TAMANHO_PEDIDO.pack(len(pedido)) + pedido)
+            status, tamanho = CABECALHO_RESPOSTA.unpack(_receber_exato(conexao, CABECALHO_RESPOSTA.size))
+            corpo = _receber_exato(conexao, tamanho)
+    except OSError as erro:
+        raise ErroServico(f"Serviço de dados indisponível em {host}:{porta}: {erro}") from erro
+    if status != 0:
+        raise ErroServico(corpo.decode())
+    try:
+        return pd.read_parquet(io.BytesIO(corpo))
+    except (OSError, ValueError) as erro:
+        raise ErroServico(f"Resposta inválida do serviço de dados: {erro}") from erro
+
+
+# Função para iniciar o serviço: carrega o cubo antecipadamente e atende até ser interrompido
+def iniciar_servico(host=HOST_SERVICO, porta=PORTA_SERVICO):
+    _cubo_ocorrencias()
+    with _Servidor((host, porta), _AtenderConsulta) as servidor:
+        print(f"Serviço de dados em {host}:{porta}")
+        servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    iniciar_servico()
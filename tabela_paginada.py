@@ -0,0 +1,70 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# Função para marcar as linhas de uma coluna que contêm o texto; em colunas categóricas a busca é feita
+# nas categorias (uma vez por valor distinto) e as linhas são marcadas pelos códigos
+def _contem_texto(serie, texto):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = serie.cat.categories.astype(str).str.contains(texto, case=False, regex=False)
+        return np.isin(serie.cat.codes.to_numpy(), np.flatnonzero(categorias))
+    if not pd.api.types.is_string_dtype(serie):
+        serie = serie.astype(str)  # Colunas object com tipos misturados
+    return serie.str.contains(texto, case=False, regex=False, na=False).to_numpy(dtype=bool)
+
+
+# Função para filtrar as linhas que contêm o texto em qualquer coluna de texto (sem diferenciar maiúsculas)
+def filtrar_texto(df, texto):
+    texto = texto.strip()
+    if not texto:
+        return df
+    mascara = np.zeros(len(df), dtype=bool)
+    for coluna in df.columns:
+        if pd.api.types.is_object_dtype(df[coluna]) or pd.api.types.is_string_dtype(df[coluna]) or isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            mascara |= _contem_texto(df[coluna], texto)
+    return df[mascara]
+
+
+# Função para obter a chave de ordenação de uma coluna: categorias sem ordem definida (ex.: derivadas por truncar,
+# que ficam na ordem de aparição) são ordenadas pelo valor; categorias ordenadas (Mês, Turno) mantêm a sua ordem
+def _chave_ordenacao(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype) and not serie.cat.ordered:
+        return serie.cat.reorder_categories(serie.cat.categories.sort_values())
+    return serie
+
+
+# Função para recortar no servidor a página visível: aplica filtro de texto, ordenação e fatia das linhas
+# Retorna a página, o total de linhas após o filtro e o total de páginas
+def paginar(df, pagina=1, tamanho_pagina=50, ordenar_por=None, crescente=True, filtro_texto=""):
+    df = filtrar_texto(df, filtro_texto)
+    total_linhas = len(df)
+    total_paginas = max(1, math.ceil(total_linhas / tamanho_pagina))
+    pagina = min(max(1, pagina), total_paginas)
+    inicio = (pagina - 1) * tamanho_pagina
+
+    if ordenar_por:
+        # Ordena apenas a coluna-chave para obter as posições e materializa só as linhas da página
+        posicoes = _chave_ordenacao(df[ordenar_por]).reset_index(drop=True).sort_values(ascending=crescente, kind='stable', na_position='last').index.to_numpy()
+        return df.iloc[posicoes[inicio:inicio + tamanho_pagina]], total_linhas, total_paginas
+
+    return df.iloc[inicio:inicio + tamanho_pagina], total_linhas, total_paginas
+
+
+# Componente Streamlit: tabela paginada com busca e ordenação; apenas a página atual é enviada ao navegador
+def exibir_tabela_paginada(df, chave, tamanho_pagina=50, **kwargs_dataframe):
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        filtro_texto = st.text_input("Buscar", key=f"{chave}_busca")
+    with col2:
+        ordenar_por = st.selectbox("Ordenar por", options=[None] + list(df.columns), format_func=lambda c: "—" if c is None else c, key=f"{chave}_ordem")
+    with col3:
+        crescente = st.radio("Ordem", options=[True, False], format_func=lambda c: "Crescente" if c else "Decrescente", key=f"{chave}_sentido")
+    with col4:
+        pagina = st.number_input("Página", min_value=1, value=1, step=1, key=f"{chave}_pagina")
+
+    pagina_df, total_linhas, total_paginas = paginar(df, pagina, tamanho_pagina, ordenar_por, crescente, filtro_texto)
+    st.dataframe(pagina_df, **kwargs_dataframe)
+    st.caption(f"Página {min(pagina, total_paginas)} de {total_paginas} — {total_linhas} registros")
@@ -1,5 +1,12 @@
+import numpy as np
 import pandas as pd
+import plotly.express as px
 import streamlit as st
+from carga_planilhas import assinatura_arquivos, ler_planilhas, normalizar_ocorrencias
+from enderecos import construir_indice_enderecos, contar_enderecos, linhas_do_endereco, modelo_gazetteer, pontos_quentes
+from esquema import codigo_natureza, contar, normalizar_esquema
+from exportacao import exibir_exportacao
+from tabela_paginada import exibir_tabela_paginada
 
 # Configuração da página em modo "wide"
 st.set_page_config(layout="wide")
@@ -25,20 +32,78 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Upload do arquivo Excel
-uploaded_file = st.file_uploader("Carregue seu arquivo Excel", type=["xlsx"])
+# Índice de endereços (normalização, células da grade e índices invertidos), montado uma vez por conjunto de dados
+# A chave do cache é a assinatura dos arquivos enviados (o DataFrame não é re-hasheado a cada interação)
+@st.cache_data(max_entries=4)
+def indexar_enderecos(assinatura, _df):
+    return construir_indice_enderecos(_df)
+
+
+# Função para exibir as ocorrências por local de um relatório: contagem por endereço normalizado, mapa de pontos
+# quentes (com o gazetteer local) e detalhamento das ocorrências de um endereço ('posicoes' = linhas do relatório em df)
+def exibir_locais(df, indice, posicoes, titulo):
+    st.subheader(f"Ocorrências por Local ({titulo})")
+    ocorrencias_local = contar_enderecos(indice, posicoes)
+    st.write(ocorrencias_local, width=1950)
+
+    # Mapa de pontos quentes apenas quando existe o gazetteer local (gazetteer_paulinia.csv)
+    # Sem o gazetteer, ou sem nenhum endereço localizado, o modelo com os endereços sem coordenadas pode ser baixado
+    # para preencher Latitude/Longitude e criar (ou completar) o gazetteer
+    quentes = pontos_quentes(indice, posicoes) if indice['com_gazetteer'] else None
+    if quentes is not None and not quentes.empty:
+        fig = px.density_map(quentes, lat='Latitude', lon='Longitude', z='Ocorrências', radius=25, zoom=12,
+                             hover_name='Endereço mais frequente', map_style='open-street-map')
+        st.plotly_chart(fig)
+    else:
+        if quentes is None:
+            st.info("O mapa de pontos quentes precisa do gazetteer de Paulínia (gazetteer_paulinia.csv): "
+                    "baixe o modelo, preencha as coordenadas e salve-o na pasta do aplicativo.")
+        else:
+            st.info("Nenhum endereço deste relatório foi localizado no gazetteer de Paulínia.")
+        st.download_button("Baixar endereços sem coordenadas", lambda: modelo_gazetteer(indice).to_csv(index=False).encode('utf-8'),
+                           file_name="gazetteer_paulinia.csv" if quentes is None else "gazetteer_paulinia_faltando.csv",
+                           mime="text/csv", key=f"modelo_{titulo}")
+
+    endereco = st.selectbox("Detalhar endereço:", ocorrencias_local.index, key=f"detalhe_{titulo}")
+    if endereco is not None:
+        st.write(df.iloc[linhas_do_endereco(indice, endereco, posicoes)], width=1950)
+
+
+# Leitura das planilhas enviadas (removendo as colunas indesejadas), com progresso por arquivo
+# Feita uma vez por conjunto de arquivos (nome e hash do conteúdo de cada um): as interações seguintes usam o cache
+# O progresso é criado dentro da função para que o cache possa reproduzi-lo
+@st.cache_data(show_spinner=False, max_entries=4)
+def ler_uploads(assinatura, _arquivos):
+    progresso = st.progress(0.0, text="Lendo arquivos...")
+
+    def atualizar_progresso(nome, concluidos, total, erro):
+        progresso.progress(concluidos / total, text=f"{concluidos}/{total} arquivos lidos ({nome})")
+
+    resultado = ler_planilhas(_arquivos, normalizar_ocorrencias, ao_concluir=atualizar_progresso)
+    progresso.empty()
+    return resultado
+
+
+# Upload dos arquivos Excel (um ou vários, lidos em paralelo e concatenados)
+uploaded_files = st.file_uploader("Carregue seus arquivos Excel", type=["xlsx"], accept_multiple_files=True)
 
-if uploaded_file is not None:
-    # Ler o arquivo Excel
-    df = pd.read_excel(uploaded_file)
+if uploaded_files:
+    # Ler os arquivos Excel removendo as colunas indesejadas (relidos apenas quando os arquivos enviados mudam)
+    arquivos = [(arquivo.name, arquivo.getvalue()) for arquivo in uploaded_files]
+    assinatura = assinatura_arquivos(arquivos)
+    df, erros = ler_uploads(assinatura, arquivos)
+    for nome, erro in erros.items():
+        st.error(f"Não foi possível ler o arquivo {nome}: {erro}")
+    if df.empty:
+        st.stop()
 
-    # Remover as colunas indesejadas
-    colunas_para_remover = ['Id', 'N', 'N° Talão', 'N° BO GCM', 'Anexos', 'Suporte à guarnição', 'Status']
-    df = df.drop(columns=[coluna for coluna in colunas_para_remover if coluna in df.columns])
+    # Natureza, Guarnição e Endereço do fato como categorias (contagens e filtros sobre os códigos)
+    df = normalizar_esquema(df)
+    indice_enderecos = indexar_enderecos(assinatura, df)
 
-    # Exibir toda a tabela sem as colunas removidas
+    # Exibir toda a tabela sem as colunas removidas (paginada: só a página atual vai para o navegador)
     st.subheader("Tabela Completa")
-    st.dataframe(df, width=1950)  # Exibir toda a tabela
+    exibir_tabela_paginada(df, "tabela_completa", width=1950)
 
 
     # Separação e relatórios por colunas
@@ -49,14 +114,14 @@ if uploaded_file is not None:
 
     with col1:
         st.subheader("Relatório: Guarnição")
-        guarnicao_counts = df['Guarnição'].value_counts()
+        guarnicao_counts = contar(df['Guarnição'])
         st.write(guarnicao_counts, width=1950)
 
     with col2:
         st.subheader("Relatório: Natureza (Códigos Completos)")
-        df['Código Natureza'] = df['Natureza'].str.split(' - ').str[0]
+        df['Código Natureza'] = codigo_natureza(df['Natureza'])
         df['Nome Natureza'] = df['Natureza']
-        natureza_counts = df['Nome Natureza'].value_counts().nlargest(10)
+        natureza_counts = contar(df['Nome Natureza']).nlargest(10)
         st.write(natureza_counts, width=1950)
 
     # Criação de um filtro para escolher qual relatório visualizar
@@ -68,7 +133,8 @@ if uploaded_file is not None:
     # Exibir o relatório selecionado
     if selected_relatorio == 'Código 46':
         st.subheader("Relatório: Código 46")
-        df_cod_46 = df[df['Código Natureza'].str.contains('46', na=False)]
+        mascara_46 = df['Código Natureza'].str.contains('46', na=False)
+        df_cod_46 = df[mascara_46]
         
         # Verifique se as colunas de data/hora existem
         if 'Data/Hora inicial' in df_cod_46.columns and 'Data/Hora final' in df_cod_46.columns:
@@ -83,29 +149,28 @@ if uploaded_file is not None:
         if not df_cod_46.empty:
             report_cod_46 = df_cod_46[['Nome Natureza', 'Data/Hora inicial', 'Endereço do fato', 'Guarnição']]
             st.write(report_cod_46, width=1950)
+            exibir_exportacao(report_cod_46, "exportar_codigo_46", "relatorio_codigo_46", (assinatura, "46"))
 
-            # Contagem de ocorrências por local
-            ocorrencias_local = df_cod_46['Endereço do fato'].value_counts()
-            st.subheader("Ocorrências por Local (Código 46)")
-            st.write(ocorrencias_local, width=1950)
+            # Ocorrências por local (endereços normalizados), mapa de pontos quentes e detalhamento
+            exibir_locais(df, indice_enderecos, np.flatnonzero(mascara_46), "Código 46")
         else:
             st.write("Não há registros para o Código 46.", width=1950)
 
     else:
         codigo = selected_relatorio.split(': ')[-1]
         st.subheader(f"Relatório para o Código: {codigo}")
-        df_cod = df[df['Nome Natureza'] == codigo]
+        mascara_cod = df['Nome Natureza'] == codigo
+        df_cod = df[mascara_cod]
         report_cod = df_cod[['Nome Natureza', 'Data/Hora inicial', 'Endereço do fato', 'Guarnição']]
         
         if not report_cod.empty:
             st.write(report_cod, width=1950)
+            exibir_exportacao(report_cod, "exportar_codigo", f"relatorio_codigo_{codigo}", (assinatura, codigo))
 
-            # Contagem de ocorrências por local
-            ocorrencias_local = df_cod['Endereço do fato'].value_counts()
-            st.subheader(f"Ocorências por Local (Código {codigo})")
-            st.write(ocorrencias_local, width=1950)
+            # Ocorrências por local (endereços normalizados), mapa de pontos quentes e detalhamento
+            exibir_locais(df, indice_enderecos, np.flatnonzero(mascara_cod), f"Código {codigo}")
         else:
             st.write(f"Não há registros para o Código: {codigo}.", width=1950)
 
 else:
-    st.write("Por favor, carregue um arquivo Excel para visualizar os dados e gerar os relatórios.")
+    st.write("Por favor, carregue um ou mais arquivos Excel para visualizar os dados e gerar os relatórios.")
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+# Histórico de outubro preparado como nos dashboards, compartilhado pelos testes do cubo e dos agregados de tempo
+@pytest.fixture(scope="session")
+def historico():
+    from armazem_ocorrencias import preparar_historico
+    return preparar_historico(pd.read_excel(os.path.join(RAIZ, "Rel Outubro.xlsx")).dropna(how='all'))
@@ -0,0 +1,106 @@
+import os
+
+import pandas as pd
+import pytest
+
+from armazem_ocorrencias import carregar_armazem, chave_ocorrencia, ingerir_exportacao
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def linha(data, guarnicao, id_=None, natureza="Patrulhamento"):
+    inicio = pd.Timestamp(data)
+    return {
+        'Id': id_, 'N° Talão': None, 'Data/Hora inicial': inicio, 'Data/Hora final': inicio + pd.Timedelta(minutes=30),
+        'Guarnição': guarnicao, 'Natureza': natureza, 'Endereço do fato': "RUA A - CENTRO",
+    }
+
+
+def exportar(caminho, linhas):
+    pd.DataFrame(linhas).to_excel(caminho, sheet_name="Planilha1", index=False)
+    return str(caminho)
+
+
+@pytest.fixture
+def exportacoes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # O cache das planilhas fica no diretório temporário
+    parcial = exportar(tmp_path / "Relatorio 1 a 28.xlsx", [
+        linha("2024-10-01 08:00", "PLN-701", id_=1),
+        linha("2024-10-01 08:00", "PLN-702"),  # Apoio da ocorrência 1
+        linha("2024-10-28 12:29", "PLN-709"),  # Apoio com a guarnição alterada depois
+    ])
+    completa = exportar(tmp_path / "Rel Outubro.xlsx", [
+        linha("2024-10-01 08:00", "PLN-701", id_=1),
+        linha("2024-10-01 08:00", "PLN-702"),
+        linha("2024-10-28 12:29", "PLN-704"),
+        linha("2024-10-30 20:00", "PLN-703", id_=2),
+    ])
+    return parcial, completa, str(tmp_path / "armazem")
+
+
+def test_exportacao_completa_substitui_a_parcial(exportacoes):
+    parcial, completa, armazem = exportacoes
+    assert ingerir_exportacao(parcial, armazem) == 3
+    ingerir_exportacao(completa, armazem)
+    df = carregar_armazem(armazem)
+    assert len(df) == 4
+    assert sorted(df['Guarnição']) == ["PLN-701", "PLN-702", "PLN-703", "PLN-704"]
+
+
+def test_exportacao_parcial_depois_da_completa_nao_acrescenta_linhas(exportacoes):
+    parcial, completa, armazem = exportacoes
+    ingerir_exportacao(completa, armazem)
+    assert ingerir_exportacao(parcial, armazem) == 0
+    assert len(carregar_armazem(armazem)) == 4
+
+
+def test_ingestao_idempotente(exportacoes):
+    _, completa, armazem = exportacoes
+    assert ingerir_exportacao(completa, armazem) == 4
+    assert ingerir_exportacao(completa, armazem) == 0
+    assert len(carregar_armazem(armazem)) == 4
+
+
+def test_meses_sem_sobreposicao_sao_somados_sem_duplicar_ids(exportacoes, tmp_path):
+    _, completa, armazem = exportacoes
+    novembro = exportar(tmp_path / "Rel Novembro.xlsx", [
+        linha("2024-10-30 20:00", "PLN-703", id_=2),  # Ocorrência do fim de outubro repetida na exportação seguinte
+        linha("2024-11-02 09:00", "PLN-701", id_=3),
+        linha("2024-11-02 09:00", "PLN-705"),
+    ])
+    ingerir_exportacao(completa, armazem)
+    ingerir_exportacao(novembro, armazem)
+    df = carregar_armazem(armazem)
+    assert len(df) == 6
+    assert df['Id'].dropna().tolist().count(2) == 1
+
+
+# As exportações do repositório: "Relatorio 1 a 28.xlsx" tem 139 linhas de apoio com a guarnição alterada
+# em "Rel Outubro.xlsx" (2095 linhas: 1778 com Id e 317 de apoio)
+def test_exportacoes_de_outubro_do_repositorio(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    armazem = str(tmp_path / "armazem")
+    ingerir_exportacao(os.path.join(RAIZ, "Relatorio 1 a 28.xlsx"), armazem)
+    ingerir_exportacao(os.path.join(RAIZ, "Rel Outubro.xlsx"), armazem)
+    df = carregar_armazem(armazem)
+    assert len(df) == 2095
+    assert df['Id'].notna().sum() == 1778
+
+
+def test_chave_ocorrencia_prioriza_id_depois_talao_depois_conteudo():
+    df = pd.DataFrame([
+        {**linha("2024-10-01 08:00", "PLN-701", id_=7), 'N° Talão': "15052/2024"},
+        {**linha("2024-10-01 08:00", "PLN-702"), 'N° Talão': "15053/2024"},
+        linha("2024-10-01 08:00", "PLN-703"),
+    ])
+    chaves = chave_ocorrencia(df)
+    assert chaves.iloc[0] == "id:7"
+    assert chaves.iloc[1] == "talao:15053/2024"
+    assert chaves.iloc[2].startswith("linha:") and "PLN-703" in chaves.iloc[2]
+
+
+# A mesma ocorrência deve ter a mesma chave em exportações com e sem vazios na coluna do talão
+def test_chave_ocorrencia_talao_numerico_independe_dos_vazios():
+    com_vazios = chave_ocorrencia(pd.DataFrame([{**linha("2024-10-01 08:00", "PLN-702"), 'N° Talão': 123}, linha("2024-10-01 09:00", "PLN-703")]))
+    sem_vazios = chave_ocorrencia(pd.DataFrame([{**linha("2024-10-01 08:00", "PLN-702"), 'N° Talão': 123}]))
+    assert com_vazios.iloc[0] == sem_vazios.iloc[0] == "talao:123"
@@ -0,0 +1,16 @@
+import pandas as pd
+
+from cubo import construir_cubo, fatiar, total, totais_por
+
+
+# O cubo deve dar as mesmas contagens que o agrupamento direto das linhas
+def test_cubo_igual_ao_agrupamento_das_linhas(historico):
+    cubo = construir_cubo(historico)
+    assert total(cubo) == len(historico)
+    por_guarnicao = historico['Guarnição'].value_counts()
+    pd.testing.assert_series_equal(
+        totais_por(cubo, 'Guarnição').sort_index(), por_guarnicao[por_guarnicao > 0].sort_index(),
+        check_names=False, check_index_type=False, check_categorical=False,
+    )
+    natureza = historico['Natureza'].iloc[0]
+    assert total(fatiar(cubo, {'Natureza': natureza, 'Guarnição': "TODOS"})) == int((historico['Natureza'] == natureza).sum())
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from cubo import construir_cubo, totais_por
+from dimensao_tempo import construir_rollups, datas_do_dia
+
+
+# Os agregados por balde de tempo devem coincidir com o cubo e com a contagem direta por dia
+def test_rollups_iguais_ao_cubo(historico):
+    rollups = construir_rollups(historico)
+    cubo = construir_cubo(historico)
+    por_dia = pd.Series(rollups['Dia'].to_numpy(), index=datas_do_dia(rollups['Dia'].index.to_series()).dt.date.to_numpy())
+    pd.testing.assert_series_equal(por_dia.sort_index(), totais_por(cubo, 'Dia').sort_index(), check_names=False, check_index_type=False)
+    assert rollups['Mês'].to_dict() == {202410: len(historico)}
+    assert rollups['Turno'].sum() == len(historico)
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from duracao import converter_duracoes
+
+
+def test_converter_duracoes_formatos_do_sistema():
+    minutos, nao_convertidas = converter_duracoes(pd.Series(["03min", "1h 25min", "2h", " 45min "]))
+    assert minutos.tolist() == [3, 85, 120, 45]
+    assert nao_convertidas == 0
+
+
+def test_converter_duracoes_usa_inicio_e_fim_quando_fora_do_padrao():
+    duracao = pd.Series(["", None, "abc", "10min"])
+    inicio = pd.Series(pd.to_datetime(["2024-10-01 08:00", "2024-10-01 08:00", "2024-10-01 09:00", "2024-10-01 08:00"]))
+    fim = pd.Series(pd.to_datetime(["2024-10-01 08:30", "2024-10-01 10:00", "2024-10-01 08:00", "2024-10-01 08:20"]))
+    minutos, nao_convertidas = converter_duracoes(duracao, inicio, fim)
+    assert minutos.iloc[:2].tolist() == [30, 120]
+    assert pd.isna(minutos.iloc[2])  # Fim antes do início não vira duração negativa
+    assert minutos.iloc[3] == 10  # O texto válido tem prioridade sobre as datas
+    assert nao_convertidas == 1
@@ -0,0 +1,12 @@
+from extrato_pdf import SEM_PLACA, _montar_dataframe, interpretar_texto
+
+LINHA = "773831 1 / 1 17/04/2024 DIESEL S10 5,790 38,151 0,000 0,000 220,890"
+
+
+# A placa vem da linha, senão do último cabeçalho "Agregado" (mesmo de outra faixa de páginas), senão do rótulo SEM_PLACA
+def test_placa_da_linha_do_agregado_ou_sem_placa():
+    primeira_faixa = interpretar_texto("\n".join([LINHA, "Agregado: FDZ-7H43 - PLN-703", LINHA]))
+    segunda_faixa = interpretar_texto("\n".join([LINHA, LINHA + " BEATRIZ MEL FGH-8F42"]))
+    df = _montar_dataframe(primeira_faixa + segunda_faixa)
+    assert df['Placa'].tolist() == [SEM_PLACA, "FDZ-7H43", "FDZ-7H43", "FGH-8F42"]
+    assert df['Valor'].tolist() == [220.89] * 4
@@ -0,0 +1,23 @@
+import os
+
+import gerar_relatorios
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# O mesmo mês de anos diferentes deve gerar relatórios separados, cada um só com as linhas do seu ano
+def test_tarefas_consumo_separa_os_anos(tmp_path, monkeypatch):
+    with open(os.path.join(RAIZ, "historico_consumo1.csv"), encoding="utf-8") as arquivo:
+        linhas = arquivo.read().splitlines()
+    outubro = [linha for linha in linhas[1:] if "/10/2024 " in linha]
+    csv = tmp_path / "dois_anos.csv"
+    csv.write_text("\n".join([linhas[0]] + outubro + [linha.replace("/2024 ", "/2025 ") for linha in outubro]) + "\n", encoding="utf-8")
+    monkeypatch.setattr(gerar_relatorios, "ARQUIVO_CONSUMO", str(csv))
+
+    tarefas = gerar_relatorios.tarefas_consumo(str(tmp_path))
+    relatorios = {os.path.basename(parametros[-1]): parametros for _, parametros in tarefas}
+    assert sorted(relatorios) == ["consumo_2024-10", "consumo_2025-10"]
+    for nome, (data_mes, anomalias_mes, _, nome_mes, _) in relatorios.items():
+        assert len(data_mes) == len(outubro)
+        assert data_mes['Ano'].nunique() == 1 and anomalias_mes['Ano'].isin(data_mes['Ano']).all()
+        assert nome_mes == f"Outubro/{nome[8:12]}"
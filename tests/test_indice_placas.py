@@ -0,0 +1,26 @@
+import pandas as pd
+
+from indice_placas import construir_indice_placas, diario_da_placa, linhas_da_placa, placas_do_mes
+
+
+def abastecimento(data_hora, placa, valor):
+    data_hora = pd.Timestamp(data_hora)
+    return {'Data/Hora': data_hora, 'Dia': data_hora.date(), 'Ano': data_hora.year, 'Mês': data_hora.month,
+            'Placa': placa, 'Valor Venda': valor}
+
+
+# O mesmo mês de anos diferentes fica em faixas separadas do índice
+def test_indice_separa_o_mesmo_mes_de_anos_diferentes():
+    data = pd.DataFrame([
+        abastecimento("2024-10-01 08:00", "PLN-701", 100.0),
+        abastecimento("2025-10-01 08:00", "PLN-701", 50.0),
+        abastecimento("2025-10-02 08:00", "PLN-701", 25.0),
+        abastecimento("2025-10-02 09:00", "PLN-702", 10.0),
+    ])
+    indice = construir_indice_placas(data)
+    assert placas_do_mes(indice, 2024, 10) == ["PLN-701"]
+    assert placas_do_mes(indice, 2025, 10) == ["PLN-701", "PLN-702"]
+    assert linhas_da_placa(indice, 2024, 10, "PLN-701")['Valor Venda'].tolist() == [100.0]
+    assert linhas_da_placa(indice, 2025, 10, "PLN-701")['Valor Venda'].tolist() == [50.0, 25.0]
+    assert diario_da_placa(indice, 2025, 10, "PLN-701").tolist() == [50.0, 25.0]
+    assert diario_da_placa(indice, 2024, 11, "PLN-701").empty
@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+
+from carga_planilhas import normalizar_valores
+from limpeza_valores import converter_valores, limpar_valores
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_converter_valores_coluna_mista():
+    coluna = pd.Series([1553.11, "1.553,110", 220.89, "220,890", "Val. Consu", None, 0], dtype=object)
+    valores = converter_valores(coluna)
+    assert valores.iloc[:4].tolist() == [1553.11, 1553.11, 220.89, 220.89]
+    assert valores.iloc[4:6].isna().all()
+    assert valores.iloc[6] == 0
+
+
+def test_converter_valores_coluna_numerica():
+    assert converter_valores(pd.Series([1, 2.5])).tolist() == [1.0, 2.5]
+
+
+# O filtro de zero vale depois da conversão: o texto "0,000" também é zero
+def test_limpar_valores_remove_zero_em_texto():
+    df = pd.DataFrame({
+        'Valor Total': ["220,890", 1553.11, 0, "0,000", "Val. Consu", "Observação: teste"],
+        'Valor': ["1,500", 2.5, "1,000", "1,000", "Desc. (R", "1,000"],
+    })
+    limpo = limpar_valores(df)
+    assert limpo['Valor Total'].tolist() == [220.89, 1553.11]
+    assert limpo['Valor'].tolist() == [1.5, 2.5]
+
+
+def test_limpar_valores_zero_apenas_nas_colunas_informadas():
+    df = pd.DataFrame({'Valor Total': ["220,890", "0,000"], 'Valor': ["0,000", "0,000"]})
+    limpo = limpar_valores(df, colunas_zero=['Valor Total'])
+    assert limpo['Valor Total'].tolist() == [220.89]
+    assert limpo['Valor'].tolist() == [0.0]
+
+
+# Relatório do repositório: 646 linhas com valores, das quais 95 são o cabeçalho repetido a cada página
+# (o desconto, 'Valor', é 0,000 em todas; o zero é verificado só no 'Valor Total', como em comb.py)
+def test_limpar_valores_arquivo_convertido():
+    df = normalizar_valores(pd.read_excel(os.path.join(RAIZ, "arquivo_convertido.xlsx")))
+    limpo = limpar_valores(df, colunas_zero=['Valor Total'])
+    assert len(limpo) == 551
+    assert limpo['Valor Total'].iloc[:3].tolist() == [220.89, 269.06, 254.01]
@@ -0,0 +1,9 @@
+import pandas as pd
+
+from turnos import classificar_turno
+
+
+def test_classificar_turno_limites():
+    datas = pd.Series(pd.to_datetime(["2024-10-01 05:29", "2024-10-01 05:30", "2024-10-01 13:50", "2024-10-01 21:50", "2024-10-01 03:00", None]))
+    assert classificar_turno(datas).astype(object).tolist()[:5] == ["Madrugada", "Manhã", "Tarde", "Madrugada", "Madrugada"]
+    assert pd.isna(classificar_turno(datas).iloc[5])
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+# Início de cada turno (HH:MM); o último turno vai até o início do primeiro no dia seguinte
+LIMITES_TURNO = (("Manhã", "05:30"), ("Tarde", "13:50"), ("Madrugada", "21:50"))
+
+
+# Função para converter "HH:MM" em minutos desde a meia-noite
+def _para_minutos(horario):
+    horas, minutos = horario.split(":")
+    return int(horas) * 60 + int(minutos)
+
+
+# Função para obter a ordem dos turnos (usada nos Categorical e nos selectbox)
+def ordem_turnos(limites=LIMITES_TURNO):
+    return [nome for nome, _ in limites]
+
+
+# Função para calcular os minutos desde a meia-noite de uma série datetime (NaT vira -1)
+def minutos_do_dia(datas):
+    datas = pd.to_datetime(datas)
+    minutos = (datas.dt.hour * 60 + datas.dt.minute).to_numpy(dtype=float, na_value=np.nan)
+    return np.where(np.isnan(minutos), -1, minutos).astype(np.int32)
+
+
+# Função vetorizada para classificar cada horário no seu turno, devolvendo uma série categórica ordenada
+# Uma única busca binária (np.searchsorted) sobre os inícios dos turnos substitui o apply linha a linha
+def classificar_turno(datas, limites=LIMITES_TURNO):
+    nomes = ordem_turnos(limites)
+    inicios = np.array([_para_minutos(inicio) for _, inicio in limites])
+    ordem = np.argsort(inicios)
+
+    minutos = minutos_do_dia(datas)
+    posicao = np.searchsorted(inicios[ordem], minutos, side='right') - 1
+    # Antes do primeiro início pertence ao último turno do dia anterior (ex.: 03:00 -> Madrugada)
+    codigos = ordem[posicao % len(inicios)]
+    codigos = np.where(minutos < 0, -1, codigos)
+
+    turnos = pd.Categorical.from_codes(codigos, categories=nomes, ordered=True)
+    return pd.Series(turnos, index=getattr(datas, 'index', None), name='Turno')